@@ -3,8 +3,15 @@ Interconnection status monitor.
 
 Three-step loop per run:
   1. Pull IC watchlist from Zoho (Installs in active project stages)
-  2. Search Gmail label:_INTERCONNECTIONS for matching emails per install
+  2. Read Gmail label:_INTERCONNECTIONS and route each email to installs locally
   3. Classify via keyword rules → update Utility_Status + IC_Project_Number + append Note
+
+Step 2 is incremental: each run stores the mailbox historyId it started from,
+and the next run reads only messages added to the label since then
+(users.history.list). A full sweep of the label's last GMAIL_LOOKBACK_DAYS —
+one messages.list for the whole watchlist — runs only to bootstrap (no
+checkpoint yet, checkpoint expired, or full_rescan=True) or when installs
+join the watchlist.
 """
 
 import base64
@@ -12,11 +19,14 @@ import datetime
 import json
 import logging
 import os
+import random
 import re
+import time
 
 import requests
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +50,20 @@ GMAIL_IMPERSONATE = os.getenv("GMAIL_IMPERSONATE_EMAIL", "installs@helio.solar")
 GMAIL_LABEL = "_INTERCONNECTIONS"
 GMAIL_LOOKBACK_DAYS = 45
 GMAIL_MAX_RESULTS = 10
+# messages.get calls per batch HTTP request. Gmail accepts up to 100 but
+# advises against more than 50, which tends to trip per-user rate limits.
+GMAIL_BATCH_SIZE = max(1, min(int(os.getenv("GMAIL_BATCH_SIZE", "50")), 100))
+# Pause (plus up to 1s jitter) before re-requesting the ids a batch lost —
+# most of those are 429s, which an immediate retry just hits again.
+GMAIL_RETRY_BACKOFF_SECONDS = float(os.getenv("GMAIL_RETRY_BACKOFF_SECONDS", "2"))
+
+# historyId checkpoint, kept next to main.py's other sync state
+IC_STATE_DIR = os.getenv("SYNC_STATE_DIR", "/tmp/aurora-zoho-sync")
+IC_CHECKPOINT_FILE = os.path.join(IC_STATE_DIR, "ic_monitor_checkpoint.json")
+# Gmail ids already recorded in IC_Monitor_Updates, per install
+IC_SEEN_FILE = os.path.join(IC_STATE_DIR, "ic_monitor_seen.json")
+# Re-read records created this long before the last sync, to cover clock skew
+IC_SEEN_OVERLAP_HOURS = 24
 
 # ── Status rank (forward-only guard) ─────────────────────────────────────────
 # The monitor may only move a status forward (higher rank), never backward.
@@ -91,91 +115,241 @@ _IGNORE_PATTERNS = [
     re.compile(r"electric bill", re.I),
 ]
 
-# Each rule is (pattern, status, confidence, subject_only).
+# Each rule is (pattern, status, confidence, subject_only, keywords).
 # subject_only=True rules are matched against the subject line only — use this
 # when the body commonly contains the same keywords in a different context.
+# keywords are lowercase literals at least one of which occurs in every match
+# of the pattern; the compiled classifier below only runs a rule whose
+# keywords are present, so keep them in step when editing a pattern.
 _RULES = [
     # Contingent approval — must come before PTO because utility emails about
     # contingent approval often contain "permission to operate" language in the body.
     # Upgrade vs. As-Is is subject-only: the body of As-Is emails mentions "upgrade"
     # in passing (e.g. "no upgrade required"), which would cause false upgrade matches.
     (re.compile(r"contingent\s+approv.{0,60}upgrade|upgrade.{0,60}contingent\s+approv", re.I),
-     "Contingent Approval (with Upgrade)", "high", True),
+     "Contingent Approval (with Upgrade)", "high", True, ("contingent",)),
     (re.compile(r"contingent\s+approv.{0,60}as.is|as.is.{0,60}contingent\s+approv", re.I),
-     "Contingent Approval (As Is)", "high", True),
+     "Contingent Approval (As Is)", "high", True, ("contingent",)),
     (re.compile(r"contingent\s+approv(al)?\s+to\s+interconnect", re.I),
-     "Contingent Approval (As Is)", "high", True),
+     "Contingent Approval (As Is)", "high", True, ("contingent",)),
     (re.compile(r"contingent\s+approv|contingent\s+interconnect", re.I),
-     "Contingent Approval (As Is)", "medium", True),
+     "Contingent Approval (As Is)", "medium", True, ("contingent",)),
 
     # Terminal / green states
     # Meter Swap must come before PTO — Eversource meter change emails mention
     # "permission to operate" in the body (once meter is installed), which would
     # otherwise trigger a false PTO match.
     (re.compile(r"meter\s+(swap|change|set|install)", re.I),
-     "Meter Swap", "high"),
+     "Meter Swap", "high", False, ("meter",)),
     # UI (United Illuminating) uses "Approval to Energize"; Eversource uses "Permission to Operate"
     # subject_only=True: contingent approval emails always mention "permission to operate"
     # in the body (e.g. "before Permission to Operate can be issued") — subject is unambiguous.
     (re.compile(r"permission\s+to\s+operate|pto\s+granted|\bpto\b.*granted|approval\s+to\s+energize", re.I),
-     "Permission to Operate", "high", True),
+     "Permission to Operate", "high", True, ("permission", "pto", "energize")),
     (re.compile(r"witness\s+test.*complet|witness\s+test.*pass", re.I),
-     "Witness Test Complete", "high"),
+     "Witness Test Complete", "high", False, ("witness",)),
     (re.compile(r"witness\s+test.*schedul|schedule.*witness\s+test", re.I),
-     "Witness Test Schedule", "high"),
+     "Witness Test Schedule", "high", False, ("witness",)),
     (re.compile(r"waiting\s+for\s+town|municipal\s+approv|town\s+approv", re.I),
-     "Waiting for Town Approval", "high"),
+     "Waiting for Town Approval", "high", False, ("town", "municipal")),
 
     # Fast track
     (re.compile(r"fast\s*track", re.I),
-     "Fast Track", "high"),
+     "Fast Track", "high", False, ("fast",)),
 
     # ON HOLD — must come before RRES/validation rules to avoid false matches
     (re.compile(r"on\s+hold.{0,40}hea|hea.{0,40}on\s+hold", re.I),
-     "Application On Hold - HEA", "high"),
+     "Application On Hold - HEA", "high", False, ("hold",)),
     (re.compile(r"application\s+validation\s+on\s+hold|validation\s+on\s+hold|on\s+hold.*response\s+required", re.I),
-     "App Signed by Client - IC On Hold", "high"),
+     "App Signed by Client - IC On Hold", "high", False, ("hold",)),
     (re.compile(r"application\s+(validation\s+)?on\s+hold|placed\s+on\s+hold", re.I),
-     "App Signed by Client - IC On Hold", "medium"),
+     "App Signed by Client - IC On Hold", "medium", False, ("hold",)),
     # UI (United Illuminating) uses "Response Required:" subject for hold emails
     (re.compile(r"response\s+required", re.I),
-     "App Signed by Client - IC On Hold", "high", True),
+     "App Signed by Client - IC On Hold", "high", True, ("response",)),
 
     # Corrections received from customer = back in review after hold
     (re.compile(r"corrections\s+received", re.I),
-     "Resubmitted - RRES Review", "high"),
+     "Resubmitted - RRES Review", "high", False, ("corrections",)),
 
     # Technical review
     (re.compile(r"resubmit.{0,40}technical\s+review|technical\s+review.{0,40}resubmit", re.I),
-     "Resubmitted - Technical Review", "high"),
+     "Resubmitted - Technical Review", "high", False, ("resubmit",)),
     (re.compile(r"technical\s+review", re.I),
-     "Technical Review", "high"),
+     "Technical Review", "high", False, ("technical",)),
 
     # RRES review — specific enough to not match ON HOLD subjects
     (re.compile(r"resubmit.{0,40}rres|rres.{0,40}resubmit", re.I),
-     "Resubmitted - RRES Review", "high"),
+     "Resubmitted - RRES Review", "high", False, ("rres",)),
     (re.compile(r"rres\s+review|validation\s+complete|application\s+validation\s+complete", re.I),
-     "RRES Review", "high"),
+     "RRES Review", "high", False, ("rres", "validation")),
 
     # Submission / signature states
     (re.compile(r"disclosure\s+form.*interconnection|interconnection.*disclosure\s+form", re.I),
-     "App Sent for Client Signature", "high"),
+     "App Sent for Client Signature", "high", False, ("disclosure",)),
     (re.compile(r"sent\s+for.*signature|signature\s+request", re.I),
-     "App Sent for Client Signature", "high"),
+     "App Sent for Client Signature", "high", False, ("signature",)),
     (re.compile(r"application\s+receipt\b", re.I),
-     "Signed App Submitted", "high"),
+     "Signed App Submitted", "high", False, ("receipt",)),
     (re.compile(r"res\s+customer\s+edu", re.I),
-     "Signed App Submitted", "medium"),
+     "Signed App Submitted", "medium", False, ("customer",)),
     # DocuSign completion for IC-related documents
     (re.compile(r"document\s+.{0,80}(interconnection|renewable energy|tariff application).{0,80}has\s+been\s+completed", re.I),
-     "Signed App Submitted", "high"),
+     "Signed App Submitted", "high", False, ("document",)),
     (re.compile(r"signed\s+app.*submitted|application.*submitted|app.*submitted", re.I),
-     "Signed App Submitted", "high"),
+     "Signed App Submitted", "high", False, ("submitted",)),
 ]
 
 
+# ── Compiled classifier ──────────────────────────────────────────────────────
+# Utility emails carry long HTML-stripped bodies, and most of them match few
+# or none of _RULES, so running every pattern over the whole text was the
+# expensive part of classification. Instead each rule is gated on its
+# keywords: a plain substring test on the lowercased text (cached per
+# keyword), and only rules whose keywords occur are run — in _RULES order,
+# so the first match still wins.
+#
+# On long texts a candidate rule is also only run over the lines around its
+# keyword hits. "." never crosses a newline, so a match can only span line
+# breaks through its \s tokens; treating each whitespace run that contains a
+# newline as one break, a rule with k \s tokens matches within k lines either
+# side of one of its keywords. Every pattern starts and ends on a letter and
+# window edges sit next to whitespace, so \b behaves as it does on the full
+# text and the result is exactly that of the plain _RULES loop.
+
+# Texts shorter than this are searched whole — windowing doesn't pay off
+CLASSIFY_WINDOW_MIN_CHARS = 4000
+# A rule with more keyword hits than this is searched over the whole text
+CLASSIFY_MAX_WINDOWS = 32
+
+# re.IGNORECASE also matches these against ASCII letters; str.lower() doesn't fold them
+_KEYWORD_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})
+
+# (rule, keywords, line breaks a match can span)
+_COMPILED_RULES = [(rule, rule[4], rule[0].pattern.count(r"\s")) for rule in _RULES]
+
+
+def _keyword_offsets(folded, keyword, limit):
+    """Offsets of keyword in folded, or None if there are more than limit."""
+    offsets = []
+    at = folded.find(keyword)
+    while at != -1:
+        if len(offsets) == limit:
+            return None
+        offsets.append(at)
+        at = folded.find(keyword, at + 1)
+    return offsets
+
+
+def _line_window(text, at, span):
+    """
+    (start, end) of the lines up to span line breaks either side of the line
+    holding offset at. A break is a whitespace run containing a newline.
+    """
+    start = at
+    for step in range(span + 1):
+        newline = text.rfind("\n", 0, start)
+        if newline == -1:
+            start = 0
+            break
+        if step == span:
+            start = newline + 1
+            while text[start].isspace():
+                start += 1
+            break
+        start = newline
+        while start and text[start - 1].isspace():
+            start -= 1
+
+    end = at
+    for step in range(span + 1):
+        newline = text.find("\n", end)
+        if newline == -1:
+            end = len(text)
+            break
+        if step == span:
+            end = newline
+            while text[end - 1].isspace():
+                end -= 1
+            break
+        end = newline + 1
+        while end < len(text) and text[end].isspace():
+            end += 1
+    return start, end
+
+
+def _first_matching_rule_reference(subject, text):
+    """The plain _RULES loop — kept as the reference for benchmark_classifier."""
+    for rule in _RULES:
+        search_text = subject if rule[3] else text
+        if rule[0].search(search_text):
+            return rule
+    return None
+
+
+def _first_matching_rule(subject, text):
+    """
+    The first _RULES entry matching the email, or None. text is
+    f"{subject} {body}"; subject_only rules search the subject alone.
+    """
+    folded = text.lower()
+    if not folded.isascii():
+        folded = text.translate(_KEYWORD_FOLD).lower()
+        if len(folded) != len(text):
+            # Offsets would not line up with text
+            return _first_matching_rule_reference(subject, text)
+    folded_subject = folded[:len(subject)]
+    windowed = len(text) >= CLASSIFY_WINDOW_MIN_CHARS
+
+    present = {}
+    offsets = {}
+    for rule, keywords, span in _COMPILED_RULES:
+        pattern = rule[0]
+        if rule[3]:
+            if any(keyword in folded_subject for keyword in keywords) and pattern.search(subject):
+                return rule
+            continue
+        hit_keywords = []
+        for keyword in keywords:
+            if keyword not in present:
+                present[keyword] = keyword in folded
+            if present[keyword]:
+                hit_keywords.append(keyword)
+        if not hit_keywords:
+            continue
+
+        hits = []
+        for keyword in hit_keywords if windowed else ():
+            if keyword not in offsets:
+                offsets[keyword] = _keyword_offsets(folded, keyword, CLASSIFY_MAX_WINDOWS)
+            if offsets[keyword] is None:
+                hits = None
+                break
+            hits.extend(offsets[keyword])
+        if not hits:
+            # Short text, or too many hits to be worth windowing
+            if pattern.search(text):
+                return rule
+            continue
+
+        windows = []
+        for at in sorted(hits):
+            lo, hi = _line_window(text, at, span)
+            if windows and lo <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], hi)
+            else:
+                windows.append([lo, hi])
+        if any(pattern.search(text, lo, hi) for lo, hi in windows):
+            return rule
+    return None
+
+
 _IGNORE = object()  # sentinel
 
+
+def _is_ignored_subject(subject):
+    return any(pattern.search(subject) for pattern in _IGNORE_PATTERNS)
+
 def classify_email(install, subject, body):
     """
     Rule-based classifier. Returns a dict or the _IGNORE sentinel.
@@ -184,9 +358,8 @@ def classify_email(install, subject, body):
     text = f"{subject} {body}"
 
     # Silently skip internal / irrelevant emails
-    for pattern in _IGNORE_PATTERNS:
-        if pattern.search(subject):
-            return _IGNORE
+    if _is_ignored_subject(subject):
+        return _IGNORE
 
     # Always try to extract IC project number
     ic_match = _IC_NUM_RE.search(text)
@@ -194,18 +367,12 @@ def classify_email(install, subject, body):
 
     new_status = None
     confidence = "low"
-    note = ""
 
-    for rule in _RULES:
-        pattern, status, conf = rule[0], rule[1], rule[2]
-        search_text = subject if (len(rule) > 3 and rule[3]) else text
-        if pattern.search(search_text):
-            new_status = status
-            confidence = conf
-            note = f'Matched rule for "{status}" on subject: {subject!r}'
-            break
-
-    if not new_status:
+    rule = _first_matching_rule(subject, text)
+    if rule:
+        new_status, confidence = rule[1], rule[2]
+        note = f'Matched rule for "{new_status}" on subject: {subject!r}'
+    else:
         note = f"No status rule matched. Subject: {subject!r}"
 
     return {
@@ -216,6 +383,94 @@ def classify_email(install, subject, body):
     }
 
 
+# ── Classifier benchmark ─────────────────────────────────────────────────────
+# Debug check for the compiled classifier: runs it next to the plain _RULES
+# loop over a corpus, reports any email where the two disagree, and times both.
+
+_CORPUS_PHRASES = [
+    "Contingent Approval with upgrade", "contingent approval - as is", "Contingent approval to interconnect",
+    "meter change scheduled", "Permission to Operate", "PTO has been granted", "approval to energize",
+    "witness test completed", "witness test scheduled", "waiting for town approval", "municipal approval",
+    "fast track", "fasttrack", "on hold pending HEA", "application validation on hold", "placed on hold",
+    "Response Required:", "corrections received", "resubmitted for technical review", "technical review",
+    "resubmit RRES", "RRES review", "validation complete", "interconnection disclosure form",
+    "sent for your signature", "signature request", "Application Receipt", "RES Customer Education",
+    "Document for Interconnection Application has been completed", "signed application submitted",
+]
+_CORPUS_FILLER = [
+    "Dear customer,", "Thank you for your interconnection request.", "Please review the attached documents.",
+    "This mailbox is not monitored; do not reply.", "Your project INT-204518 at 12 Main St", "no upgrade required",
+    "before Permission to Operate can be issued", "Questions? Call 1-800-286-2000.", "Sincerely,",
+    "Distributed Generation Team", "Eversource Energy | 107 Selden Street, Berlin, CT", "Unsubscribe | Privacy Policy",
+    "we will contact you to schedule", "the application", "has been put on", "hold", "technical", "review", "RE:",
+    "This e-mail, including any attachments, is confidential and intended only for the addressee.",
+]
+_CORPUS_BREAKS = [" ", "  ", "\n", "\r\n", "\n\n", " \n \t", "\t"]
+
+
+def _synthetic_corpus(size=200, seed=0):
+    """
+    Utility-style emails: a status phrase in most subjects, a few more in
+    bodies, and long filler / footer text with near-miss keywords.
+    """
+    rng = random.Random(seed)
+
+    def piece(n, phrase_rate):
+        words = [rng.choice(_CORPUS_PHRASES if rng.random() < phrase_rate else _CORPUS_FILLER) for _ in range(n)]
+        words = [w.upper() if rng.random() < 0.1 else w for w in words]
+        return "".join(w + rng.choice(_CORPUS_BREAKS) for w in words)
+
+    corpus = []
+    for _ in range(size):
+        subject = piece(rng.randint(1, 3), 0.5).replace("\n", " ").strip()
+        body = piece(rng.randint(20, 120), 0.02)
+        if rng.random() < 0.5:
+            # HTML-stripped mail: long repeated footer / legal text
+            body += piece(rng.randint(20, 60), 0) * rng.randint(5, 40)
+        corpus.append({"subject": subject, "body": body})
+    return corpus
+
+
+def benchmark_classifier(emails=None, repeat=3):
+    """
+    Compare the compiled classifier with the plain _RULES loop over emails
+    ({"subject", "body"} dicts; defaults to _synthetic_corpus()). Returns the
+    emails where they disagree (should be none) and the time each took.
+    """
+    if emails is None:
+        emails = _synthetic_corpus()
+    texts = [(e.get("subject") or "", f'{e.get("subject") or ""} {e.get("body") or ""}') for e in emails]
+
+    mismatches = []
+    for (subject, text), email in zip(texts, emails):
+        expected = _first_matching_rule_reference(subject, text)
+        got = _first_matching_rule(subject, text)
+        if got is not expected:
+            mismatches.append({
+                "subject": subject,
+                "expected": expected[1] if expected else None,
+                "got": got[1] if got else None,
+            })
+
+    timings = {}
+    for name, fn in (("reference", _first_matching_rule_reference), ("compiled", _first_matching_rule)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for subject, text in texts:
+                fn(subject, text)
+        timings[name] = (time.perf_counter() - start) / max(1, repeat)
+
+    return {
+        "emails": len(texts),
+        "total_chars": sum(len(text) for _, text in texts),
+        "matched": sum(1 for subject, text in texts if _first_matching_rule(subject, text)),
+        "mismatches": mismatches,
+        "reference_ms": round(timings["reference"] * 1000, 2),
+        "compiled_ms": round(timings["compiled"] * 1000, 2),
+        "speedup": round(timings["reference"] / timings["compiled"], 1) if timings["compiled"] else None,
+    }
+
+
 # ── Zoho helpers ─────────────────────────────────────────────────────────────
 
 def _zoho_headers(token):
@@ -291,6 +546,44 @@ def fetch_existing_gmail_ids(install_id, token, api_domain):
     return seen
 
 
+def fetch_recorded_gmail_ids(token, api_domain, since=None):
+    """
+    Return {install_id: set of Gmail message IDs} for every IC_Monitor_Updates
+    record (or only those created at/after `since`, an ISO timestamp) in one
+    paginated COQL query, instead of a search per install. Pages are keyed
+    on id (id > last id seen) rather than a LIMIT offset, which COQL caps
+    at 10,000 rows.
+    """
+    criteria = "Name is not null"
+    if since:
+        criteria += f" and Created_Time >= '{since}'"
+    seen = {}
+    last_id = None
+    while True:
+        page_criteria = criteria if last_id is None else f"{criteria} and id > {last_id}"
+        resp = requests.post(
+            f"{api_domain}/crm/v2/coql",
+            headers=_zoho_headers(token),
+            json={"select_query": f"select id, Name, Install from IC_Monitor_Updates "
+                                  f"where {page_criteria} order by id asc limit 200"},
+            timeout=30,
+        )
+        if resp.status_code == 204:
+            break
+        resp.raise_for_status()
+        data = resp.json()
+        records = data.get("data", [])
+        for record in records:
+            install = record.get("Install")
+            install_id = install.get("id") if isinstance(install, dict) else install
+            if install_id and record.get("Name"):
+                seen.setdefault(str(install_id), set()).add(record["Name"])
+        if not records or not data.get("info", {}).get("more_records"):
+            break
+        last_id = records[-1]["id"]
+    return seen
+
+
 def add_ic_monitor_record(install_id, gmail_id, subject, body, classified_status, confidence, received_dt, token, api_domain):
     gmail_link = f"https://mail.google.com/mail/u/0/#all/{gmail_id}"
     record = {
@@ -409,40 +702,295 @@ def _extract_subject_body(msg):
     return subject, body, received_dt, sender
 
 
-def fetch_recent_emails_for_install(gmail, install):
-    q = _gmail_query_for_install(install)
-    name = install.get("Name", install.get("id"))
-    if not q:
-        logger.info(f"ic_monitor: no query built for {name} (missing address and IC number)")
-        return []
-    logger.info(f"ic_monitor: searching Gmail for {name!r} | query={q!r}")
-    result = (
-        gmail.users()
-        .messages()
-        .list(userId="me", q=q, maxResults=GMAIL_MAX_RESULTS)
-        .execute()
-    )
-    messages = result.get("messages", [])
-    logger.info(f"ic_monitor: {len(messages)} messages found for {name!r}")
-    emails = []
-    for m in messages:
-        full = (
+def _current_history_id(gmail):
+    return str(gmail.users().getProfile(userId="me").execute()["historyId"])
+
+
+def _label_id(gmail, name=GMAIL_LABEL):
+    for label in gmail.users().labels().list(userId="me").execute().get("labels", []):
+        if label.get("name") == name:
+            return label["id"]
+    return None
+
+
+def list_label_message_ids(gmail):
+    """Ids of every message under GMAIL_LABEL from the last GMAIL_LOOKBACK_DAYS — one paginated list."""
+    ids = []
+    page_token = None
+    while True:
+        resp = (
             gmail.users()
             .messages()
-            .get(userId="me", id=m["id"], format="full")
+            .list(userId="me", q=f"label:{GMAIL_LABEL} newer_than:{GMAIL_LOOKBACK_DAYS}d",
+                  maxResults=500, pageToken=page_token)
             .execute()
         )
-        subject, body, received_dt, sender = _extract_subject_body(full)
-        emails.append({"id": m["id"], "subject": subject, "body": body, "received_dt": received_dt, "sender": sender})
-    return emails
+        ids.extend(m["id"] for m in resp.get("messages", []))
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            break
+    return ids
+
+
+def fetch_new_message_ids(gmail, start_history_id, label_id):
+    """
+    Ids of messages that arrived under label_id (or were given it) since
+    start_history_id, oldest first. Returns None when the checkpoint is too
+    old for Gmail to replay (404), in which case the caller does a full rescan.
+    """
+    ids = []
+    seen = set()
+    page_token = None
+    while True:
+        try:
+            resp = (
+                gmail.users()
+                .history()
+                .list(userId="me", startHistoryId=start_history_id, labelId=label_id,
+                      historyTypes=["messageAdded", "labelAdded"], pageToken=page_token)
+                .execute()
+            )
+        except HttpError as e:
+            if getattr(e, "resp", None) is not None and e.resp.status == 404:
+                return None
+            raise
+        for h in resp.get("history", []):
+            added = [a.get("message", {}) for a in h.get("messagesAdded", [])]
+            added += [a.get("message", {}) for a in h.get("labelsAdded", [])
+                      if label_id in (a.get("labelIds") or [])]
+            for msg in added:
+                labels = set(msg.get("labelIds") or [])
+                # messages.list searches skip spam and trash, so history does too
+                if msg.get("id") and msg["id"] not in seen and not labels & {"SPAM", "TRASH"}:
+                    seen.add(msg["id"])
+                    ids.append(msg["id"])
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            break
+    return ids
+
+
+def _batch_get_messages(gmail, message_ids, **get_kwargs):
+    """
+    messages.get for many ids through Gmail's batch HTTP endpoint,
+    GMAIL_BATCH_SIZE per round trip. Ids that fail — individually, or with
+    their whole batch when the round trip itself errors — are retried once
+    in a follow-up batch after GMAIL_RETRY_BACKOFF_SECONDS. Returns
+    ({id: message}, [ids that still failed]).
+    """
+    results = {}
+    pending = list(message_ids)
+    failed = []
+    for attempt in range(2):
+        if attempt:
+            time.sleep(GMAIL_RETRY_BACKOFF_SECONDS + random.uniform(0, 1))
+        failed = []
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                logger.warning(f"ic_monitor: Gmail get failed for message {request_id}: {exception}")
+                failed.append(request_id)
+            else:
+                results[request_id] = response
+
+        for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+            chunk = pending[start:start + GMAIL_BATCH_SIZE]
+            batch = gmail.new_batch_http_request(callback=callback)
+            for message_id in chunk:
+                batch.add(gmail.users().messages().get(userId="me", id=message_id, **get_kwargs),
+                          request_id=message_id)
+            try:
+                batch.execute()
+            except Exception as e:
+                # Transport / batch-level failure: whatever the callback didn't see is lost
+                lost = [m for m in chunk if m not in results and m not in failed]
+                logger.warning(f"ic_monitor: Gmail batch of {len(chunk)} failed ({e}); {len(lost)} ids to retry")
+                failed.extend(lost)
+        if not failed:
+            break
+        pending = failed
+    return results, failed
+
+
+def fetch_emails(gmail, message_ids):
+    """
+    Fetch messages in two batched passes: format=metadata (From, Subject)
+    for everything, then format=full only for messages that can still
+    produce a record. Utility-sender emails whose subject matches
+    _IGNORE_PATTERNS are dropped after the first pass — the run would skip
+    them anyway. Returns (emails in message_ids order, ignored count, failed ids).
+    """
+    meta, failed = _batch_get_messages(gmail, message_ids, format="metadata",
+                                       metadataHeaders=["From", "Subject"])
+    wanted = []
+    ignored = 0
+    for message_id in message_ids:
+        msg = meta.get(message_id)
+        if msg is None:
+            continue
+        headers = {h["name"]: h["value"] for h in msg.get("payload", {}).get("headers", [])}
+        if _is_utility_sender(headers.get("From", "")) and _is_ignored_subject(headers.get("Subject", "")):
+            ignored += 1
+            continue
+        wanted.append(message_id)
+
+    full, failed_full = _batch_get_messages(gmail, wanted, format="full")
+    emails = []
+    for message_id in wanted:
+        msg = full.get(message_id)
+        if msg is None:
+            continue
+        subject, body, received_dt, sender = _extract_subject_body(msg)
+        emails.append({"id": message_id, "subject": subject, "body": body, "received_dt": received_dt,
+                       "sender": sender, "internal_ms": int(msg.get("internalDate") or 0)})
+    return emails, ignored, failed + failed_full
+
+
+# ── Routing ──────────────────────────────────────────────────────────────────
+# Every message under the label is matched to installs locally, the same way
+# _gmail_query_for_install would find it: by IC project number when the
+# install has one, otherwise by the street part of Site_Location. Street
+# fragments are normalized (case, punctuation, common suffix abbreviations)
+# and indexed by house number, so an email is only compared with the streets
+# whose number appears in it.
+
+_STREET_ABBREVIATIONS = {
+    "street": "st", "road": "rd", "avenue": "ave", "drive": "dr", "lane": "ln",
+    "court": "ct", "boulevard": "blvd", "place": "pl", "terrace": "ter",
+    "circle": "cir", "highway": "hwy", "turnpike": "tpke", "parkway": "pkwy",
+    "extension": "ext", "north": "n", "south": "s", "east": "e", "west": "w",
+}
+
+
+def _normalize_street(text):
+    tokens = re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).split()
+    return " ".join(_STREET_ABBREVIATIONS.get(t, t) for t in tokens)
+
+
+def build_route_index(watchlist):
+    """
+    {"ic": {IC number: [install ids]}, "street": {house number: [(street, install id)]},
+     "other": [(needle, install id)]} from the watchlist.
+    """
+    index = {"ic": {}, "street": {}, "other": []}
+    for install in watchlist:
+        ic_num = (install.get("IC_Project_Number") or "").strip()
+        if ic_num:
+            if _IC_NUM_RE.fullmatch(ic_num):
+                index["ic"].setdefault(ic_num.upper(), []).append(install["id"])
+            else:
+                index["other"].append((_normalize_street(ic_num), install["id"]))
+            continue
+        address = (install.get("Site_Location") or "").strip()
+        street = _normalize_street(address.split(",")[0] if address else "")
+        if not street:
+            continue
+        number = street.split()[0]
+        if number.isdigit():
+            index["street"].setdefault(number, []).append((street, install["id"]))
+        else:
+            index["other"].append((street, install["id"]))
+    return index
+
+
+def route_email(index, email):
+    """Ids of the watchlist installs an email belongs to."""
+    text = f"{email['subject']} {email['body']}"
+    install_ids = set()
+    for m in _IC_NUM_RE.finditer(text):
+        install_ids.update(index["ic"].get(m.group(1).upper(), ()))
+    if index["street"] or index["other"]:
+        normalized = f" {_normalize_street(text)} "
+        for number in set(re.findall(r"\d+", normalized)) & index["street"].keys():
+            for street, install_id in index["street"][number]:
+                if f" {street} " in normalized:
+                    install_ids.add(install_id)
+        for needle, install_id in index["other"]:
+            if f" {needle} " in normalized:
+                install_ids.add(install_id)
+    return install_ids
+
+
+# ── Persisted state ──────────────────────────────────────────────────────────
+
+def _read_state_file(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"ic_monitor: could not read {path} ({e}) — starting fresh")
+        return None
+
+
+def _write_state_file(path, data):
+    try:
+        os.makedirs(IC_STATE_DIR, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({**data, "saved_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"ic_monitor: could not write {path} ({e})")
+
+
+# The checkpoint holds the historyId a run started from plus the Gmail query
+# each watchlist install had then. An install that is new to the watchlist, or
+# whose IC number / address changed, is also routed the label sweep's older
+# mail next run, since the history replay only covers mail that arrived after
+# the checkpoint. A run with any failed Gmail fetch or Zoho write keeps the old
+# checkpoint so the next run replays the same mail; retry_ids lists emails
+# whose Zoho write failed, to be downloaded again even if another install
+# already recorded them.
+
+def _load_checkpoint():
+    """Return {"history_id", "queries": {install_id: query}, "retry_ids"} or None."""
+    data = _read_state_file(IC_CHECKPOINT_FILE)
+    return data if data and data.get("history_id") else None
+
+
+def _save_checkpoint(history_id, queries, retry_ids=()):
+    _write_state_file(IC_CHECKPOINT_FILE, {"history_id": history_id, "queries": queries,
+                                           "retry_ids": sorted(retry_ids)})
+
+
+# The dedupe index ({install_id: Gmail ids already in IC_Monitor_Updates}) is
+# kept on disk and topped up each run with the records created since the last
+# sync (one COQL query); ids recorded during the run are added as they're
+# written. full=True (full rescans) rebuilds it from every record, which also
+# picks up records deleted in Zoho to force a re-run.
+
+def load_seen_index(token, api_domain, full=False):
+    """Return ({install_id: set of Gmail ids}, sync timestamp to save with it)."""
+    synced_at = datetime.datetime.now(datetime.timezone.utc)
+    state = None if full else _read_state_file(IC_SEEN_FILE)
+    if not state or not state.get("synced_at"):
+        return fetch_recorded_gmail_ids(token, api_domain), synced_at
+    since = (datetime.datetime.fromisoformat(state["synced_at"])
+             - datetime.timedelta(hours=IC_SEEN_OVERLAP_HOURS))
+    seen = {install_id: set(ids) for install_id, ids in (state.get("seen") or {}).items()}
+    delta = fetch_recorded_gmail_ids(token, api_domain, since=since.strftime("%Y-%m-%dT%H:%M:%S+00:00"))
+    for install_id, ids in delta.items():
+        seen.setdefault(install_id, set()).update(ids)
+    return seen, synced_at
+
+
+def save_seen_index(seen, synced_at):
+    _write_state_file(IC_SEEN_FILE, {
+        "synced_at": synced_at.isoformat(),
+        "seen": {install_id: sorted(ids) for install_id, ids in seen.items()},
+    })
 
 
 # ── Orchestration ─────────────────────────────────────────────────────────────
 
-def run_ic_monitor(get_zoho_token_fn):
+def run_ic_monitor(get_zoho_token_fn, full_rescan=False):
     """
     Main entry point. Pass in get_zoho_access_token from main.py to avoid
-    a circular import at module load time.
+    a circular import at module load time. full_rescan=True ignores the
+    historyId checkpoint and sweeps the label's last GMAIL_LOOKBACK_DAYS
+    for every install again.
     """
     token = get_zoho_token_fn()
     if not token:
@@ -463,26 +1011,101 @@ def run_ic_monitor(get_zoho_token_fn):
     emails_processed = 0
     records_updated = 0
     flagged_for_review = 0
+    zoho_failures = 0
+    zoho_failed_ids = set()
+
+    label_id = _label_id(gmail)
+    if not label_id:
+        logger.error(f"ic_monitor: Gmail label {GMAIL_LABEL!r} not found")
+        return {"status": "failed", "reason": f"Gmail label {GMAIL_LABEL} not found"}
+
+    # Record where this run starts so the next one picks up from here; mail
+    # arriving mid-run is seen again next time and deduped by Gmail id.
+    run_history_id = _current_history_id(gmail)
+    queries = {install["id"]: _gmail_query_for_install(install) for install in watchlist}
+    checkpoint = None if full_rescan else _load_checkpoint()
+    new_ids = fetch_new_message_ids(gmail, checkpoint["history_id"], label_id) if checkpoint else None
+    if new_ids is None:
+        if checkpoint:
+            logger.warning(f"ic_monitor: checkpoint {checkpoint['history_id']} expired — doing a full rescan")
+        mode = "full_rescan"
+        new_ids = []
+        rescan_ids = set(queries)
+    else:
+        mode = "incremental"
+        logger.info(f"ic_monitor: {len(new_ids)} new messages since history {checkpoint['history_id']}")
+        known = checkpoint.get("queries") or {}
+        rescan_ids = {iid for iid, q in queries.items() if iid not in known or known[iid] != q}
+        if rescan_ids:
+            logger.info(f"ic_monitor: {len(rescan_ids)} new or changed installs get the lookback sweep")
+    sweep_ids = list_label_message_ids(gmail) if rescan_ids else []
+
+    # Gmail IDs already recorded in IC_Monitor_Updates, for every install at
+    # once; if the bulk read fails, fall back to a search per install
+    candidate_ids = list(dict.fromkeys(new_ids + sweep_ids))
+    seen_index = seen_synced_at = None
+    if candidate_ids:
+        try:
+            seen_index, seen_synced_at = load_seen_index(token, api_domain, full=full_rescan)
+        except Exception:
+            logger.exception("ic_monitor: bulk read of IC monitor records failed — searching per install")
+
+    # Don't download mail that can't produce a new record. Sweep mail only
+    # routes to the installs being rescanned, so it is skipped once every one
+    # of them has it; history mail is skipped once any install has it (an
+    # install new to the watchlist still gets it through the sweep).
+    # Emails whose Zoho write failed last run are downloaded again even if
+    # another install they route to already recorded them
+    retry_ids = set((checkpoint or {}).get("retry_ids") or [])
+    already_recorded = 0
+    if seen_index is not None:
+        recorded_by = {}
+        for install_id, ids in seen_index.items():
+            for gmail_id in ids:
+                recorded_by.setdefault(gmail_id, set()).add(install_id)
+        swept = set(sweep_ids)
+        to_fetch = [i for i in candidate_ids if not recorded_by.get(i) or i in retry_ids
+                    or (i in swept and not rescan_ids <= recorded_by[i])]
+        already_recorded = len(candidate_ids) - len(to_fetch)
+        candidate_ids = to_fetch
+        del recorded_by
+        if already_recorded:
+            logger.info(f"ic_monitor: {already_recorded} messages already recorded — not downloaded")
+
+    # Fetch each message once and route it: new mail goes to every install it
+    # matches, older mail from the sweep only to installs being (re)scanned.
+    index = build_route_index(watchlist)
+    fresh = set(new_ids)
+    emails_by_install = {}
+    emails, ignored_early, failed_ids = fetch_emails(gmail, candidate_ids)
+    gmail_failures = len(failed_ids)
+    for email in emails:
+        for install_id in route_email(index, email):
+            if email["id"] in fresh or install_id in rescan_ids:
+                emails_by_install.setdefault(install_id, []).append(email)
+    for install_id, emails in emails_by_install.items():
+        emails.sort(key=lambda e: e["internal_ms"], reverse=True)
+        if install_id in rescan_ids:
+            # Same cap the per-install search had
+            del emails[GMAIL_MAX_RESULTS:]
 
     for install in watchlist:
         install_id = install["id"]
         name = install.get("Name", install_id)
-
-        try:
-            emails = fetch_recent_emails_for_install(gmail, install)
-        except Exception:
-            logger.exception(f"ic_monitor: Gmail fetch failed for {name}")
-            continue
+        emails = emails_by_install.get(install_id, [])
 
         if not emails:
             continue
 
-        # Fetch existing IC Monitor record Gmail IDs to avoid duplicates across runs
-        try:
-            seen_gmail_ids = fetch_existing_gmail_ids(install_id, token, api_domain)
-        except Exception:
-            logger.exception(f"ic_monitor: failed to fetch existing IC monitor records for {name}")
-            seen_gmail_ids = set()
+        # Existing IC Monitor record Gmail IDs, to avoid duplicates across runs
+        if seen_index is not None:
+            seen_gmail_ids = seen_index.setdefault(install_id, set())
+        else:
+            try:
+                seen_gmail_ids = fetch_existing_gmail_ids(install_id, token, api_domain)
+            except Exception:
+                logger.exception(f"ic_monitor: failed to fetch existing IC monitor records for {name}")
+                seen_gmail_ids = set()
 
         # Gmail returns emails newest-first. Lock in the status from the first
         # (most recent) email that produces a classification so that older emails
@@ -505,7 +1128,10 @@ def run_ic_monitor(get_zoho_token_fn):
                         install_id, email["id"], email["subject"], email["body"],
                         "Non-utility email", "low", email["received_dt"], token, api_domain,
                     )
+                    seen_gmail_ids.add(email["id"])
                 except Exception:
+                    zoho_failures += 1
+                    zoho_failed_ids.add(email["id"])
                     logger.exception(f"ic_monitor: record write failed for non-utility email {name}")
                 continue
 
@@ -526,7 +1152,10 @@ def run_ic_monitor(get_zoho_token_fn):
                         install_id, email["id"], email["subject"], email["body"],
                         "Needs Review", confidence, email["received_dt"], token, api_domain,
                     )
+                    seen_gmail_ids.add(email["id"])
                 except Exception:
+                    zoho_failures += 1
+                    zoho_failed_ids.add(email["id"])
                     logger.exception(f"ic_monitor: record write failed for {name}")
                 flagged_for_review += 1
                 continue
@@ -565,22 +1194,53 @@ def run_ic_monitor(get_zoho_token_fn):
                     records_updated += 1
                     logger.info(f"ic_monitor: updated {name} — {updates}")
                 except Exception:
+                    # No record either, so the replay next run retries this email;
+                    # lock so an older email can't apply its status meanwhile
+                    zoho_failures += 1
+                    zoho_failed_ids.add(email["id"])
+                    status_locked = True
                     logger.exception(f"ic_monitor: field update failed for {name}")
+                    continue
 
             try:
                 add_ic_monitor_record(
                     install_id, email["id"], email["subject"], email["body"],
                     new_status, confidence, email["received_dt"], token, api_domain,
                 )
+                seen_gmail_ids.add(email["id"])
             except Exception:
+                zoho_failures += 1
+                zoho_failed_ids.add(email["id"])
                 logger.exception(f"ic_monitor: record write failed for {name}")
 
+    # Only advance the checkpoint if every Gmail fetch and Zoho write
+    # succeeded; otherwise the next run replays from the old one (or rescans
+    # if there was none) and the dedupe index skips what was recorded
+    if gmail_failures or zoho_failures:
+        logger.warning(f"ic_monitor: {gmail_failures} Gmail fetches and {zoho_failures} Zoho writes failed "
+                       f"— checkpoint not advanced")
+        if checkpoint and zoho_failed_ids:
+            _save_checkpoint(checkpoint["history_id"], checkpoint.get("queries") or {},
+                             retry_ids | zoho_failed_ids)
+    else:
+        _save_checkpoint(run_history_id, queries)
+    if seen_index is not None:
+        save_seen_index(seen_index, seen_synced_at)
+
     summary = {
         "status": "ok",
+        "mode": mode,
         "watchlist": len(watchlist),
+        "new_messages": len(new_ids) if mode == "incremental" else None,
+        "swept_messages": len(sweep_ids),
+        "installs_rescanned": len(rescan_ids),
+        "ignored_before_download": ignored_early,
+        "already_recorded": already_recorded,
         "emails_processed": emails_processed,
         "records_updated": records_updated,
         "flagged_for_review": flagged_for_review,
+        "gmail_failures": gmail_failures,
+        "zoho_failures": zoho_failures,
     }
     logger.info(f"ic_monitor: complete — {summary}")
     return summary
@@ -1,14 +1,23 @@
 from fastapi import FastAPI, Request, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from urllib.parse import quote
 import os
 import re
 import requests
 import datetime
 import json
+import hashlib
+import sqlite3
 import time
+import random
+import threading
+import uuid
+from collections import deque
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+import google_auth_httplib2
+import httplib2
 from googleapiclient.errors import HttpError
 
 import logging
@@ -32,7 +41,7 @@ scheduler = AsyncIOScheduler()
 
 @app.on_event("startup")
 async def start_scheduler():
-    scheduler.add_job(update_pipeline, "cron", hour=7, minute=0)
+    scheduler.add_job(_scheduled_update_pipeline, "cron", hour=7, minute=0)
     scheduler.start()
     logger.info("Scheduler started — pipeline will refresh daily at 07:00 UTC")
 
@@ -1998,6 +2007,45 @@ def get_aurora_partner_map():
     return {p["id"]: p["name"] for p in response.json().get("partners", [])}
 
 
+# ------------------------
+# Aurora rate limit
+# ------------------------
+# Every Aurora GET made by the batch paths (pull_pricing / pull_design* /
+# _aurora_get_with_retry) first takes a slot in a shared sliding 60-second
+# window, so concurrent fetch workers together stay under the tenant's
+# per-minute limit instead of tripping 429s.
+AURORA_REQUESTS_PER_MINUTE = int(os.getenv("AURORA_REQUESTS_PER_MINUTE", "240"))
+
+_AURORA_RATE_LOCK = threading.Lock()
+_AURORA_RATE_WINDOW: deque = deque()
+_AURORA_USAGE: dict = {"requests": 0, "retries": 0, "throttled_seconds": 0.0}
+
+
+def _aurora_rate_acquire() -> None:
+    """Block until one more Aurora request fits in the 60-second window."""
+    waited = 0.0
+    while True:
+        with _AURORA_RATE_LOCK:
+            now = time.monotonic()
+            while _AURORA_RATE_WINDOW and now - _AURORA_RATE_WINDOW[0] >= 60.0:
+                _AURORA_RATE_WINDOW.popleft()
+            if len(_AURORA_RATE_WINDOW) < AURORA_REQUESTS_PER_MINUTE:
+                _AURORA_RATE_WINDOW.append(now)
+                _AURORA_USAGE["requests"] += 1
+                _AURORA_USAGE["throttled_seconds"] += waited
+                return
+            sleep_for = 60.0 - (now - _AURORA_RATE_WINDOW[0]) + 0.05
+        logger.info(f"aurora_rate: limit reached, pacing {sleep_for:.1f}s")
+        time.sleep(sleep_for)
+        waited += sleep_for
+
+
+def _aurora_usage() -> dict:
+    """Snapshot of cumulative Aurora request usage since process start."""
+    with _AURORA_RATE_LOCK:
+        return dict(_AURORA_USAGE)
+
+
 def aurora_headers():
     return {
         "Authorization": f"Bearer {os.getenv('AURORA_API_KEY')}",
@@ -2008,18 +2056,21 @@ def aurora_headers():
 def pull_design(design_id):
     tenant_id = os.getenv("AURORA_TENANT_ID")
     url = f"https://api.aurorasolar.com/tenants/{tenant_id}/designs/{design_id}?include_layout=true"
+    _aurora_rate_acquire()
     return requests.get(url, headers=aurora_headers())
 
 
 def pull_design_summary(design_id):
     tenant_id = os.getenv("AURORA_TENANT_ID")
     url = f"https://api.aurorasolar.com/tenants/{tenant_id}/designs/{design_id}/summary"
+    _aurora_rate_acquire()
     return requests.get(url, headers=aurora_headers())
 
 
 def pull_pricing(design_id):
     tenant_id = os.getenv("AURORA_TENANT_ID")
     url = f"https://api.aurorasolar.com/tenants/{tenant_id}/designs/{design_id}/pricing"
+    _aurora_rate_acquire()
     return requests.get(url, headers=aurora_headers())
 
 
@@ -2033,6 +2084,7 @@ def _aurora_get_with_retry(url, max_retries=5):
     backoff = 1.0
     resp = None
     for attempt in range(max_retries):
+        _aurora_rate_acquire()
         resp = requests.get(url, headers=aurora_headers())
         if resp.status_code != 429:
             return resp
@@ -2045,6 +2097,9 @@ def _aurora_get_with_retry(url, max_retries=5):
             f"Aurora 429 — sleeping {sleep_for:.1f}s before retry "
             f"(attempt {attempt + 1}/{max_retries}) | url={url}"
         )
+        with _AURORA_RATE_LOCK:
+            _AURORA_USAGE["retries"] += 1
+            _AURORA_USAGE["throttled_seconds"] += sleep_for
         time.sleep(sleep_for)
         backoff = min(backoff * 2, 30.0)
     return resp
@@ -2605,26 +2660,23 @@ def _upsert_overrides_materials(proj_id: str, customer: str, materials_actual: f
         raise RuntimeError("Could not build Sheets service")
     sheets = svc.spreadsheets()
 
-    data = sheets.values().get(
-        spreadsheetId=CASHFLOW_SHEET_ID,
-        range=f"'{CASHFLOW_OVERRIDES_TAB}'!A2:N200",
-        valueRenderOption="FORMATTED_VALUE",
-    ).execute().get("values", [])
+    rows = list(_iter_tab_rows(svc, CASHFLOW_SHEET_ID, CASHFLOW_OVERRIDES_TAB, "O", first_row=2))
+    index = _index_rows_by_project_id(rows, 0)
 
-    for i, row in enumerate(data):
-        if row and str(row[0]).strip() == proj_id:
-            # Update col J on existing row (preserve K and L)
-            sheets.values().update(
-                spreadsheetId=CASHFLOW_SHEET_ID,
-                range=f"'{CASHFLOW_OVERRIDES_TAB}'!J{i + 2}",
-                valueInputOption="USER_ENTERED",
-                body={"values": [[materials_actual]]},
-            ).execute()
-            logger.info(f"_upsert_overrides_materials: updated row {i+2} for {proj_id} → {materials_actual}")
-            return
+    if proj_id in index:
+        row_num = index[proj_id][0]
+        # Update col J on existing row (preserve K and L)
+        sheets.values().update(
+            spreadsheetId=CASHFLOW_SHEET_ID,
+            range=f"'{CASHFLOW_OVERRIDES_TAB}'!J{row_num}",
+            valueInputOption="USER_ENTERED",
+            body={"values": [[materials_actual]]},
+        ).execute()
+        logger.info(f"_upsert_overrides_materials: updated row {row_num} for {proj_id} → {materials_actual}")
+        return
 
     # Not found — append new row (cols A:L, K and L blank)
-    next_row = len(data) + 2
+    next_row = (rows[-1][0] if rows else 1) + 1
     sheets.values().update(
         spreadsheetId=CASHFLOW_SHEET_ID,
         range=f"'{CASHFLOW_OVERRIDES_TAB}'!A{next_row}:L{next_row}",
@@ -3277,10 +3329,11 @@ async def aurora_webhook(request: Request):
 # ------------------------
 
 @app.post("/run-ic-monitor")
-async def run_ic_monitor_endpoint(background_tasks: BackgroundTasks):
+async def run_ic_monitor_endpoint(background_tasks: BackgroundTasks, full_rescan: bool = False):
+    """Run the IC monitor; ?full_rescan=true ignores the Gmail history checkpoint."""
     from ic_monitor import run_ic_monitor
-    background_tasks.add_task(run_ic_monitor, get_zoho_access_token)
-    return {"status": "ic monitor started"}
+    background_tasks.add_task(run_ic_monitor, get_zoho_access_token, full_rescan)
+    return {"status": "ic monitor started", "full_rescan": full_rescan}
 
 
 @app.post("/clean-ic-notes")
@@ -3289,6 +3342,38 @@ async def clean_ic_notes_endpoint(background_tasks: BackgroundTasks):
     background_tasks.add_task(clean_ic_notes, get_zoho_access_token)
     return {"status": "ic note cleanup started"}
 
+
+# Upper bounds for /ic-monitor/classifier-benchmark's size and repeat, so one
+# request can't tie up a worker (or pull thousands of Gmail messages)
+IC_BENCHMARK_MAX_SIZE = 500
+IC_BENCHMARK_MAX_REPEAT = 3
+
+
+@app.get("/ic-monitor/classifier-benchmark")
+def ic_classifier_benchmark(source: str = "synthetic", size: int = 200, repeat: int = 3):
+    """
+    Debug: run the compiled IC email classifier next to the plain rule loop,
+    list any email they classify differently and time both.
+    ?source=gmail uses up to `size` messages under the _INTERCONNECTIONS label
+    instead of the generated corpus. size and repeat are clamped to
+    IC_BENCHMARK_MAX_SIZE / IC_BENCHMARK_MAX_REPEAT.
+    """
+    import ic_monitor
+    size = max(1, min(size, IC_BENCHMARK_MAX_SIZE))
+    repeat = max(1, min(repeat, IC_BENCHMARK_MAX_REPEAT))
+    if source == "gmail":
+        gmail = ic_monitor._build_gmail_service()
+        message_ids = ic_monitor.list_label_message_ids(gmail)[:size]
+        emails, _, failed = ic_monitor.fetch_emails(gmail, message_ids)
+        if failed:
+            logger.warning(f"Classifier benchmark: {len(failed)} Gmail messages could not be fetched")
+    elif source == "synthetic":
+        emails = ic_monitor._synthetic_corpus(size=size)
+    else:
+        return {"error": f"unknown source {source!r} (use synthetic or gmail)"}
+    return {"source": source, **ic_monitor.benchmark_classifier(emails, repeat=repeat),
+            "size": size, "repeat": repeat}
+
 # ------------------------
 # Commissions Data Endpoint
 # ------------------------
@@ -3485,33 +3570,353 @@ SHEETS_IMPERSONATE_EMAIL = "hdohnert@helio.solar"
 COMMISSION_PPW_FLOOR = 2.50
 
 
+# ------------------------
+# Sheets quota scheduler
+# ------------------------
+# Google meters the Sheets API per minute, separately for reads and writes
+# (60/min per user by default). Every client handed out by
+# _build_sheets_service() runs .execute() through this scheduler: calls are
+# paced to stay under the per-minute quota, 429/503 responses are retried with
+# jittered exponential backoff, and usage is tallied per spreadsheet so each
+# run can report what it spent.
+SHEETS_READS_PER_MINUTE = int(os.getenv("SHEETS_READS_PER_MINUTE", "60"))
+SHEETS_WRITES_PER_MINUTE = int(os.getenv("SHEETS_WRITES_PER_MINUTE", "60"))
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "6"))
+
+_SHEETS_READ_METHODS = {"get", "batchGet", "getByDataFilter", "batchGetByDataFilter"}
+
+_SHEETS_QUOTA_LOCK = threading.Lock()
+_SHEETS_QUOTA_WINDOWS: dict = {"read": deque(), "write": deque()}
+_SHEETS_QUOTA_USAGE: dict = {
+    "reads": 0, "writes": 0, "retries": 0, "throttled_seconds": 0.0, "by_sheet": {},
+}
+
+
+def _sheets_quota_acquire(kind: str, spreadsheet_id) -> None:
+    """
+    Block until a `kind` ("read" or "write") call fits in the sliding
+    60-second window, then record it against spreadsheet_id.
+    """
+    limit = SHEETS_READS_PER_MINUTE if kind == "read" else SHEETS_WRITES_PER_MINUTE
+    waited = 0.0
+    while True:
+        with _SHEETS_QUOTA_LOCK:
+            window = _SHEETS_QUOTA_WINDOWS[kind]
+            now = time.monotonic()
+            while window and now - window[0] >= 60.0:
+                window.popleft()
+            if len(window) < limit:
+                window.append(now)
+                _SHEETS_QUOTA_USAGE[kind + "s"] += 1
+                _SHEETS_QUOTA_USAGE["throttled_seconds"] += waited
+                per_sheet = _SHEETS_QUOTA_USAGE["by_sheet"].setdefault(
+                    spreadsheet_id or "unknown", {"reads": 0, "writes": 0}
+                )
+                per_sheet[kind + "s"] += 1
+                return
+            sleep_for = 60.0 - (now - window[0]) + 0.05
+        logger.info(f"sheets_quota: {kind} quota full, pacing {sleep_for:.1f}s | sheet={spreadsheet_id}")
+        time.sleep(sleep_for)
+        waited += sleep_for
+
+
+def _sheets_execute(request, kind: str, spreadsheet_id, **kwargs):
+    """
+    Execute a googleapiclient request under the quota scheduler. 429 and 503
+    are retried with exponential backoff (1s doubling, capped at 32s) plus up
+    to 1s of random jitter; anything else propagates to the caller unchanged.
+    """
+    backoff = 1.0
+    for attempt in range(SHEETS_MAX_RETRIES + 1):
+        _sheets_quota_acquire(kind, spreadsheet_id)
+        try:
+            return request.execute(**kwargs)
+        except HttpError as e:
+            status = int(getattr(e.resp, "status", 0) or 0)
+            if status not in (429, 503) or attempt >= SHEETS_MAX_RETRIES:
+                raise
+            sleep_for = backoff + random.uniform(0, 1.0)
+            logger.warning(
+                f"sheets_quota: HTTP {status} — sleeping {sleep_for:.1f}s before retry "
+                f"(attempt {attempt + 1}/{SHEETS_MAX_RETRIES}) | sheet={spreadsheet_id}"
+            )
+            with _SHEETS_QUOTA_LOCK:
+                _SHEETS_QUOTA_USAGE["retries"] += 1
+                _SHEETS_QUOTA_USAGE["throttled_seconds"] += sleep_for
+            time.sleep(sleep_for)
+            backoff = min(backoff * 2, 32.0)
+
+
+def _sheets_quota_usage() -> dict:
+    """Snapshot of cumulative Sheets usage since process start."""
+    with _SHEETS_QUOTA_LOCK:
+        snap = {k: v for k, v in _SHEETS_QUOTA_USAGE.items() if k != "by_sheet"}
+        snap["by_sheet"] = {sid: dict(c) for sid, c in _SHEETS_QUOTA_USAGE["by_sheet"].items()}
+    return snap
+
+
+def _sheets_quota_usage_since(before: dict) -> dict:
+    """
+    Sheets usage accrued since the `before` snapshot — what a run reports in
+    its result dict. Counts are process-wide, so overlapping runs see each
+    other's calls.
+    """
+    now = _sheets_quota_usage()
+    by_sheet = {}
+    for sid, counts in now["by_sheet"].items():
+        prev = before["by_sheet"].get(sid, {})
+        delta = {k: counts[k] - prev.get(k, 0) for k in ("reads", "writes")}
+        if delta["reads"] or delta["writes"]:
+            by_sheet[sid] = delta
+    return {
+        "reads": now["reads"] - before["reads"],
+        "writes": now["writes"] - before["writes"],
+        "retries": now["retries"] - before["retries"],
+        "throttled_seconds": round(now["throttled_seconds"] - before["throttled_seconds"], 1),
+        "by_sheet": by_sheet,
+    }
+
+
+class _PacedSheetsResource:
+    """
+    Wraps a googleapiclient Resource so that every request built from it
+    (at any depth: spreadsheets().values().get(...)) executes through the
+    quota scheduler. Call sites keep using the normal client API.
+    """
+
+    def __init__(self, resource, http=None):
+        self._resource = resource
+        self._http = http
+
+    def __getattr__(self, name):
+        attr = getattr(self._resource, name)
+        if not callable(attr):
+            return attr
+
+        def _call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                kind = "read" if name in _SHEETS_READ_METHODS else "write"
+                return _PacedSheetsRequest(result, kind, kwargs.get("spreadsheetId"), self._http)
+            return _PacedSheetsResource(result, self._http)
+
+        return _call
+
+
+class _PacedSheetsRequest:
+    """A single Sheets request whose execute() is paced and retried."""
+
+    def __init__(self, request, kind: str, spreadsheet_id, http=None):
+        self._request = request
+        self._kind = kind
+        self._spreadsheet_id = spreadsheet_id
+        self._http = http
+
+    def execute(self, **kwargs):
+        if self._http is not None:
+            kwargs.setdefault("http", self._http)
+        return _sheets_execute(self._request, self._kind, self._spreadsheet_id, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
 _SHEETS_SERVICE_CACHE = None
+_SHEETS_CREDENTIALS = None
+_SHEETS_SERVICE_LOCK = threading.Lock()
 
-def _build_sheets_service():
+def _build_sheets_service(fresh: bool = False):
     """
     Build a Sheets API v4 client using the service account directly (no impersonation).
     The sheet must be shared with the service account email as Editor.
     Cached as a module-level singleton to avoid rebuilding the discovery document
-    (~50MB overhead) on every request.
+    (~50MB overhead) on every request. The client is wrapped so all calls go
+    through the Sheets quota scheduler.
+
+    fresh=True returns a client for another worker thread: the same cached
+    discovery client, but executing over its own authorized httplib2
+    connection — httplib2.Http is what isn't thread-safe, not the Resource.
+    Anything that runs off the event loop (job bodies under _run_job, sync
+    endpoints in the threadpool) must use fresh=True; only async handlers,
+    which all share the loop's thread, use the cached client.
     """
-    global _SHEETS_SERVICE_CACHE
-    if _SHEETS_SERVICE_CACHE is not None:
+    global _SHEETS_SERVICE_CACHE, _SHEETS_CREDENTIALS
+    with _SHEETS_SERVICE_LOCK:
+        if _SHEETS_SERVICE_CACHE is None:
+            raw = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
+            if not raw:
+                logger.error("GOOGLE_SERVICE_ACCOUNT_JSON env var is missing")
+                return None
+            try:
+                info = json.loads(raw)
+            except ValueError:
+                logger.exception("GOOGLE_SERVICE_ACCOUNT_JSON is not valid JSON")
+                return None
+            creds = service_account.Credentials.from_service_account_info(
+                info,
+                scopes=["https://www.googleapis.com/auth/spreadsheets"],
+            )
+            _SHEETS_SERVICE_CACHE = _PacedSheetsResource(build("sheets", "v4", credentials=creds, cache_discovery=False))
+            _SHEETS_CREDENTIALS = creds
+    if not fresh:
         return _SHEETS_SERVICE_CACHE
-    raw = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
-    if not raw:
-        logger.error("GOOGLE_SERVICE_ACCOUNT_JSON env var is missing")
-        return None
-    try:
-        info = json.loads(raw)
-    except ValueError:
-        logger.exception("GOOGLE_SERVICE_ACCOUNT_JSON is not valid JSON")
-        return None
-    creds = service_account.Credentials.from_service_account_info(
-        info,
-        scopes=["https://www.googleapis.com/auth/spreadsheets"],
-    )
-    _SHEETS_SERVICE_CACHE = build("sheets", "v4", credentials=creds, cache_discovery=False)
-    return _SHEETS_SERVICE_CACHE
+    http = google_auth_httplib2.AuthorizedHttp(_SHEETS_CREDENTIALS, http=httplib2.Http())
+    return _PacedSheetsResource(_SHEETS_SERVICE_CACHE._resource, http)
+
+
+# Rows fetched per values.get when streaming a tab with _iter_tab_rows().
+SHEETS_READ_WINDOW_ROWS = int(os.getenv("SHEETS_READ_WINDOW_ROWS", "1000"))
+
+
+def _tab_row_count(svc, spreadsheet_id: str, title: str, meta: dict = None) -> int:
+    """
+    Row count of a tab from its gridProperties (0 if the tab doesn't exist).
+    Pass spreadsheet metadata you already fetched to skip the extra read.
+    """
+    if meta is None:
+        meta = svc.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, fields="sheets.properties"
+        ).execute()
+    for s in meta.get("sheets", []):
+        props = s["properties"]
+        if props["title"] == title:
+            return props.get("gridProperties", {}).get("rowCount", 0)
+    return 0
+
+
+def _iter_tab_rows(
+    svc,
+    spreadsheet_id: str,
+    title: str,
+    last_col: str,
+    first_row: int = 1,
+    value_render: str = "FORMATTED_VALUE",
+    row_count: int = None,
+    meta: dict = None,
+):
+    """
+    Yield (row_number, row_values) for every row of a tab from first_row down
+    to its last row, reading columns A..last_col. Blank rows in the middle of
+    the data come through as empty lists; trailing blank rows are not yielded.
+
+    With row_count or spreadsheet metadata the tab is read in windows of
+    SHEETS_READ_WINDOW_ROWS sized from gridProperties. Without either it is
+    read with one open-ended A{first_row}:{last_col} range rather than
+    spending an extra spreadsheets.get on the row count.
+    """
+    if row_count is None and meta is None:
+        values = svc.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{title}'!A{first_row}:{last_col}",
+            valueRenderOption=value_render,
+        ).execute().get("values", [])
+        for offset, row in enumerate(values):
+            yield first_row + offset, row
+        return
+    if row_count is None:
+        row_count = _tab_row_count(svc, spreadsheet_id, title, meta)
+    start = first_row
+    while start <= row_count:
+        end = min(start + SHEETS_READ_WINDOW_ROWS - 1, row_count)
+        values = svc.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{title}'!A{start}:{last_col}{end}",
+            valueRenderOption=value_render,
+        ).execute().get("values", [])
+        for offset, row in enumerate(values):
+            yield start + offset, row
+        start = end + 1
+
+
+def _index_rows_by_project_id(rows, pid_col: int, last_wins: bool = False) -> dict:
+    """
+    Build {project_id: (row_number, row)} from (row_number, row) pairs, e.g.
+    the output of _iter_tab_rows(). If a Project ID appears more than once
+    the first row wins, or the last one with last_wins=True.
+    """
+    index = {}
+    for row_number, row in rows:
+        pid = str(row[pid_col]).strip() if len(row) > pid_col else ""
+        if pid and (last_wins or pid not in index):
+            index[pid] = (row_number, row)
+    return index
+
+
+def _col_letter(idx: int) -> str:
+    """A1 column letters for a 0-indexed column (0 → "A", 26 → "AA", 702 → "AAA")."""
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _col_index(col) -> int:
+    """0-indexed column number for A1 column letters ("A" → 0, "AI" → 34); ints pass through."""
+    if isinstance(col, int):
+        return col
+    n = 0
+    for ch in col.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n - 1
+
+
+def _patch_cells(svc, spreadsheet_id: str, title: str, edits, value_input: str = "USER_ENTERED") -> int:
+    """
+    Write sparse (row, col, value) edits to one tab in a single
+    values.batchUpdate. row is the 1-indexed sheet row; col is a column
+    letter ("H", "AI") or a 0-indexed column number. Adjacent cells in a row
+    are coalesced into one range, and runs spanning the same columns on
+    consecutive rows are stacked into one block, so marking 150 rows in one
+    column is a single range. If a cell is edited twice the last value wins.
+    Returns the number of ranges written.
+    """
+    cells = {}
+    for row, col, value in edits:
+        cells[(row, _col_index(col))] = value
+    if not cells:
+        return 0
+
+    # Horizontal runs per row: {row: [(first_col, last_col, [values])]}
+    runs = {}
+    for row, col in sorted(cells):
+        row_runs = runs.setdefault(row, [])
+        if row_runs and row_runs[-1][1] == col - 1:
+            first, _, values = row_runs[-1]
+            row_runs[-1] = (first, col, values + [cells[(row, col)]])
+        else:
+            row_runs.append((col, col, [cells[(row, col)]]))
+
+    # Stack identical column spans on consecutive rows into blocks
+    blocks = []
+    open_blocks = {}  # (first_col, last_col) -> block dict still extendable
+    for row in sorted(runs):
+        for first, last, values in runs[row]:
+            block = open_blocks.get((first, last))
+            if block and block["last_row"] == row - 1:
+                block["last_row"] = row
+                block["values"].append(values)
+            else:
+                block = {"first_row": row, "last_row": row, "first_col": first,
+                         "last_col": last, "values": [values]}
+                open_blocks[(first, last)] = block
+                blocks.append(block)
+
+    data = [
+        {
+            "range": (f"'{title}'!{_col_letter(b['first_col'])}{b['first_row']}:"
+                      f"{_col_letter(b['last_col'])}{b['last_row']}"),
+            "values": b["values"],
+        }
+        for b in blocks
+    ]
+    svc.spreadsheets().values().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={"valueInputOption": value_input, "data": data},
+    ).execute()
+    logger.info(f"_patch_cells: {len(cells)} cell(s) in {len(data)} range(s) → '{title}'")
+    return len(data)
 
 
 def _fetch_all_commission_projects(cutoff_date: str = "2026-01-01") -> list[dict]:
@@ -3526,7 +3931,7 @@ def _fetch_all_commission_projects(cutoff_date: str = "2026-01-01") -> list[dict
     api_domain = os.getenv("ZOHO_API_DOMAIN")
     headers = {"Authorization": f"Zoho-oauthtoken {token}"}
 
-    fields = "Name,Project_ID,Aurora_Project_ID,Sales_Representative,Owner,Project_Stage,Project_Created_Date,Commissions_Paid,Commissions_Fully_Paid,Substantial_Completion,Anticipated_Substantial_Completion_Date,Lending_Status"
+    fields = "Name,Project_ID,Aurora_Project_ID,Sales_Representative,Owner,Project_Stage,Project_Created_Date,Commissions_Paid,Commissions_Fully_Paid,Commission_Paid_Amount,Commission_Remaining,Substantial_Completion,Anticipated_Substantial_Completion_Date,Lending_Status"
 
     criteria = f"(Project_Created_Date:greater_equal:{cutoff_date})"
     results = []
@@ -3580,6 +3985,7 @@ def _fetch_all_commission_projects(cutoff_date: str = "2026-01-01") -> list[dict
                 "created_date": (r.get("Project_Created_Date") or "").strip(),
                 "commissions_paid": r.get("Commissions_Paid") or "",
                 "fully_paid": bool(r.get("Commissions_Fully_Paid")),
+                "zoho_commission_fields": {f: r.get(f) for f in _ZOHO_COMMISSION_FIELDS},
                 "install_date": install_date,
                 "install_date_type": install_date_type,
                 "finance_type": _classify_finance_type(r.get("Lending_Status") or ""),
@@ -3593,28 +3999,81 @@ def _fetch_all_commission_projects(cutoff_date: str = "2026-01-01") -> list[dict
     return results
 
 
-def _get_commission_data_for_project(aurora_project_id: str) -> dict:
+# ------------------------
+# Aurora response memo
+# ------------------------
+# Aurora GETs made while pricing one project are memoized by URL, so the
+# pricing pulled while picking the PTO/installed/sold design is reused for the
+# final extraction instead of being fetched again. A batch can also pass a
+# run-scoped memo from _aurora_memo(): each project's finished commission
+# data is kept under its designs URL, so a later call in the same run (e.g.
+# update_pipeline's Zoho sync after the sheet refresh) makes no Aurora calls.
+# Raw responses live only for the project being priced; the run memo holds
+# just the compact result dicts.
+
+
+def _aurora_memo() -> dict:
+    """A fresh run-scoped memo for _get_commission_data_for_project."""
+    return {"results": {}, "hits": 0, "misses": 0, "projects_reused": 0, "lock": threading.Lock()}
+
+
+def _aurora_memo_stats(memo: dict) -> dict:
+    """Hit / miss counts for a batch result: hits are Aurora GETs avoided."""
+    with memo["lock"]:
+        return {"hits": memo["hits"], "misses": memo["misses"], "projects_reused": memo["projects_reused"]}
+
+
+def _get_commission_data_for_project(aurora_project_id: str, memo: dict = None) -> dict:
     """
     Pull fresh pricing from Aurora for the sold design on a project.
     Returns a flat dict of commission fields, or {"error": "..."} on failure.
+    memo (from _aurora_memo) shares results and hit counts across a batch.
     """
+    if memo is None:
+        memo = _aurora_memo()
     tenant_id = os.getenv("AURORA_TENANT_ID")
     designs_url = f"https://api.aurorasolar.com/tenants/{tenant_id}/projects/{aurora_project_id}/designs"
-    designs_resp = _aurora_get_with_retry(designs_url)
-    if designs_resp.status_code != 200:
-        designs_resp.close()
-        return {"error": f"designs fetch failed ({designs_resp.status_code})"}
+    with memo["lock"]:
+        cached = memo["results"].get(designs_url)
+        if cached is not None:
+            memo["hits"] += cached["_requests"]
+            memo["projects_reused"] += 1
+            return {k: v for k, v in cached.items() if k != "_requests"}
+
+    responses = {}  # url -> JSON for 200 responses during this project
+    requests_made = [0]
+
+    def get_json(url: str, fetch) -> tuple:
+        if url in responses:
+            with memo["lock"]:
+                memo["hits"] += 1
+            return 200, responses[url]
+        requests_made[0] += 1
+        with memo["lock"]:
+            memo["misses"] += 1
+        resp = fetch()
+        try:
+            if resp.status_code != 200:
+                return resp.status_code, None
+            responses[url] = resp.json()
+        finally:
+            resp.close()
+        return 200, responses[url]
+
+    status, designs_data = get_json(designs_url, lambda: _aurora_get_with_retry(designs_url))
+    if status != 200:
+        return {"error": f"designs fetch failed ({status})"}
 
-    designs_data = designs_resp.json()
-    designs_resp.close()
     designs = designs_data.get("designs", [])
+
+    def get_pricing(design_id: str) -> tuple:
+        url = f"https://api.aurorasolar.com/tenants/{tenant_id}/designs/{design_id}/pricing"
+        return get_json(url, lambda: pull_pricing(design_id))
+
     def get_base_price_for_design(design_id: str) -> float:
-        r = pull_pricing(design_id)
-        if r.status_code != 200:
-            r.close()
+        status, raw = get_pricing(design_id)
+        if status != 200:
             return 0.0
-        raw = r.json()
-        r.close()
         pj = raw.get("pricing") or raw
         for item in pj.get("system_price_breakdown", []):
             if item.get("item_type") == "base_price":
@@ -3636,13 +4095,10 @@ def _get_commission_data_for_project(aurora_project_id: str) -> dict:
         return {"error": "no usable design found (tried PTO, installed, sold — all had $0 base price)"}
 
     design_id = chosen.get("id")
-    pricing_resp = pull_pricing(design_id)
-    if pricing_resp.status_code != 200:
-        pricing_resp.close()
-        return {"error": f"pricing fetch failed ({pricing_resp.status_code})"}
+    status, pricing_raw = get_pricing(design_id)
+    if status != 200:
+        return {"error": f"pricing fetch failed ({status})"}
 
-    pricing_raw = pricing_resp.json()
-    pricing_resp.close()
     pricing_json = pricing_raw.get("pricing") or pricing_raw
 
     # design_json and summary_json are not needed for commission/cashflow calculations —
@@ -3691,7 +4147,7 @@ def _get_commission_data_for_project(aurora_project_id: str) -> dict:
     design_milestone = (chosen.get("milestone") or {}).get("milestone", "")
     milestone_label = {"permission_to_operate": "PTO", "installed": "Installed", "sold": "Sold"}.get(design_milestone, design_milestone)
 
-    return {
+    result = {
         "design_id": design_id,
         "design_milestone": milestone_label,
         "system_size_watts": system_size_watts,
@@ -3705,6 +4161,280 @@ def _get_commission_data_for_project(aurora_project_id: str) -> dict:
         "subcontractor_total": subcontractor_total,
         "subcontractor_notes": " | ".join(subcontractor_notes) if subcontractor_notes else "",
     }
+    with memo["lock"]:
+        memo["results"][designs_url] = {**result, "_requests": requests_made[0]}
+    return result
+
+
+# ------------------------
+# Aurora fetch stage
+# ------------------------
+# Batch paths fetch every project's Aurora pricing through
+# _fetch_commission_data_batch: up to AURORA_FETCH_CONCURRENCY lookups run at
+# once (all sharing the Aurora rate limit above), results come back in input
+# order, and per-stage progress is visible at GET /aurora/fetch-progress.
+AURORA_FETCH_CONCURRENCY = int(os.getenv("AURORA_FETCH_CONCURRENCY", "4"))
+# Batches run fetch -> compute -> write a chunk of this many projects at a
+# time, so Aurora payloads never pile up for the whole project list.
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "100"))
+
+_AURORA_FETCH_LOCK = threading.Lock()
+_AURORA_FETCH_PROGRESS: dict = {}
+
+
+def _start_fetch_progress(stage: str, total: int) -> dict:
+    """Register a fresh progress record for `stage` and return it."""
+    progress = {
+        "total": total, "done": 0, "errors": 0, "running": True,
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(), "finished_at": None,
+    }
+    with _AURORA_FETCH_LOCK:
+        _AURORA_FETCH_PROGRESS[stage] = progress
+    return progress
+
+
+def _finish_fetch_progress(progress: dict) -> None:
+    with _AURORA_FETCH_LOCK:
+        progress["running"] = False
+        progress["finished_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _fetch_commission_data_batch(aurora_project_ids: list[str], stage: str,
+                                 concurrency: int = None, progress: dict = None,
+                                 memo: dict = None) -> list[dict]:
+    """
+    Run _get_commission_data_for_project for each ID with bounded concurrency.
+    Returns one dict per input ID, in input order; a lookup that raises is
+    captured as {"error": "..."} like any other Aurora failure. Progress is
+    tracked under `stage` in _AURORA_FETCH_PROGRESS; pass `progress` (from
+    _start_fetch_progress) to count several chunks against one stage total.
+    memo (from _aurora_memo) is shared by every lookup.
+    """
+    import concurrent.futures
+    if concurrency is None:
+        concurrency = AURORA_FETCH_CONCURRENCY
+    owns_progress = progress is None
+    if owns_progress:
+        progress = _start_fetch_progress(stage, len(aurora_project_ids))
+    total = len(aurora_project_ids)
+
+    def fetch(aurora_project_id):
+        try:
+            data = _get_commission_data_for_project(aurora_project_id, memo=memo)
+        except Exception as e:
+            logger.warning(f"{stage}: Aurora fetch raised for {aurora_project_id}: {e}")
+            data = {"error": f"{type(e).__name__}: {e}"}
+        with _AURORA_FETCH_LOCK:
+            progress["done"] += 1
+            if "error" in data:
+                progress["errors"] += 1
+            done = progress["done"]
+        if done % 25 == 0 or done == progress["total"]:
+            logger.info(f"{stage}: Aurora fetched {done}/{progress['total']}")
+        return data
+
+    try:
+        if concurrency <= 1 or total <= 1:
+            return [fetch(pid) for pid in aurora_project_ids]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(concurrency, total)) as pool:
+            return list(pool.map(fetch, aurora_project_ids))
+    finally:
+        if owns_progress:
+            _finish_fetch_progress(progress)
+
+
+def _iter_commission_data_chunks(projects: list, stage: str, chunk_size: int = None, memo: dict = None,
+                                 prefilled: dict = None):
+    """
+    Yield (chunk, data_list) for successive chunks of projects, fetching each
+    chunk's Aurora data through _fetch_commission_data_batch. Entries that are
+    None or lack an aurora_project_id get {"error": "no Aurora project ID"}
+    without a fetch; projects whose project_id is in prefilled get that data
+    instead of a fetch. Only one chunk's payloads are alive at a time as long
+    as the caller drops them before asking for the next.
+    """
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    prefilled = prefilled or {}
+
+    def needs_fetch(p):
+        return bool(p and p.get("aurora_project_id")) and p.get("project_id") not in prefilled
+
+    wanted = sum(1 for p in projects if needs_fetch(p))
+    progress = _start_fetch_progress(stage, wanted)
+    try:
+        for start in range(0, len(projects), chunk_size):
+            chunk = projects[start:start + chunk_size]
+            ids = [p["aurora_project_id"] for p in chunk if needs_fetch(p)]
+            fetched = iter(_fetch_commission_data_batch(ids, stage, progress=progress, memo=memo) if ids else [])
+            data = [next(fetched) if needs_fetch(p)
+                    else prefilled[p["project_id"]] if p and p.get("aurora_project_id")
+                    else {"error": "no Aurora project ID"}
+                    for p in chunk]
+            yield chunk, data
+    finally:
+        _finish_fetch_progress(progress)
+
+
+@app.get("/aurora/fetch-progress")
+async def aurora_fetch_progress():
+    """Progress of the current / most recent Aurora fetch per batch stage, plus request usage."""
+    with _AURORA_FETCH_LOCK:
+        stages = {name: dict(p) for name, p in _AURORA_FETCH_PROGRESS.items()}
+    return {"stages": stages, "aurora_usage": _aurora_usage(), "concurrency": AURORA_FETCH_CONCURRENCY,
+            "requests_per_minute": AURORA_REQUESTS_PER_MINUTE}
+
+
+# ------------------------
+# Background jobs
+# ------------------------
+# Long batches (/cashflow/run, /commissions/update-pipeline, the project-intake
+# webhook) run as jobs: the endpoint returns a job id straight away and the
+# work runs on a worker thread (BackgroundTasks, or APScheduler's pool for
+# the cron). GET
+# /jobs/{id} reports phase, projects processed, Aurora / Sheets calls made
+# since the job started and, once finished, the result. Jobs live in memory
+# only; the last JOBS_MAX_KEEP are kept. Call counts are process-wide deltas,
+# so two jobs running at once will see each other's calls. Whole-sheet
+# rebuilds (cashflow_run, update_pipeline) are single-flight: _claim_job hands
+# back the queued / running job of that kind instead of starting a second one.
+JOBS_MAX_KEEP = int(os.getenv("JOBS_MAX_KEEP", "100"))
+
+_JOBS_LOCK = threading.Lock()
+_JOBS: dict = {}
+_JOB_CONTEXT = threading.local()
+
+
+def _create_job(kind: str, params: dict = None, stages: list = None) -> dict:
+    """
+    Register a queued job and return it. stages names the
+    /aurora/fetch-progress stages whose counts stand in for "processed"
+    when the job body can't report progress itself (work on other threads).
+    """
+    with _JOBS_LOCK:
+        return _register_job(kind, params, stages)
+
+
+def _claim_job(kind: str, params: dict = None, stages: list = None):
+    """
+    Single-flight _create_job: returns (job, None) for a new job, or
+    (None, existing job) if a job of this kind is already queued or running.
+    """
+    with _JOBS_LOCK:
+        active = next((j for j in _JOBS.values() if j["kind"] == kind and not j["finished_at"]), None)
+        if active is not None:
+            return None, active
+        return _register_job(kind, params, stages), None
+
+
+def _register_job(kind: str, params: dict, stages: list) -> dict:
+    """Add a queued job to _JOBS and prune old finished ones. Caller holds _JOBS_LOCK."""
+    job = {
+        "id": uuid.uuid4().hex[:12], "kind": kind, "params": params or {},
+        "status": "queued", "phase": "queued", "processed": 0, "total": None,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "started_at": None, "finished_at": None,
+        "stages": stages or [], "result": None, "error": None,
+    }
+    _JOBS[job["id"]] = job
+    finished = [j for j in _JOBS.values() if j["finished_at"]]
+    for old in sorted(finished, key=lambda j: j["created_at"])[:max(0, len(_JOBS) - JOBS_MAX_KEEP)]:
+        _JOBS.pop(old["id"], None)
+    return job
+
+
+def _job_already_running(job: dict) -> dict:
+    """Response for a single-flight endpoint when a job of its kind is already queued / running."""
+    return {"status": "already_running", "job_id": job["id"], "started_at": job["started_at"],
+            "poll": f"/jobs/{job['id']}"}
+
+
+def _run_job_inline(job: dict, fn, *args, **kwargs):
+    """Run a claimed job on this thread ("wait": true) and return its result, re-raising a failure."""
+    _run_job(job["id"], fn, *args, **kwargs)
+    if job["error"]:
+        raise HTTPException(status_code=500, detail=job["error"])
+    return job["result"]
+
+
+def _run_job(job_id: str, fn, *args, **kwargs) -> None:
+    """Worker-thread body: run fn(*args, **kwargs) and record its outcome on the job."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+    if job is None:
+        return
+    job.update({
+        "status": "running", "phase": "starting",
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "_aurora_before": _aurora_usage(), "_sheets_before": _sheets_quota_usage(),
+    })
+    _JOB_CONTEXT.job = job
+    try:
+        result = fn(*args, **kwargs)
+        failed = isinstance(result, dict) and (result.get("status") in ("error", "failed") or "error" in result)
+        job.update({"status": "failed" if failed else "done", "result": result})
+    except Exception as e:
+        logger.exception(f"job {job_id} ({job['kind']}) failed")
+        job.update({"status": "failed", "error": str(e)})
+    finally:
+        _JOB_CONTEXT.job = None
+        job["_aurora_after"] = _aurora_usage()
+        job["_sheets_after"] = _sheets_quota_usage()
+        job["phase"] = job["status"]
+        job["finished_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _job_phase(phase: str, processed: int = None, total: int = None) -> None:
+    """Update the phase / progress of the job running on this thread (no-op outside a job)."""
+    job = getattr(_JOB_CONTEXT, "job", None)
+    if job is None:
+        return
+    job["phase"] = phase
+    if processed is not None:
+        job["processed"] = processed
+    if total is not None:
+        job["total"] = total
+
+
+def _job_view(job: dict) -> dict:
+    """Public snapshot of a job: drops internal counters, adds call counts."""
+    view = {k: v for k, v in job.items() if not k.startswith("_")}
+    if job.get("started_at"):
+        aurora_now = job.get("_aurora_after") or _aurora_usage()
+        sheets_now = job.get("_sheets_after") or _sheets_quota_usage()
+        aurora_before, sheets_before = job["_aurora_before"], job["_sheets_before"]
+        view["aurora_calls"] = aurora_now["requests"] - aurora_before["requests"]
+        view["sheets_calls"] = {
+            "reads": sheets_now["reads"] - sheets_before["reads"],
+            "writes": sheets_now["writes"] - sheets_before["writes"],
+        }
+    if job["stages"] and job.get("started_at"):
+        with _AURORA_FETCH_LOCK:
+            progress = [dict(p) for name, p in _AURORA_FETCH_PROGRESS.items()
+                        if name in job["stages"] and p["started_at"] >= job["started_at"]]
+        if progress:
+            view["processed"] = sum(p["done"] for p in progress)
+            view["total"] = sum(p["total"] for p in progress)
+    return view
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a background job started by /cashflow/run, /commissions/update-pipeline or the intake webhook."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return _job_view(job)
+
+
+@app.get("/jobs")
+async def list_jobs(kind: str = None):
+    """Recent jobs, newest first."""
+    with _JOBS_LOCK:
+        jobs = list(_JOBS.values())
+    jobs = [j for j in jobs if kind is None or j["kind"] == kind]
+    jobs.sort(key=lambda j: j["created_at"], reverse=True)
+    return {"jobs": [{k: v for k, v in _job_view(j).items() if k != "result"} for j in jobs]}
 
 
 def _write_commission_tab(svc, tab_name: str, rows: list[dict]) -> None:
@@ -3999,14 +4729,15 @@ def _write_commission_tab(svc, tab_name: str, rows: list[dict]) -> None:
 
 def _run_commission_batch(projects: list[dict], tab_name: str) -> dict:
     """Core logic: fetch Aurora data for each project and write to Sheets."""
-    svc = _build_sheets_service()
+    svc = _build_sheets_service(fresh=True)
     if not svc:
         return {"status": "failed", "reason": "could not build Sheets service"}
+    quota_before = _sheets_quota_usage()
 
     rows = []
-    for p in projects:
-        logger.info(f"commission_batch: fetching {p['aurora_project_id']} ({p['customer']})")
-        data = _get_commission_data_for_project(p["aurora_project_id"])
+    memo = _aurora_memo()
+    fetched = _fetch_commission_data_batch([p["aurora_project_id"] for p in projects], "commission_batch", memo=memo)
+    for p, data in zip(projects, fetched):
         if "error" in data:
             rows.append({**p, "error": data["error"]})
         else:
@@ -4016,7 +4747,9 @@ def _run_commission_batch(projects: list[dict], tab_name: str) -> dict:
     failed = [r for r in rows if "error" in r]
     _write_commission_tab(svc, tab_name, succeeded)
     return {"status": "ok", "tab": tab_name, "succeeded": len(succeeded), "failed": len(failed),
-            "failed_projects": [{"project_id": r.get("project_id"), "error": r.get("error")} for r in failed]}
+            "failed_projects": [{"project_id": r.get("project_id"), "error": r.get("error")} for r in failed],
+            "aurora_memo": _aurora_memo_stats(memo),
+            "sheets_quota": _sheets_quota_usage_since(quota_before)}
 
 
 def _run_commission_batch_task(cutoff: str, tab_name: str) -> None:
@@ -4081,18 +4814,76 @@ async def commissions_run_sync(request: Request):
         return {"error": str(e), "traceback": traceback.format_exc(), "project_count": len(projects)}
 
 
-@app.post("/webhook/zoho/project-intake")
-async def project_intake_webhook(request: Request):
+# ------------------------
+# Project-intake webhook queue
+# ------------------------
+# The Zoho blueprint webhook only enqueues: it registers a "project_intake"
+# job keyed by install_id and returns straight away; the Zoho lookup, Aurora
+# fetch and tab write run on a worker thread. A retried delivery for an
+# install that is queued, running or finished within the last
+# INTAKE_DEDUP_HOURS gets the existing job back instead of a second tab. The
+# install → job map is also kept in the "project_intake" state doc so
+# retries that land after a restart are still recognised. A record still
+# "queued" / "running" whose job is no longer in memory was lost to a restart
+# mid-run; the next delivery claims it again instead of being turned away.
+INTAKE_DEDUP_HOURS = float(os.getenv("INTAKE_DEDUP_HOURS", "24"))
+INTAKE_MAX_KEEP = int(os.getenv("INTAKE_MAX_KEEP", "500"))
+
+_INTAKE_LOCK = threading.Lock()
+
+
+def _intake_record(install_id: str):
+    """The last intake record for install_id ({job_id, status, ...}) or None."""
+    with _INTAKE_LOCK:
+        return (_load_state("project_intake") or {}).get(install_id)
+
+
+def _update_intake_records(records: dict, install_id: str, fields: dict) -> None:
+    """Apply fields to install_id's record and save, keeping the newest INTAKE_MAX_KEEP (caller holds _INTAKE_LOCK)."""
+    records[install_id] = {**records.get(install_id, {}), **fields,
+                           "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}
+    if len(records) > INTAKE_MAX_KEEP:
+        records = dict(sorted(records.items(), key=lambda kv: kv[1].get("updated_at", ""))[-INTAKE_MAX_KEEP:])
+    _save_state("project_intake", records)
+
+
+def _set_intake_record(install_id: str, **fields) -> None:
+    """Update install_id's intake record."""
+    with _INTAKE_LOCK:
+        _update_intake_records(_load_state("project_intake") or {}, install_id, fields)
+
+
+def _claim_intake(install_id: str):
     """
-    Triggered by Zoho blueprint when a project moves to Project Intake.
-    Expected body: {"install_id": "...", "project_id": "PROJ-XXXX", "customer": "..."}
+    Atomically register a project_intake job for install_id unless a live one
+    exists. Returns (job, None) for a new job or (None, existing record) for
+    a duplicate delivery. A queued / running record whose job isn't in _JOBS
+    is stale (the process restarted) and is re-claimed.
     """
-    try:
-        body = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
-
-    install_id = body.get("install_id") or ""
+    dedup_since = (datetime.datetime.now(datetime.timezone.utc)
+                   - datetime.timedelta(hours=INTAKE_DEDUP_HOURS)).isoformat()
+    with _INTAKE_LOCK:
+        records = _load_state("project_intake") or {}
+        record = records.get(install_id)
+        if record and record.get("status") in ("queued", "running"):
+            with _JOBS_LOCK:
+                if record.get("job_id") not in _JOBS:
+                    logger.info(f"_claim_intake: {install_id} job {record.get('job_id')} was lost — re-claiming")
+                    record = None
+        if record and record.get("status") != "failed" and record.get("created_at", "") >= dedup_since:
+            return None, record
+        job = _create_job("project_intake", {"install_id": install_id})
+        _update_intake_records(records, install_id, {"job_id": job["id"], "status": "queued",
+                                                     "created_at": job["created_at"], "tab": None, "error": None})
+        return job, None
+
+
+def _run_project_intake(key: str, body: dict) -> dict:
+    """
+    Worker for project_intake_webhook: look up the Install and write its
+    commission tab. key is the intake record key (install_id, else project_id).
+    """
+    install_id = str(body.get("install_id") or "")
     project_id = body.get("project_id") or ""
     customer = body.get("customer") or ""
 
@@ -4100,44 +4891,97 @@ async def project_intake_webhook(request: Request):
     aurora_project_id = body.get("aurora_project_id") or ""
     owner = body.get("owner") or ""
     rep = body.get("rep") or ""
-    if (not aurora_project_id or not owner) and install_id:
-        token = get_zoho_access_token()
-        api_domain = os.getenv("ZOHO_API_DOMAIN")
-        r = requests.get(
-            f"{api_domain}/crm/v2/Installs/{install_id}?fields=Aurora_Project_ID,Name,Project_ID,Sales_Representative,Owner,Project_Stage",
-            headers={"Authorization": f"Zoho-oauthtoken {token}"},
-        )
-        if r.status_code == 200:
-            rec = (r.json().get("data") or [{}])[0]
-            aurora_project_id = aurora_project_id or (rec.get("Aurora_Project_ID") or "").strip()
-            if not customer:
-                customer = (rec.get("Name") or "").strip()
-            if not project_id:
-                project_id = (rec.get("Project_ID") or "").strip()
-            if not rep:
-                rep_obj = rec.get("Sales_Representative")
-                rep = (rep_obj.get("name") or "").strip() if isinstance(rep_obj, dict) else (rep_obj or "").strip()
-            if not owner:
-                owner_obj = rec.get("Owner")
-                owner = (owner_obj.get("name") or "").strip() if isinstance(owner_obj, dict) else ""
+    try:
+        if (not aurora_project_id or not owner) and install_id:
+            _job_phase("fetching Zoho install")
+            token = get_zoho_access_token()
+            api_domain = os.getenv("ZOHO_API_DOMAIN")
+            r = requests.get(
+                f"{api_domain}/crm/v2/Installs/{install_id}?fields=Aurora_Project_ID,Name,Project_ID,Sales_Representative,Owner,Project_Stage",
+                headers={"Authorization": f"Zoho-oauthtoken {token}"},
+            )
+            if r.status_code == 200:
+                rec = (r.json().get("data") or [{}])[0]
+                aurora_project_id = aurora_project_id or (rec.get("Aurora_Project_ID") or "").strip()
+                if not customer:
+                    customer = (rec.get("Name") or "").strip()
+                if not project_id:
+                    project_id = (rec.get("Project_ID") or "").strip()
+                if not rep:
+                    rep_obj = rec.get("Sales_Representative")
+                    rep = (rep_obj.get("name") or "").strip() if isinstance(rep_obj, dict) else (rep_obj or "").strip()
+                if not owner:
+                    owner_obj = rec.get("Owner")
+                    owner = (owner_obj.get("name") or "").strip() if isinstance(owner_obj, dict) else ""
+
+        if not aurora_project_id:
+            logger.warning(f"project_intake_webhook: no Aurora Project ID for install_id={install_id}")
+            result = {"status": "skipped - no Aurora Project ID"}
+        else:
+            project = {
+                "customer": customer,
+                "project_id": project_id,
+                "zoho_record_id": install_id,
+                "aurora_project_id": aurora_project_id,
+                "rep": rep,
+                "owner": owner,
+                "stage": "Project Intake",
+            }
+            tab_name = f"{customer} — Project Intake"
+            _job_phase("writing commission tab")
+            result = _run_commission_batch([project], tab_name)
+    except Exception as e:
+        _set_intake_record(key, status="failed", error=str(e))
+        raise
+    failed = result.get("status") in ("error", "failed") or "error" in result
+    _set_intake_record(key, status="failed" if failed else "done",
+                       tab=result.get("tab"), result_status=result.get("status"))
+    return result
 
-    if not aurora_project_id:
-        logger.warning(f"project_intake_webhook: no Aurora Project ID for install_id={install_id}")
-        return {"status": "skipped - no Aurora Project ID"}
-
-    project = {
-        "customer": customer,
-        "project_id": project_id,
-        "zoho_record_id": install_id,
-        "aurora_project_id": aurora_project_id,
-        "rep": rep,
-        "owner": owner,
-        "stage": "Project Intake",
-    }
 
-    tab_name = f"{customer} — Project Intake"
-    result = _run_commission_batch([project], tab_name)
-    return result
+@app.post("/webhook/zoho/project-intake")
+async def project_intake_webhook(request: Request, background_tasks: BackgroundTasks):
+    """
+    Triggered by Zoho blueprint when a project moves to Project Intake.
+    Expected body: {"install_id": "...", "project_id": "PROJ-XXXX", "customer": "..."}
+    Queues the commission tab as a background job and acknowledges at once
+    with {"status": "queued", "job_id"}; a retry for the same install_id gets
+    {"status": "duplicate", ...} with the original job. Poll GET /jobs/{job_id}
+    or GET /webhook/zoho/project-intake/{install_id}.
+    """
+    try:
+        body = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    install_id = str(body.get("install_id") or "")
+    key = install_id or str(body.get("project_id") or "")
+    if not key:
+        raise HTTPException(status_code=400, detail="install_id or project_id is required")
+
+    job, record = _claim_intake(key)
+    if job is None:
+        return {"status": "duplicate", "install_id": key, "job_id": record.get("job_id"),
+                "job_status": record.get("status"), "poll": f"/webhook/zoho/project-intake/{key}"}
+    background_tasks.add_task(_run_job, job["id"], _run_project_intake, key, body)
+    return {"status": "queued", "install_id": key, "job_id": job["id"], "poll": f"/jobs/{job['id']}"}
+
+
+@app.get("/webhook/zoho/project-intake/{install_id}")
+async def project_intake_status(install_id: str):
+    """Status of the latest intake run for an install: the live job if still in memory, else the stored record."""
+    record = _intake_record(install_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"no intake recorded for {install_id}")
+    with _JOBS_LOCK:
+        job = _JOBS.get(record.get("job_id"))
+    if job is not None:
+        return {"install_id": install_id, **record, "job": _job_view(job)}
+    if record.get("status") in ("queued", "running"):
+        return {"install_id": install_id, **record, "stale": True}
+    return {"install_id": install_id, **record}
 
 
 @app.get("/commissions/debug-zoho")
@@ -4262,21 +5106,143 @@ async def lookup_reps(project_ids: str = ""):
     return results
 
 
-@app.post("/commissions/sync-to-zoho")
-async def sync_commissions_to_zoho():
-    """
-    Scan all Payroll tabs on both sheets, calculate paid/remaining amounts
-    per project from Aurora pricing, and write back to Zoho:
-      - Commissions_Paid  → percentage paid (80 at install, 100 when fully paid)
-      - Commission_Remaining → dollar amount still owed
-      - Commissions_Fully_Paid → true when all tranches paid
-    """
-    try:
-        svc = _build_sheets_service()
-        if not svc:
-            return {"status": "error", "reason": "could not build Sheets service"}
+# ------------------------
+# Commission write-back to Zoho
+# ------------------------
+# The sync works out the four commission fields per paid project, compares
+# them with the values the Zoho project fetch already returned, and PUTs only
+# the records that changed, ZOHO_BULK_UPDATE_SIZE per request (Zoho's limit
+# is 100). update_pipeline hands over the commission totals it computed while
+# building the Pipeline rows, so those projects need no Aurora data at all.
+ZOHO_BULK_UPDATE_SIZE = int(os.getenv("ZOHO_BULK_UPDATE_SIZE", "100"))
+_ZOHO_COMMISSION_FIELDS = ("Commission_Paid_Amount", "Commission_Remaining",
+                           "Commissions_Fully_Paid", "Commissions_Paid")
+
+
+def _commission_total(aurora_data: dict) -> float:
+    """Base + consultant commission for one project's Aurora commission data."""
+    sw = aurora_data.get("system_size_watts", 0) or 0
+    bp = aurora_data.get("base_price", 0) or 0
+    bppw = bp / sw if sw else 0
+    bpf = max(bppw - 2.50, 0)
+    bc = bpf * sw
+    cppw = aurora_data.get("consultant_comp_ppw", 0) or 0
+    cc = cppw * sw
+    return round(bc + cc, 2)
+
+
+def _commission_writeback_fields(total_commission: float, tranches: set, finance_type: str) -> dict:
+    """The Zoho commission fields for a project given its paid Run % tranches."""
+    # Determine how much has been paid based on tranches
+    has_80  = any("80"  in t for t in tranches)
+    has_20  = any("20"  in t for t in tranches)
+    has_100 = any("100" in t for t in tranches)
+    ft = (finance_type or "").upper()
 
-        token = get_zoho_access_token()
+    if "CASH" in ft or "SE" in ft:
+        paid_amt = total_commission if (has_100 or has_20) else 0.0
+        fully_paid = paid_amt >= total_commission
+    else:
+        # LR: 80% at install, 20% at activation
+        if has_20:
+            paid_amt = total_commission
+            fully_paid = True
+        elif has_80:
+            paid_amt = round(total_commission * 0.80, 2)
+            fully_paid = False
+        else:
+            paid_amt = 0.0
+            fully_paid = False
+
+    remaining = round(max(total_commission - paid_amt, 0), 2)
+
+    if "CASH" in ft or "SE" in ft:
+        pct_paid = 100 if fully_paid else 0
+    else:
+        pct_paid = 100 if fully_paid else (80 if has_80 else 0)
+
+    return {
+        "Commission_Paid_Amount": paid_amt,
+        "Commission_Remaining": remaining,
+        "Commissions_Fully_Paid": fully_paid,
+        "Commissions_Paid": pct_paid,
+    }
+
+
+def _zoho_value_matches(current, new) -> bool:
+    """Whether a Zoho field's current value already equals what we'd write."""
+    if isinstance(new, bool):
+        return bool(current) == new
+    if current is None or current == "":
+        return False
+    try:
+        return abs(float(str(current).rstrip("%")) - float(new)) < 0.005
+    except (TypeError, ValueError):
+        return False
+
+
+def _put_installs_batch(api_domain: str, zoho_headers: dict, records: list[dict]) -> list:
+    """
+    Update up to ZOHO_BULK_UPDATE_SIZE Installs in one PUT. Each record
+    carries its "id". Returns one error string (or None on success) per
+    record, in order.
+    """
+    resp = requests.put(f"{api_domain}/crm/v7/Installs", headers=zoho_headers, json={"data": records})
+    if resp.status_code not in (200, 201, 202, 207):
+        return [f"Zoho update failed ({resp.status_code}): {resp.text[:200]}"] * len(records)
+    try:
+        results = resp.json().get("data") or []
+    except ValueError:
+        results = []
+    outcomes = []
+    for i in range(len(records)):
+        r = results[i] if i < len(results) else {}
+        if r.get("code") == "SUCCESS" or r.get("status") == "success":
+            outcomes.append(None)
+        else:
+            outcomes.append(f"Zoho update failed ({r.get('code') or resp.status_code}): "
+                            f"{str(r.get('message') or r.get('details') or resp.text)[:200]}")
+    return outcomes
+
+
+@app.post("/commissions/sync-to-zoho")
+async def sync_commissions_to_zoho():
+    """
+    Scan all Payroll tabs on both sheets, calculate paid/remaining amounts
+    per project from Aurora pricing, and write back to Zoho:
+      - Commissions_Paid  → percentage paid (80 at install, 100 when fully paid)
+      - Commission_Remaining → dollar amount still owed
+      - Commissions_Fully_Paid → true when all tranches paid
+    """
+    return _sync_commissions_to_zoho()
+
+
+def _merge_paid_maps(*paid_maps: dict) -> dict:
+    """Union several {project_id: set(run %)} maps from _scan_paid_tranches."""
+    merged = {}
+    for paid in paid_maps:
+        for pid, tranches in paid.items():
+            merged.setdefault(pid, set()).update(tranches)
+    return merged
+
+
+def _sync_commissions_to_zoho(all_paid: dict = None, memo: dict = None,
+                              commission_totals: dict = None) -> dict:
+    """
+    Core of /commissions/sync-to-zoho. all_paid is the merged paid-tranche
+    map for both sheets; update_pipeline passes the maps it already scanned,
+    otherwise both sheets' Payroll tabs are scanned here. commission_totals
+    ({project_id: total commission}) are totals the caller already computed;
+    projects without one are priced from Aurora, using the caller's memo.
+    Only records whose Zoho values differ are written, in bulk PUTs.
+    """
+    try:
+        svc = _build_sheets_service(fresh=True)
+        if not svc:
+            return {"status": "error", "reason": "could not build Sheets service"}
+        quota_before = _sheets_quota_usage()
+
+        token = get_zoho_access_token()
         if not token:
             return {"status": "error", "reason": "could not get Zoho token"}
 
@@ -4286,101 +5252,85 @@ async def sync_commissions_to_zoho():
             "Content-Type": "application/json",
         }
 
-        # Scan both sheets for paid tranches
-        main_paid = _scan_paid_tranches(svc, COMMISSION_SHEET_ID)
-        doug_paid = _scan_paid_tranches(svc, DOUG_SHEET_ID)
-        all_paid = {**main_paid}
-        for pid, tranches in doug_paid.items():
-            all_paid.setdefault(pid, set()).update(tranches)
+        # Scan both sheets for paid tranches unless the caller already did
+        if all_paid is None:
+            all_paid = _merge_paid_maps(
+                _scan_paid_tranches(svc, COMMISSION_SHEET_ID),
+                _scan_paid_tranches(svc, DOUG_SHEET_ID),
+            )
 
         if not all_paid:
             return {"status": "ok", "updated": 0, "message": "no paid projects found"}
 
-        # Fetch Aurora pricing for each paid project to get dollar amounts
-        # We need Zoho record IDs — fetch from Zoho by project ID
+        # Zoho record IDs and current commission values, by project ID
         projects = _fetch_all_commission_projects(cutoff_date="2025-01-01")
         proj_map = {p["project_id"]: p for p in projects}
+        commission_totals = commission_totals or {}
 
         updated = []
         errors = []
-
+        unchanged = precomputed = 0
+        pending = []  # (summary, record) awaiting a bulk PUT
+
+        def flush():
+            outcomes = _put_installs_batch(api_domain, zoho_headers, [rec for _, rec in pending])
+            for (summary, _), err in zip(pending, outcomes):
+                if err:
+                    errors.append({"project_id": summary["project_id"], "error": err})
+                else:
+                    updated.append(summary)
+            pending.clear()
+
+        def queue(pid, tranches, project, total_commission):
+            nonlocal unchanged
+            fields = _commission_writeback_fields(total_commission, tranches, project.get("finance_type", ""))
+            current = project.get("zoho_commission_fields") or {}
+            if all(_zoho_value_matches(current.get(f), v) for f, v in fields.items()):
+                unchanged += 1
+                return
+            pending.append(({"project_id": pid, "paid": fields["Commission_Paid_Amount"],
+                             "remaining": fields["Commission_Remaining"],
+                             "fully_paid": fields["Commissions_Fully_Paid"]},
+                            {"id": project["zoho_record_id"], **fields}))
+            if len(pending) >= max(1, min(ZOHO_BULK_UPDATE_SIZE, 100)):
+                flush()
+
+        to_price = []
         for pid, tranches in all_paid.items():
             project = proj_map.get(pid)
             if not project:
                 errors.append({"project_id": pid, "error": "not found in Zoho fetch"})
-                continue
-
-            # Get commission total from Aurora
-            aurora_data = _get_commission_data_for_project(project["aurora_project_id"])
-            gc.collect()
-            if "error" in aurora_data:
-                errors.append({"project_id": pid, "error": aurora_data["error"]})
-                continue
-
-            sw = aurora_data.get("system_size_watts", 0) or 0
-            bp = aurora_data.get("base_price", 0) or 0
-            bppw = bp / sw if sw else 0
-            bpf = max(bppw - 2.50, 0)
-            bc = bpf * sw
-            cppw = aurora_data.get("consultant_comp_ppw", 0) or 0
-            cc = cppw * sw
-            total_commission = round(bc + cc, 2)
-
-            # Determine how much has been paid based on tranches
-            has_80  = any("80"  in t for t in tranches)
-            has_20  = any("20"  in t for t in tranches)
-            has_100 = any("100" in t for t in tranches)
-            ft = project.get("finance_type", "").upper()
-
-            if "CASH" in ft or "SE" in ft:
-                paid_amt = total_commission if (has_100 or has_20) else 0.0
-                fully_paid = paid_amt >= total_commission
-            else:
-                # LR: 80% at install, 20% at activation
-                if has_20:
-                    paid_amt = total_commission
-                    fully_paid = True
-                elif has_80:
-                    paid_amt = round(total_commission * 0.80, 2)
-                    fully_paid = False
-                else:
-                    paid_amt = 0.0
-                    fully_paid = False
-
-            remaining = round(max(total_commission - paid_amt, 0), 2)
-
-            # Update Zoho
-            zoho_id = project.get("zoho_record_id")
-            if not zoho_id:
+            elif not project.get("zoho_record_id"):
                 errors.append({"project_id": pid, "error": "no Zoho record ID"})
-                continue
-
-            if "CASH" in ft or "SE" in ft:
-                pct_paid = 100 if fully_paid else 0
+            elif pid in commission_totals:
+                precomputed += 1
+                queue(pid, tranches, project, commission_totals[pid])
             else:
-                pct_paid = 100 if fully_paid else (80 if has_80 else 0)
-
-            payload = {"data": [{
-                "Commission_Paid_Amount": paid_amt,
-                "Commission_Remaining": remaining,
-                "Commissions_Fully_Paid": fully_paid,
-                "Commissions_Paid": pct_paid,
-            }]}
-            resp = requests.put(
-                f"{api_domain}/crm/v7/Installs/{zoho_id}",
-                headers=zoho_headers,
-                json=payload,
-            )
-            if resp.status_code in (200, 201):
-                updated.append({"project_id": pid, "paid": paid_amt, "remaining": remaining, "fully_paid": fully_paid})
-            else:
-                errors.append({"project_id": pid, "error": f"Zoho update failed ({resp.status_code}): {resp.text[:200]}"})
+                to_price.append((pid, tranches, project))
+
+        # Aurora commission totals for the rest are fetched a chunk at a time
+        offset = 0
+        if memo is None:
+            memo = _aurora_memo()
+        for chunk, chunk_data in _iter_commission_data_chunks([p for _, _, p in to_price], "sync_to_zoho", memo=memo):
+            for (pid, tranches, project), aurora_data in zip(to_price[offset:offset + len(chunk)], chunk_data):
+                if "error" in aurora_data:
+                    errors.append({"project_id": pid, "error": aurora_data["error"]})
+                    continue
+                queue(pid, tranches, project, _commission_total(aurora_data))
+            offset += len(chunk)
+        if pending:
+            flush()
 
         return {
             "status": "ok",
             "updated": len(updated),
+            "unchanged": unchanged,
+            "precomputed": precomputed,
             "projects": updated,
             "errors": errors,
+            "aurora_memo": _aurora_memo_stats(memo),
+            "sheets_quota": _sheets_quota_usage_since(quota_before),
         }
     except Exception as e:
         logger.exception("sync_commissions_to_zoho failed")
@@ -4438,41 +5388,127 @@ def _is_doug_tiffany(project: dict) -> bool:
         "vilayphonh" in rep or "tiffany" in rep
     )
 
-def _scan_paid_tranches(svc, sheet_id: str) -> dict:
-    """Return {project_id: set of run-pct strings} from all Payroll tabs.
+# ------------------------
+# Paid-tranche ledger
+# ------------------------
+# Payroll tabs are written once per pay week and, after Fred fills in Run %,
+# never touched again. The ledger (state doc "paid_ledger_<spreadsheet>")
+# keeps, per Payroll tab sheetId, the tab's title, grid size, content hash and
+# the {project_id: [run pct, ...]} it contributed. A scan re-reads only tabs
+# that are new, were resized or renamed, are still inside the open window
+# (first seen less than PAID_LEDGER_OPEN_DAYS ago), or have not been
+# re-verified for PAID_LEDGER_VERIFY_HOURS — all of them in one
+# values.batchGet with open-ended A1:Z ranges, so there is no row cap.
+# Tabs that disappear from the spreadsheet drop out of the ledger. A backdated
+# edit to an old tab is picked up within a day, or at once by update_pipeline
+# with {"force": true}, which re-reads every tab.
+PAID_LEDGER_OPEN_DAYS = float(os.getenv("PAID_LEDGER_OPEN_DAYS", "14"))
+PAID_LEDGER_VERIFY_HOURS = float(os.getenv("PAID_LEDGER_VERIFY_HOURS", "24"))
+PAID_LEDGER_BATCH_RANGES = int(os.getenv("PAID_LEDGER_BATCH_RANGES", "100"))
+_PAID_LEDGER_VERSION = 1
+
+
+def _parse_payroll_rows(rows: list) -> dict:
+    """Return {project_id: set of run-pct strings} from one Payroll tab's rows.
     Dynamically finds Project ID and Run % columns from the header row."""
-    meta = svc.spreadsheets().get(spreadsheetId=sheet_id).execute()
+    # Find header row (first row containing "Project ID")
+    pid_col = pct_col = None
+    data_start = 2
+    for hi, hrow in enumerate(rows[:4]):
+        for ci, cell in enumerate(hrow):
+            cv = str(cell).strip().lower()
+            if cv == "project id":
+                pid_col = ci
+            if "run %" in cv or cv == "run%":
+                pct_col = ci
+        if pid_col is not None:
+            data_start = hi + 1
+            break
+    if pid_col is None:
+        pid_col, pct_col = 4, 20  # fallback to main-sheet defaults
     paid = {}
-    for s in meta["sheets"]:
-        title = s["properties"]["title"]
-        if not title.startswith("Payroll"):
+    for row in rows[data_start:]:
+        if len(row) <= pid_col:
             continue
-        result = svc.spreadsheets().values().get(
-            spreadsheetId=sheet_id, range=f"'{title}'!A1:Z100"
+        pid = str(row[pid_col]).strip()
+        pct = str(row[pct_col]).strip() if pct_col is not None and len(row) > pct_col else ""
+        if pid.startswith("PROJ-") and pct:
+            paid.setdefault(pid, set()).add(pct)
+    return paid
+
+
+def _scan_paid_tranches(svc, sheet_id: str, force: bool = False, meta: dict = None) -> dict:
+    """Return {project_id: set of run-pct strings} from all Payroll tabs.
+    Served from the paid-tranche ledger; only new, resized, still-open or
+    stale tabs are read (in one batchGet). force=True re-reads every tab."""
+    if meta is None:
+        meta = svc.spreadsheets().get(spreadsheetId=sheet_id).execute()
+    tabs = [s["properties"] for s in meta["sheets"]
+            if s["properties"]["title"].startswith("Payroll")]
+
+    state_name = f"paid_ledger_{sheet_id}"
+    ledger = _load_state(state_name) or {}
+    if ledger.get("version") != _PAID_LEDGER_VERSION:
+        ledger = {"version": _PAID_LEDGER_VERSION, "tabs": {}}
+    known = ledger["tabs"]
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    open_cutoff = (now - datetime.timedelta(days=PAID_LEDGER_OPEN_DAYS)).isoformat()
+    verify_cutoff = (now - datetime.timedelta(hours=PAID_LEDGER_VERIFY_HOURS)).isoformat()
+    entries, to_read = {}, []
+    for props in tabs:
+        key = str(props["sheetId"])
+        grid = props.get("gridProperties", {})
+        size = [grid.get("rowCount", 0), grid.get("columnCount", 0)]
+        entry = known.get(key)
+        if (force or entry is None
+                or entry.get("title") != props["title"]
+                or entry.get("size") != size
+                or entry.get("first_seen", "") > open_cutoff
+                or entry.get("verified_at", "") < verify_cutoff):
+            to_read.append((key, props["title"], size, entry))
+        else:
+            entries[key] = entry
+
+    added = edited = unchanged = 0
+    for start in range(0, len(to_read), max(1, PAID_LEDGER_BATCH_RANGES)):
+        batch = to_read[start:start + max(1, PAID_LEDGER_BATCH_RANGES)]
+        resp = svc.spreadsheets().values().batchGet(
+            spreadsheetId=sheet_id,
+            ranges=[f"'{title}'!A1:Z" for _, title, _, _ in batch],
+            valueRenderOption="FORMATTED_VALUE",
         ).execute()
-        rows = result.get("values", [])
-        # Find header row (first row containing "Project ID")
-        pid_col = pct_col = None
-        data_start = 2
-        for hi, hrow in enumerate(rows[:4]):
-            for ci, cell in enumerate(hrow):
-                cv = str(cell).strip().lower()
-                if cv == "project id":
-                    pid_col = ci
-                if "run %" in cv or cv == "run%":
-                    pct_col = ci
-            if pid_col is not None:
-                data_start = hi + 1
-                break
-        if pid_col is None:
-            pid_col, pct_col = 4, 20  # fallback to main-sheet defaults
-        for row in rows[data_start:]:
-            if len(row) <= pid_col:
-                continue
-            pid = str(row[pid_col]).strip()
-            pct = str(row[pct_col]).strip() if pct_col is not None and len(row) > pct_col else ""
-            if pid.startswith("PROJ-") and pct:
-                paid.setdefault(pid, set()).add(pct)
+        for (key, title, size, entry), vr in zip(batch, resp.get("valueRanges", [])):
+            rows = vr.get("values", [])
+            content_hash = _fingerprint(rows)
+            if entry is None:
+                added += 1
+            elif entry.get("hash") != content_hash:
+                edited += 1
+            else:
+                unchanged += 1
+            entries[key] = {
+                "title": title,
+                "size": size,
+                "hash": content_hash,
+                "first_seen": (entry or {}).get("first_seen") or now.isoformat(),
+                "verified_at": now.isoformat(),
+                "tranches": {pid: sorted(pcts) for pid, pcts in _parse_payroll_rows(rows).items()},
+            }
+
+    dropped = len(set(known) - set(entries))
+    if to_read or dropped:
+        _save_state(state_name, {"version": _PAID_LEDGER_VERSION, "tabs": entries})
+    logger.info(
+        f"_scan_paid_tranches {sheet_id}: {len(tabs)} Payroll tabs — "
+        f"{len(tabs) - len(to_read)} from ledger, {added} new, {edited} edited, "
+        f"{unchanged} re-verified, {dropped} dropped"
+    )
+
+    paid = {}
+    for entry in entries.values():
+        for pid, pcts in entry["tranches"].items():
+            paid.setdefault(pid, set()).update(pcts)
     return paid
 
 def _commission_status(pid: str, finance_type: str, paid_map: dict, fully_paid_zoho: bool = False) -> str:
@@ -4541,16 +5577,12 @@ def _build_pipeline_rows(projects: list[dict], paid_map: dict) -> list[list]:
         ])
     return rows
 
-def _read_pipeline_statuses(svc, sheet_id: str, title: str = "Pipeline") -> dict:
+def _read_pipeline_statuses(svc, sheet_id: str, title: str = "Pipeline", meta: dict = None) -> dict:
     """Read {project_id: commission_status} from current pipeline tab before refresh."""
     try:
-        result = svc.spreadsheets().values().get(
-            spreadsheetId=sheet_id,
-            range=f"'{title}'!A1:R300",
-            valueRenderOption="FORMATTED_VALUE",
-        ).execute()
         statuses = {}
-        for row in result.get("values", [])[2:]:  # skip title + header rows
+        # skip title + header rows
+        for _, row in _iter_tab_rows(svc, sheet_id, title, "R", first_row=3, meta=meta):
             proj_id = row[1] if len(row) > 1 else ""
             status = row[17] if len(row) > 17 else ""
             if proj_id and status:
@@ -4563,12 +5595,8 @@ def _read_pipeline_statuses(svc, sheet_id: str, title: str = "Pipeline") -> dict
 def _read_paid_project_ids(svc, sheet_id: str) -> set:
     """Read all project IDs currently in the Paid tab so they survive a refresh."""
     try:
-        result = svc.spreadsheets().values().get(
-            spreadsheetId=sheet_id,
-            range="Paid!B1:B300",
-            valueRenderOption="FORMATTED_VALUE",
-        ).execute()
-        return {row[0] for row in result.get("values", [])[2:] if row and row[0].startswith("PROJ-")}
+        rows = _iter_tab_rows(svc, sheet_id, "Paid", "B", first_row=3)
+        return {row[1] for _, row in rows if len(row) > 1 and row[1].startswith("PROJ-")}
     except Exception:
         return set()
 
@@ -4642,19 +5670,171 @@ def _write_pipeline_tab(svc, sheet_id: str, rows: list[list], title: str = "Pipe
     svc.spreadsheets().batchUpdate(spreadsheetId=sheet_id, body={"requests": fmt_reqs}).execute()
 
 
+# ------------------------
+# Frozen fully-paid rows
+# ------------------------
+# Once a project's status is "Commission Paid ✓" its commission numbers are
+# final. _refresh_commission_sheet keeps, per spreadsheet (state doc
+# "paid_frozen_<spreadsheet>"), the Aurora fields its Pipeline row and the
+# Zoho sync need, keyed by Project ID together with the Aurora project and
+# design used. Paid projects found there are rebuilt from the stored fields
+# with no Aurora calls; force=True re-prices them all. The Paid tab itself is
+# only rewritten when its rows differ from the last write.
+_FROZEN_DATA_FIELDS = ("design_id", "design_milestone", "system_size_watts",
+                       "base_price", "consultant_comp_ppw")
+
+
+def _refresh_commission_sheet(sheet_id: str, projects: list[dict], memo: dict = None,
+                              force: bool = False) -> dict:
+    """
+    Rebuild the Pipeline / Paid / On Hold tabs on one commission spreadsheet.
+    Uses its own Sheets client so the main and Doug sheets can be refreshed
+    on separate threads. Fully paid projects reuse their frozen Aurora data
+    and the paid-tranche ledger skips settled Payroll tabs unless force is set. Returns {"rows": active row count, "errors": [...],
+    "paid_map": the paid tranches scanned from this sheet's Payroll tabs,
+    "commission_totals": {project_id: total commission} for the Zoho sync,
+    "frozen_reused": paid projects not re-priced, "paid_tab_written": bool}.
+    """
+    svc = _build_sheets_service(fresh=True)
+    if not svc:
+        raise RuntimeError("could not build Sheets service")
+
+    errors = []
+    STATUS_COL = 17
+    PROJ_ID_COL = 1
+
+    # Read existing manual statuses before any writes so they survive the refresh
+    meta = svc.spreadsheets().get(spreadsheetId=sheet_id).execute()
+    existing_statuses = _read_pipeline_statuses(svc, sheet_id, "Pipeline", meta=meta)
+
+    paid_map = _scan_paid_tranches(svc, sheet_id, force=force, meta=meta)
+    stage = "update_pipeline:doug" if sheet_id == DOUG_SHEET_ID else "update_pipeline:main"
+
+    # Paid status doesn't depend on Aurora, so frozen rows are picked up front
+    frozen_name = f"paid_frozen_{sheet_id}"
+    frozen_state = _load_state(frozen_name) or {}
+    frozen = {} if force else frozen_state.get("projects", {})
+    prefilled = {}
+    for p in projects:
+        entry = frozen.get(p["project_id"])
+        if not entry or entry.get("aurora_project_id") != p.get("aurora_project_id"):
+            continue
+        status = (_commission_status(p["project_id"], p.get("finance_type", ""), paid_map,
+                                     fully_paid_zoho=bool(p.get("fully_paid")))
+                  or existing_statuses.get(p["project_id"], ""))
+        if status == "Commission Paid ✓":
+            prefilled[p["project_id"]] = entry["data"]
+
+    active, paid_rows, on_hold = [], [], []
+    commission_totals = {}
+    frozen_next = {}
+    # Fetch + build one chunk at a time; only the compact output rows are kept
+    for chunk, chunk_data in _iter_commission_data_chunks(projects, stage, memo=memo, prefilled=prefilled):
+        for p, data in zip(chunk, chunk_data):
+            p["data"] = data
+            if "error" in data:
+                errors.append({"project_id": p["project_id"], "error": data["error"]})
+            else:
+                commission_totals[p["project_id"]] = _commission_total(data)
+        chunk_rows = _build_pipeline_rows(chunk, paid_map)
+        for p, r in zip(chunk, chunk_rows):
+            data = p.pop("data", None) or {}
+            # Restore any custom statuses that the auto-scanner didn't set
+            proj_id = r[PROJ_ID_COL] if len(r) > PROJ_ID_COL else ""
+            if proj_id and not r[STATUS_COL] and proj_id in existing_statuses:
+                r[STATUS_COL] = existing_statuses[proj_id]
+            # Split: active vs fully paid vs on-hold
+            if (r[4] if len(r) > 4 else "").lower() == "on hold":
+                on_hold.append(r)
+            if r[STATUS_COL] == "Commission Paid ✓":
+                paid_rows.append(r)
+                if "error" not in data:
+                    frozen_next[p["project_id"]] = {
+                        "aurora_project_id": p.get("aurora_project_id"),
+                        "design_id": data.get("design_id", ""),
+                        "data": {k: data.get(k) for k in _FROZEN_DATA_FIELDS},
+                    }
+            elif (r[4] if len(r) > 4 else "").lower() != "on hold":
+                active.append(r)
+
+    _write_pipeline_tab(svc, sheet_id, active, "Pipeline")
+    # The Paid tab only changes when a project is newly paid or its Zoho fields move
+    paid_hash = _fingerprint(paid_rows)
+    meta = svc.spreadsheets().get(spreadsheetId=sheet_id).execute()
+    has_paid_tab = any(s["properties"]["title"] == "Paid" for s in meta["sheets"])
+    paid_tab_written = force or not has_paid_tab or frozen_state.get("paid_tab_hash") != paid_hash
+    if paid_tab_written:
+        _write_pipeline_tab(svc, sheet_id, paid_rows, "Paid")
+    _write_pipeline_tab(svc, sheet_id, on_hold, "On Hold")
+    _save_state(frozen_name, {"projects": frozen_next, "paid_tab_hash": paid_hash})
+    logger.info(
+        f"update_pipeline: {sheet_id} → {len(active)} active, {len(paid_rows)} paid "
+        f"({len(prefilled)} frozen, Paid tab {'rewritten' if paid_tab_written else 'unchanged'}), "
+        f"{len(on_hold)} on hold"
+    )
+    return {"rows": len(active), "errors": errors, "paid_map": paid_map,
+            "commission_totals": commission_totals, "frozen_reused": len(prefilled),
+            "paid_tab_written": paid_tab_written}
+
+
 @app.post("/commissions/update-pipeline")
-async def update_pipeline():
+async def update_pipeline(request: Request, background_tasks: BackgroundTasks):
+    """
+    Rebuild the Pipeline tab on both the main commissions sheet and Doug's sheet
+    (see _run_update_pipeline). Runs as a background job and returns
+    {"status": "started", "job_id"} — poll GET /jobs/{job_id}.
+
+    Body (optional): {"wait": true} runs inline and returns the result as before;
+    {"force": true} re-prices fully paid projects instead of reusing their frozen rows
+    and re-reads every Payroll tab instead of trusting the paid-tranche ledger.
+    If an update_pipeline job is already queued or running, returns
+    {"status": "already_running", "job_id"} for it instead of starting another.
+    """
+    try:
+        body = await request.json()
+    except Exception:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    force = bool(body.get("force"))
+    job, active = _claim_job("update_pipeline", {"force": force},
+                             stages=["update_pipeline:main", "update_pipeline:doug"])
+    if active:
+        return _job_already_running(active)
+    if body.get("wait"):
+        return _run_job_inline(job, _run_update_pipeline, force=force)
+    background_tasks.add_task(_run_job, job["id"], _run_update_pipeline, force=force)
+    return {"status": "started", "job_id": job["id"], "poll": f"/jobs/{job['id']}"}
+
+
+def _scheduled_update_pipeline() -> None:
+    """Daily cron: run update_pipeline as a job (on the scheduler's thread pool)."""
+    job, active = _claim_job("update_pipeline", {"trigger": "schedule"},
+                             stages=["update_pipeline:main", "update_pipeline:doug"])
+    if active:
+        logger.info(f"_scheduled_update_pipeline: job {active['id']} already {active['status']} — skipping")
+        return
+    _run_job(job["id"], _run_update_pipeline)
+
+
+def _run_update_pipeline(force: bool = False) -> dict:
     """
     Rebuild the Pipeline tab on both the main commissions sheet and Doug's sheet.
     Pulls all active pipeline projects from Zoho, fetches Aurora pricing (PTO → installed → sold),
     and auto-marks paid status by scanning existing Payroll tabs.
+    The two spreadsheets are refreshed concurrently, and the paid tranches they
+    scanned feed the Zoho sync directly instead of being re-read. Fully paid
+    projects reuse their frozen rows unless force is set.
     Returns counts of projects written and any errors.
     """
+    import concurrent.futures
     try:
-        svc = _build_sheets_service()
+        svc = _build_sheets_service(fresh=True)
         if not svc:
             return {"status": "error", "reason": "could not build Sheets service"}
+        quota_before = _sheets_quota_usage()
 
+        _job_phase("fetching Zoho projects")
         projects = _fetch_all_commission_projects(cutoff_date="2026-01-01")
         if not projects:
             return {"status": "error", "reason": "no projects returned from Zoho"}
@@ -4665,79 +5845,39 @@ async def update_pipeline():
         del projects  # free the unsplit list immediately
         gc.collect()
 
-        errors = []
-        STATUS_COL = 17
-        PROJ_ID_COL = 1
-
-        # Read existing manual statuses before any writes so they survive the refresh
-        main_existing_statuses = _read_pipeline_statuses(svc, COMMISSION_SHEET_ID, "Pipeline")
-        doug_existing_statuses = _read_pipeline_statuses(svc, DOUG_SHEET_ID, "Pipeline")
-
-        # ── Main sheet: fetch Aurora data one project at a time, free after use ──
-        main_paid = _scan_paid_tranches(svc, COMMISSION_SHEET_ID)
-        for p in main_projects:
-            p["data"] = _get_commission_data_for_project(p["aurora_project_id"])
-            if "error" in p["data"]:
-                errors.append({"project_id": p["project_id"], "error": p["data"]["error"]})
-            gc.collect()
-        main_all_rows = _build_pipeline_rows(main_projects, main_paid)
-        del main_projects, main_paid
-        gc.collect()
-        # Restore any custom statuses that the auto-scanner didn't set
-        for r in main_all_rows:
-            proj_id = r[PROJ_ID_COL] if len(r) > PROJ_ID_COL else ""
-            if proj_id and not r[STATUS_COL] and proj_id in main_existing_statuses:
-                r[STATUS_COL] = main_existing_statuses[proj_id]
-        # Split: active vs fully paid vs on-hold
-        main_on_hold = [r for r in main_all_rows if (r[4] if len(r) > 4 else "").lower() == "on hold"]
-        main_active = [r for r in main_all_rows if r[STATUS_COL] != "Commission Paid ✓" and (r[4] if len(r) > 4 else "").lower() != "on hold"]
-        main_paid_rows = [r for r in main_all_rows if r[STATUS_COL] == "Commission Paid ✓"]
-        del main_all_rows
-        _write_pipeline_tab(svc, COMMISSION_SHEET_ID, main_active, "Pipeline")
-        _write_pipeline_tab(svc, COMMISSION_SHEET_ID, main_paid_rows, "Paid")
-        _write_pipeline_tab(svc, COMMISSION_SHEET_ID, main_on_hold, "On Hold")
-        main_count = len(main_active)
-        del main_active, main_paid_rows, main_on_hold
+        _job_phase("refreshing commission sheets")
+        memo = _aurora_memo()  # shared by both sheets and the Zoho sync
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            main_future = pool.submit(_refresh_commission_sheet, COMMISSION_SHEET_ID, main_projects, memo, force)
+            doug_future = pool.submit(_refresh_commission_sheet, DOUG_SHEET_ID, doug_projects, memo, force)
+            main_result = main_future.result()
+            doug_result = doug_future.result()
+        del main_projects, doug_projects
         gc.collect()
 
-        # ── Doug's sheet: same pattern ──
-        doug_paid = _scan_paid_tranches(svc, DOUG_SHEET_ID)
-        for p in doug_projects:
-            p["data"] = _get_commission_data_for_project(p["aurora_project_id"])
-            if "error" in p["data"]:
-                errors.append({"project_id": p["project_id"], "error": p["data"]["error"]})
-            gc.collect()
-        doug_all_rows = _build_pipeline_rows(doug_projects, doug_paid)
-        del doug_projects, doug_paid
-        gc.collect()
-        # Restore any custom statuses that the auto-scanner didn't set
-        for r in doug_all_rows:
-            proj_id = r[PROJ_ID_COL] if len(r) > PROJ_ID_COL else ""
-            if proj_id and not r[STATUS_COL] and proj_id in doug_existing_statuses:
-                r[STATUS_COL] = doug_existing_statuses[proj_id]
-        doug_on_hold = [r for r in doug_all_rows if (r[4] if len(r) > 4 else "").lower() == "on hold"]
-        doug_active = [r for r in doug_all_rows if r[STATUS_COL] != "Commission Paid ✓" and (r[4] if len(r) > 4 else "").lower() != "on hold"]
-        doug_paid_rows = [r for r in doug_all_rows if r[STATUS_COL] == "Commission Paid ✓"]
-        del doug_all_rows
-        _write_pipeline_tab(svc, DOUG_SHEET_ID, doug_active, "Pipeline")
-        _write_pipeline_tab(svc, DOUG_SHEET_ID, doug_paid_rows, "Paid")
-        _write_pipeline_tab(svc, DOUG_SHEET_ID, doug_on_hold, "On Hold")
-        doug_count = len(doug_active)
-        del doug_active, doug_paid_rows, doug_on_hold
-        gc.collect()
+        errors = main_result["errors"] + doug_result["errors"]
 
-        # Sync paid amounts back to Zoho automatically
-        zoho_sync = await sync_commissions_to_zoho()
+        # Sync paid amounts back to Zoho automatically, reusing the scanned
+        # tranches and the commission totals computed for the Pipeline rows
+        _job_phase("syncing paid amounts to Zoho")
+        zoho_sync = _sync_commissions_to_zoho(
+            _merge_paid_maps(main_result["paid_map"], doug_result["paid_map"]), memo=memo,
+            commission_totals={**main_result["commission_totals"], **doug_result["commission_totals"]},
+        )
         zoho_updated = zoho_sync.get("updated", 0)
         zoho_errors = zoho_sync.get("errors", [])
 
         return {
             "status": "ok",
-            "main_sheet_rows": main_count,
-            "doug_sheet_rows": doug_count,
+            "main_sheet_rows": main_result["rows"],
+            "doug_sheet_rows": doug_result["rows"],
             "errors": errors,
             "zoho_synced": zoho_updated,
+            "zoho_unchanged": zoho_sync.get("unchanged", 0),
+            "frozen_reused": main_result["frozen_reused"] + doug_result["frozen_reused"],
             "zoho_errors": zoho_errors,
+            "aurora_memo": _aurora_memo_stats(memo),
+            "sheets_quota": _sheets_quota_usage_since(quota_before),
         }
     except Exception as e:
         logger.exception("update_pipeline failed")
@@ -5342,6 +6482,66 @@ def _ensure_overrides_tab(svc) -> None:
     logger.info("_ensure_overrides_tab: created Overrides tab")
 
 
+# Overrides-tab fields by kind, as they appear in a parsed override entry
+_OVERRIDE_DATE_KEYS = ("payment1", "payment2", "payment3", "holdback_date")
+_OVERRIDE_AMOUNT_KEYS = ("amount1", "amount2", "amount3", "materials",
+                         "comm_payout1", "comm_payout2", "holdback_amt")
+
+
+def _override_date(s):
+    """ISO date string for an override date cell (YYYY-MM-DD or M/D/YYYY), else None."""
+    if not isinstance(s, str):
+        return None
+    s = s.strip()
+    # Try ISO format first (YYYY-MM-DD)
+    try:
+        datetime.date.fromisoformat(s)
+        return s
+    except ValueError:
+        pass
+    # Fall back to M/D/YYYY (Google Sheets default date display)
+    try:
+        return datetime.datetime.strptime(s, "%m/%d/%Y").date().isoformat()
+    except ValueError:
+        return None
+
+
+def _override_amount(s):
+    """Float for an override amount cell ("$1,234.50", 1234.5), else None."""
+    if isinstance(s, bool):
+        return None
+    try:
+        return float(str(s if s is not None else "").replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+def _normalize_override_entry(entry) -> tuple[dict, list]:
+    """
+    Validate an override entry given as JSON (scenarios) and normalize it the
+    way _read_payment_overrides parses the tab. Returns (entry, errors);
+    errors lists every unknown key or unparseable value.
+    """
+    if not isinstance(entry, dict):
+        return {}, ["override must be an object"]
+    normalized, errors = {}, []
+    for key, value in entry.items():
+        if key in _OVERRIDE_DATE_KEYS:
+            parsed = _override_date(value)
+        elif key in _OVERRIDE_AMOUNT_KEYS:
+            parsed = _override_amount(value)
+        elif key == "ct_green_paid":
+            parsed = bool(value)
+        else:
+            errors.append(f"unknown override field {key!r}")
+            continue
+        if parsed is None:
+            errors.append(f"{key}: cannot parse {value!r}")
+        else:
+            normalized[key] = parsed
+    return normalized, errors
+
+
 def _read_payment_overrides(svc) -> dict:
     """
     Read the Overrides tab and return a dict keyed by project_id:
@@ -5349,39 +6549,14 @@ def _read_payment_overrides(svc) -> dict:
     Only populated keys are included. Rows starting with '#' are skipped.
     Columns: A=Project ID, B=Customer (ignored), C=Payment 1, D=Payment 2, E=Payment 3, F=Notes,
              G=Payment 1 Amt, H=Payment 2 Amt, I=Payment 3 Amt, J=Materials Actual,
-             K=Comm Payout 1 Amt, L=Comm Payout 2 Amt
+             K=Comm Payout 1 Amt, L=Comm Payout 2 Amt, M=Holdback Date, N=Holdback Amt,
+             O=CT Green Paid
     """
-    sheets = svc.spreadsheets()
     try:
-        data = sheets.values().get(
-            spreadsheetId=CASHFLOW_SHEET_ID,
-            range=f"'{CASHFLOW_OVERRIDES_TAB}'!A2:N200",
-            valueRenderOption="FORMATTED_VALUE",
-        ).execute().get("values", [])
+        data = [row for _, row in _iter_tab_rows(svc, CASHFLOW_SHEET_ID, CASHFLOW_OVERRIDES_TAB, "O", first_row=2)]
     except Exception:
         return {}
 
-    def valid_date(s):
-        s = (s or "").strip()
-        # Try ISO format first (YYYY-MM-DD)
-        try:
-            datetime.date.fromisoformat(s)
-            return s
-        except (ValueError, AttributeError):
-            pass
-        # Fall back to M/D/YYYY (Google Sheets default date display)
-        try:
-            d = datetime.datetime.strptime(s, "%m/%d/%Y").date()
-            return d.isoformat()
-        except (ValueError, AttributeError):
-            return None
-
-    def parse_amt(s):
-        try:
-            return float(str(s or "").replace("$", "").replace(",", "").strip())
-        except (ValueError, AttributeError):
-            return None
-
     overrides = {}
     for row in data:
         if not row:
@@ -5390,28 +6565,28 @@ def _read_payment_overrides(svc) -> dict:
         if not proj_id or proj_id.startswith("#"):
             continue
         entry = {}
-        if len(row) > 2 and valid_date(row[2]):
-            entry["payment1"] = valid_date(row[2])
-        if len(row) > 3 and valid_date(row[3]):
-            entry["payment2"] = valid_date(row[3])
-        if len(row) > 4 and valid_date(row[4]):
-            entry["payment3"] = valid_date(row[4])
-        if len(row) > 6 and parse_amt(row[6]) is not None:
-            entry["amount1"] = parse_amt(row[6])
-        if len(row) > 7 and parse_amt(row[7]) is not None:
-            entry["amount2"] = parse_amt(row[7])
-        if len(row) > 8 and parse_amt(row[8]) is not None:
-            entry["amount3"] = parse_amt(row[8])
-        if len(row) > 9 and parse_amt(row[9]) is not None:
-            entry["materials"] = parse_amt(row[9])
-        if len(row) > 10 and parse_amt(row[10]) is not None:
-            entry["comm_payout1"] = parse_amt(row[10])
-        if len(row) > 11 and parse_amt(row[11]) is not None:
-            entry["comm_payout2"] = parse_amt(row[11])
-        if len(row) > 12 and valid_date(row[12]):
-            entry["holdback_date"] = valid_date(row[12])
-        if len(row) > 13 and parse_amt(row[13]) is not None:
-            entry["holdback_amt"] = parse_amt(row[13])
+        if len(row) > 2 and _override_date(row[2]):
+            entry["payment1"] = _override_date(row[2])
+        if len(row) > 3 and _override_date(row[3]):
+            entry["payment2"] = _override_date(row[3])
+        if len(row) > 4 and _override_date(row[4]):
+            entry["payment3"] = _override_date(row[4])
+        if len(row) > 6 and _override_amount(row[6]) is not None:
+            entry["amount1"] = _override_amount(row[6])
+        if len(row) > 7 and _override_amount(row[7]) is not None:
+            entry["amount2"] = _override_amount(row[7])
+        if len(row) > 8 and _override_amount(row[8]) is not None:
+            entry["amount3"] = _override_amount(row[8])
+        if len(row) > 9 and _override_amount(row[9]) is not None:
+            entry["materials"] = _override_amount(row[9])
+        if len(row) > 10 and _override_amount(row[10]) is not None:
+            entry["comm_payout1"] = _override_amount(row[10])
+        if len(row) > 11 and _override_amount(row[11]) is not None:
+            entry["comm_payout2"] = _override_amount(row[11])
+        if len(row) > 12 and _override_date(row[12]):
+            entry["holdback_date"] = _override_date(row[12])
+        if len(row) > 13 and _override_amount(row[13]) is not None:
+            entry["holdback_amt"] = _override_amount(row[13])
         if len(row) > 14 and str(row[14]).strip():
             entry["ct_green_paid"] = True
         if entry:
@@ -5645,6 +6820,23 @@ def _write_weekly_payments_tab(svc, rows: list[dict]) -> None:
     logger.info(f"_write_weekly_payments_tab: wrote {len(event_rows)} payment events")
 
 
+# Weekly Payments "Payment Type" label by (finance type, payment slot index)
+_CASHFLOW_PAYMENT_TYPES = {
+    ("LR",   0): "LR/SG M1",
+    ("LR",   1): "LR/SG M2",
+    ("SG",   0): "LR/SG M1",
+    ("SG",   1): "LR/SG M2",
+    ("CF",   0): "CF M1",
+    ("CF",   1): "CF M2",
+    ("SE",   0): "SE M1",
+    ("SE",   1): "SE M2",
+    ("SE",   2): "SE M3",
+    ("CASH", 0): "Cash Deposit",
+    ("CASH", 1): "Cash Progress",
+    ("CASH", 2): "Cash Final",
+}
+
+
 def _compute_cashflow_row(row: dict, today: datetime.date, zoho_base: str, aurora_base: str):
     """
     Compute the Pipeline tab row values and weekly payment events for a single
@@ -5917,20 +7109,6 @@ def _compute_cashflow_row(row: dict, today: datetime.date, zoho_base: str, auror
         holdback_date, holdback_amt,
     ]
 
-    PAYMENT_TYPE_MAP = {
-        ("LR",   0): "LR/SG M1",
-        ("LR",   1): "LR/SG M2",
-        ("SG",   0): "LR/SG M1",
-        ("SG",   1): "LR/SG M2",
-        ("CF",   0): "CF M1",
-        ("CF",   1): "CF M2",
-        ("SE",   0): "SE M1",
-        ("SE",   1): "SE M2",
-        ("SE",   2): "SE M3",
-        ("CASH", 0): "Cash Deposit",
-        ("CASH", 1): "Cash Progress",
-        ("CASH", 2): "Cash Final",
-    }
     pay_slots = [
         (payment1_date, payment1_amt, comm_payout1_date, comm_payout1_amt),
         (payment2_date, payment2_amt, comm_payout2_date, comm_payout2_amt),
@@ -5938,7 +7116,7 @@ def _compute_cashflow_row(row: dict, today: datetime.date, zoho_base: str, auror
     ]
     pay_events = []
     for i, (pd, pa, cd, ca) in enumerate(pay_slots):
-        pay_type = PAYMENT_TYPE_MAP.get((finance_type, i), "Loan / Full Payment")
+        pay_type = _CASHFLOW_PAYMENT_TYPES.get((finance_type, i), "Loan / Full Payment")
         if not pd or not pa:
             # Revenue already received; emit commission-only event if commission is still pending.
             try:
@@ -5999,6 +7177,16 @@ def _compute_cashflow_row(row: dict, today: datetime.date, zoho_base: str, auror
     return pipeline_row, pay_events
 
 
+def _compute_cashflow_rows(rows: list, today: datetime.date, zoho_base: str, aurora_base: str):
+    """Compute (pipeline_rows, events_by_row) for a list of project rows with _compute_cashflow_row."""
+    pipeline_rows, events_by_row = [], []
+    for row in rows:
+        pipeline_row, pay_events = _compute_cashflow_row(row, today, zoho_base, aurora_base)
+        pipeline_rows.append(pipeline_row)
+        events_by_row.append(pay_events)
+    return pipeline_rows, events_by_row
+
+
 def _write_weekly_payments_from_events(svc, weekly_events: list) -> None:
     """Write the Weekly Payments tab from pre-sorted event rows."""
     sheets = svc.spreadsheets()
@@ -6201,8 +7389,12 @@ def _write_readme_tab(svc) -> None:
     logger.info("_write_readme_tab: README tab updated")
 
 
-def _write_summary_tab(svc, pipeline_tab_name: str) -> None:
-    """Create/replace a Summary tab with totals pulled from the Pipeline tab."""
+def _write_summary_tab(svc, pipeline_tab_name: str, project_count: int = None) -> None:
+    """
+    Create/replace a Summary tab with totals pulled from the Pipeline tab.
+    If project_count is given (values aggregation mode) it is written as a
+    number instead of a COUNTA over the whole Pipeline tab.
+    """
     sheets = svc.spreadsheets()
     p = pipeline_tab_name
 
@@ -6337,7 +7529,7 @@ def _write_summary_tab(svc, pipeline_tab_name: str) -> None:
         # Row 43
         ["", "", "", ""],
         # Row 44
-        ["Active Projects",          f"=COUNTA('{p}'!A2:A)", "", ""],
+        ["Active Projects",          project_count if project_count is not None else f"=COUNTA('{p}'!A2:A)", "", ""],
     ]
 
     sheets.values().update(
@@ -6435,13 +7627,20 @@ def _sheets_serial(d: datetime.date) -> int:
 
 
 
+def _read_config_rows(svc) -> list:
+    """Raw Config tab rows (A2:G, unformatted)."""
+    return [row for _, row in _iter_tab_rows(
+        svc, DASHBOARD_SHEET_ID, "Config", "G", first_row=2, value_render="UNFORMATTED_VALUE",
+    )]
+
+
 def _read_config(svc) -> list:
     """Read Config tab and return list of dicts with keys: name, category, amount, frequency, billing_day, status, skip_weeks."""
-    raw = svc.spreadsheets().values().get(
-        spreadsheetId=DASHBOARD_SHEET_ID,
-        range="Config!A2:G200",
-        valueRenderOption="UNFORMATTED_VALUE",
-    ).execute().get("values", [])
+    return _parse_config_rows(_read_config_rows(svc))
+
+
+def _parse_config_rows(raw: list) -> list:
+    """Parse raw Config rows into the item dicts described in _read_config."""
     items = []
     for row in raw:
         if not row or not row[0]:
@@ -6488,6 +7687,109 @@ def _read_config(svc) -> list:
     return items
 
 
+# ---- Recurring expense schedule ----------------------------------------
+# Config rows are compiled once into recurrence tuples and cached by a hash of
+# the raw rows, so repeat syncs skip the skip-weeks parsing entirely. Expansion
+# works off a per-week calendar (first-Friday flag and which billing days fall
+# in the week) memoized by week serial, so any window — 17 weeks or 52+ — is a
+# flat item × week pass with no per-day date math.
+_EXPENSE_SCHEDULE_CACHE: dict = {}
+_EXPENSE_WEEK_CALENDAR: dict = {}
+
+
+def _compile_expense_schedule(raw_rows: list) -> dict:
+    """
+    Compile raw Config rows into {"items": [(frequency, category, name, amount,
+    billing_day, skip_serials, is_payroll)], "medical_premium": float}.
+    Cached by content hash. Only weekly and monthly (with a billing day) items
+    produce expense rows, same as before; other frequencies are kept out of
+    the schedule and logged once per compile.
+    """
+    key = _fingerprint(raw_rows)
+    cached = _EXPENSE_SCHEDULE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    config_items = _parse_config_rows(raw_rows)
+    # "Payroll Health Insurance" is excluded from normal monthly billing and
+    # folded into first-Friday payroll weeks instead.
+    medical_premium = next(
+        (i["amount"] for i in config_items
+         if i["name"].lower() == "payroll health insurance"),
+        0,
+    )
+    items, unsupported = [], []
+    for item in config_items:
+        name = item["name"]
+        if name.lower() == "payroll health insurance":
+            continue
+        frequency = item["frequency"]
+        if frequency == "weekly" or (frequency == "monthly" and item["billing_day"]):
+            skip_serials = frozenset(_sheets_serial(d) for d in item.get("skip_weeks", set()))
+            items.append((frequency, item["category"], name, item["amount"],
+                          item["billing_day"], skip_serials, name.lower() == "payroll"))
+        else:
+            unsupported.append(f"{name} ({frequency})")
+    if unsupported:
+        logger.warning(f"_compile_expense_schedule: no schedule for {', '.join(unsupported)}")
+
+    schedule = {"items": items, "medical_premium": medical_premium, "config_items": len(config_items)}
+    _EXPENSE_SCHEDULE_CACHE.clear()
+    _EXPENSE_SCHEDULE_CACHE[key] = schedule
+    return schedule
+
+
+def _expense_week_calendar(week_monday: datetime.date) -> tuple:
+    """
+    (week_serial, is_first_friday_of_month, billing_days, month_end_day) for
+    the week starting week_monday. A monthly item with billing day b bills
+    this week when b is in billing_days, or b >= month_end_day (short months
+    bill on their last day).
+    """
+    import calendar as _cal
+    serial = _sheets_serial(week_monday)
+    cal = _EXPENSE_WEEK_CALENDAR.get(serial)
+    if cal is None:
+        # First Friday: Friday - 7 days falls in the prior month.
+        friday = week_monday + datetime.timedelta(days=4)
+        is_first_friday = (friday - datetime.timedelta(days=7)).month != friday.month
+        billing_days, month_end_day = set(), None
+        for i in range(7):
+            d = week_monday + datetime.timedelta(days=i)
+            max_day = _cal.monthrange(d.year, d.month)[1]
+            if d.day < max_day:
+                billing_days.add(d.day)
+            else:
+                month_end_day = max_day
+        cal = (serial, is_first_friday, frozenset(billing_days), month_end_day)
+        _EXPENSE_WEEK_CALENDAR[serial] = cal
+    return cal
+
+
+def _expand_expense_schedule(schedule: dict, week_dates: list) -> list:
+    """
+    Expand a compiled schedule over week_dates (Mondays) into Expenses rows
+    [week_serial, category, name, amount, "Yes", "Active", "", ""], ordered by
+    week then Config order.
+    """
+    items = schedule["items"]
+    medical_premium = schedule["medical_premium"]
+    rows = []
+    for week_monday in week_dates:
+        serial, is_first_friday, billing_days, month_end_day = _expense_week_calendar(week_monday)
+        for frequency, category, name, amount, billing_day, skip_serials, is_payroll in items:
+            if serial in skip_serials:
+                continue
+            if frequency == "weekly":
+                week_amount = amount
+                if is_payroll and is_first_friday and medical_premium:
+                    week_amount = amount + medical_premium
+                rows.append([serial, category, name, week_amount, "Yes", "Active", "", ""])
+            elif billing_day in billing_days or (month_end_day is not None and billing_day >= month_end_day):
+                rows.append([serial, category, name, amount, "Yes", "Active", "", ""])
+    return rows
+
+
 def _read_expense_paid_keys(svc) -> set:
     """Return (week_serial_int, category, description) for every Expenses row with Status='Paid'."""
     try:
@@ -6538,12 +7840,9 @@ def _restore_expense_paid_statuses(svc, paid_keys: set) -> None:
             continue
         key = (w_int, str(row[1]).strip(), str(row[2]).strip())
         if key in paid_keys:
-            updates.append({"range": f"Expenses!F{i + 2}", "values": [["Paid"]]})
+            updates.append((i + 2, "F", "Paid"))
     if updates:
-        svc.spreadsheets().values().batchUpdate(
-            spreadsheetId=DASHBOARD_SHEET_ID,
-            body={"valueInputOption": "USER_ENTERED", "data": updates},
-        ).execute()
+        _patch_cells(svc, DASHBOARD_SHEET_ID, "Expenses", updates)
         logger.info(f"_restore_expense_paid_statuses: restored Paid on {len(updates)} rows")
 
 
@@ -6553,13 +7852,11 @@ def _write_dashboard_expenses(svc) -> int:
     Reads schedule from the Config tab and week dates from Cash Flow row 2.
     Returns number of rows written.
     """
-    import calendar as _cal
-
     sheets = svc.spreadsheets()
 
-    # Read Config tab
-    config_items = _read_config(svc)
-    if not config_items:
+    # Read Config tab; the compiled schedule is reused while Config is unchanged
+    schedule = _compile_expense_schedule(_read_config_rows(svc))
+    if not schedule["config_items"]:
         logger.warning("_write_dashboard_expenses: Config tab is empty or missing")
         return 0
 
@@ -6579,53 +7876,7 @@ def _write_dashboard_expenses(svc) -> int:
         logger.warning("_write_dashboard_expenses: no week dates found in dashboard")
         return 0
 
-    rows = []
-
-    # Pre-compute medical premium from Config so we can add it to first-Friday payroll weeks.
-    # "Payroll Health Insurance" is excluded from normal monthly billing and handled here instead.
-    medical_premium = next(
-        (i["amount"] for i in config_items
-         if i["name"].lower() == "payroll health insurance"),
-        0,
-    )
-
-    for week_monday in week_dates:
-        week_serial = _sheets_serial(week_monday)
-        week_days = [week_monday + datetime.timedelta(days=i) for i in range(7)]
-
-        # Determine if the Friday of this week is the first Friday of its calendar month.
-        # Test: Friday - 7 days falls in the prior month → this is the first Friday.
-        friday = week_monday + datetime.timedelta(days=4)
-        is_first_friday_of_month = (friday - datetime.timedelta(days=7)).month != friday.month
-
-        for item in config_items:
-            name        = item["name"]
-            category    = item["category"]
-            amount      = item["amount"]
-            frequency   = item["frequency"]
-            billing_day = item["billing_day"]
-            skip_weeks  = item.get("skip_weeks", set())
-
-            # Medical premium is folded into weekly Payroll on first-Friday weeks; skip it here.
-            if name.lower() == "payroll health insurance":
-                continue
-
-            # Skip this week if listed in the item's Skip Weeks column
-            if week_monday in skip_weeks:
-                continue
-
-            if frequency == "weekly":
-                week_amount = amount
-                if name.lower() == "payroll" and is_first_friday_of_month and medical_premium:
-                    week_amount = amount + medical_premium
-                rows.append([week_serial, category, name, week_amount, "Yes", "Active", "", ""])
-            elif frequency == "monthly" and billing_day:
-                for d in week_days:
-                    max_day = _cal.monthrange(d.year, d.month)[1]
-                    effective_day = min(billing_day, max_day)
-                    if d.day == effective_day:
-                        rows.append([week_serial, category, name, amount, "Yes", "Active", "", ""])
-                        break
+    rows = _expand_expense_schedule(schedule, week_dates)
 
     # Save 'Paid' statuses before clearing so they survive the rewrite
     paid_keys = _read_expense_paid_keys(svc)
@@ -6692,19 +7943,99 @@ def _week_of_date(date_str: str) -> str:
         return ""
 
 
-def _write_dashboard_project_expenses(svc, weekly_events: list) -> int:
+# Expense category for each project cost event type (Expenses tab column B).
+# Commission payouts are handled separately: they key off the commission date.
+_PROJECT_EXPENSE_CATEGORIES = {
+    "Subcontractor": "Subcontractor",
+    "Cash Materials": "Materials",
+    "SolarInsure": "SolarInsure/Warranty",
+    "CT Green Estates": "CT Green Estates",
+}
+
+
+def _index_cashflow_events(weekly_events: list) -> dict:
     """
-    Append project-based expense rows to the dashboard Expenses tab:
-    commissions, Cash/SE materials, and SolarInsure warranty.
-    Call AFTER _write_dashboard_expenses (which handles the clear).
-    weekly_events: 12-field lists [week_of, pay_date, customer, finance_type,
-                   pay_type, pay_amt, comm_date, comm_amt, stage, sc_display,
-                   project_id, zoho_link]
+    Walk weekly_events once and bucket every revenue and expense line the
+    dashboard writers need, so each date string is parsed a single time.
+
+    weekly_events entries: 12-field lists [week_of, pay_date, customer,
+    finance_type, pay_type, pay_amt, comm_date, comm_amt, stage, sc_display,
+    project_id, zoho_link].
+
+    Returns:
+      revenue   — [week_serial, category, amount, customer, pay_type] rows (Revenue tab)
+      expenses  — [week_serial, category, customer, amount] rows (Expenses tab)
+      by_week   — {week_serial: {category: total}} over revenue + expenses
+      by_project— {project_id: {category: total}}
+    week_serial is the Sheets serial of the Monday of the date's week, or the
+    event's week_of string when the date doesn't parse (matching the writers).
     """
-    sheets = _build_sheets_service().spreadsheets()
+    serials = {}
 
-    # Read existing rows before touching anything
-    _PROJECT_CATS = {"Commissions", "Materials", "SolarInsure/Warranty", "Subcontractor", "Subcontractor Payments", "CT Green Estates"}
+    def week_serial(date_str, fallback):
+        if date_str not in serials:
+            try:
+                d = datetime.date.fromisoformat(date_str)
+                serials[date_str] = _sheets_serial(d - datetime.timedelta(days=d.weekday()))
+            except Exception:
+                serials[date_str] = None
+        serial = serials[date_str]
+        return fallback if serial is None else serial
+
+    revenue, expenses = [], []
+    by_week, by_project = {}, {}
+
+    def tally(serial, category, amount, project_id):
+        if isinstance(amount, (int, float)):
+            week = by_week.setdefault(serial, {})
+            week[category] = week.get(category, 0) + amount
+            proj = by_project.setdefault(project_id, {})
+            proj[category] = proj.get(category, 0) + amount
+
+    for evt in weekly_events:
+        if len(evt) < 6:
+            continue
+        customer = evt[2]
+        pay_type = evt[4]
+        pay_amt = evt[5]
+        project_id = evt[10] if len(evt) > 10 else ""
+
+        if pay_amt and pay_type not in _REVENUE_SKIP:
+            serial = week_serial(evt[1], evt[0])
+            category = pay_type if pay_type in _REVENUE_KNOWN_CATEGORIES else "Other"
+            revenue.append([serial, category, pay_amt, customer, pay_type])
+            tally(serial, category, pay_amt, project_id)
+
+        if len(evt) < 8:
+            continue
+        category = _PROJECT_EXPENSE_CATEGORIES.get(pay_type)
+        if category and pay_amt:
+            serial = week_serial(evt[1], evt[0])
+            expenses.append([serial, category, customer, pay_amt])
+            tally(serial, category, pay_amt, project_id)
+        comm_date, comm_amt = evt[6], evt[7]
+        if comm_date and comm_amt and comm_amt != "" and comm_amt != 0:
+            serial = week_serial(comm_date, evt[0])
+            expenses.append([serial, "Commissions", customer, comm_amt])
+            tally(serial, "Commissions", comm_amt, project_id)
+
+    return {"revenue": revenue, "expenses": expenses, "by_week": by_week, "by_project": by_project}
+
+
+def _write_dashboard_project_expenses(svc, weekly_events: list, index: dict = None) -> int:
+    """
+    Append project-based expense rows to the dashboard Expenses tab:
+    commissions, Cash/SE materials, and SolarInsure warranty.
+    Call AFTER _write_dashboard_expenses (which handles the clear).
+    weekly_events: 12-field lists [week_of, pay_date, customer, finance_type,
+                   pay_type, pay_amt, comm_date, comm_amt, stage, sc_display,
+                   project_id, zoho_link]
+    index: _index_cashflow_events(weekly_events), if the caller already built it.
+    """
+    sheets = svc.spreadsheets()
+
+    # Read existing rows before touching anything
+    _PROJECT_CATS = {"Commissions", "Materials", "SolarInsure/Warranty", "Subcontractor", "Subcontractor Payments", "CT Green Estates"}
     existing = sheets.values().get(
         spreadsheetId=DASHBOARD_SHEET_ID,
         range="Expenses!A2:H",
@@ -6736,66 +8067,13 @@ def _write_dashboard_project_expenses(svc, weekly_events: list) -> int:
             body={"values": kept},
         ).execute()
 
-    rows = []
-
-    for evt in weekly_events:
-        if len(evt) < 8:
-            continue
-        customer    = evt[2]
-        pay_type    = evt[4]
-        pay_amt     = evt[5]
-        comm_date   = evt[6]
-        comm_amt    = evt[7]
-
-        # Subcontractor costs
-        if pay_type == "Subcontractor" and pay_amt:
-            if ("Subcontractor", customer) not in paid_pairs:
-                try:
-                    d = datetime.date.fromisoformat(evt[1])
-                    serial = _sheets_serial(d - datetime.timedelta(days=d.weekday()))
-                except Exception:
-                    serial = evt[0]
-                rows.append([serial, "Subcontractor", customer, pay_amt, "Auto", "Active", "", ""])
-
-        # Cash/SE materials outflow
-        if pay_type == "Cash Materials" and pay_amt:
-            if ("Materials", customer) not in paid_pairs:
-                try:
-                    d = datetime.date.fromisoformat(evt[1])
-                    serial = _sheets_serial(d - datetime.timedelta(days=d.weekday()))
-                except Exception:
-                    serial = evt[0]
-                rows.append([serial, "Materials", customer, pay_amt, "Auto", "Active", "", ""])
-
-        # SolarInsure warranty fee
-        if pay_type == "SolarInsure" and pay_amt:
-            if ("SolarInsure/Warranty", customer) not in paid_pairs:
-                try:
-                    d = datetime.date.fromisoformat(evt[1])
-                    serial = _sheets_serial(d - datetime.timedelta(days=d.weekday()))
-                except Exception:
-                    serial = evt[0]
-                rows.append([serial, "SolarInsure/Warranty", customer, pay_amt, "Auto", "Active", "", ""])
-
-        # CT Green Estates cost
-        if pay_type == "CT Green Estates" and pay_amt:
-            if ("CT Green Estates", customer) not in paid_pairs:
-                try:
-                    d = datetime.date.fromisoformat(evt[1])
-                    serial = _sheets_serial(d - datetime.timedelta(days=d.weekday()))
-                except Exception:
-                    serial = evt[0]
-                rows.append([serial, "CT Green Estates", customer, pay_amt, "Auto", "Active", "", ""])
-
-        # Commission payouts (keyed to comm_date, not pay_date)
-        if comm_date and comm_amt and comm_amt != "" and comm_amt != 0:
-            if ("Commissions", customer) not in paid_pairs:
-                try:
-                    cd = datetime.date.fromisoformat(comm_date)
-                    serial = _sheets_serial(cd - datetime.timedelta(days=cd.weekday()))
-                except Exception:
-                    serial = evt[0]
-                rows.append([serial, "Commissions", customer, comm_amt, "Auto", "Active", "", ""])
+    if index is None:
+        index = _index_cashflow_events(weekly_events)
+    rows = [
+        [serial, category, customer, amount, "Auto", "Active", "", ""]
+        for serial, category, customer, amount in index["expenses"]
+        if (category, customer) not in paid_pairs
+    ]
 
     if rows:
         sheets.values().append(
@@ -6821,12 +8099,13 @@ _REVENUE_KNOWN_CATEGORIES = {
 _REVENUE_SKIP = {"CT Green Estates", "Cash Materials", "Subcontractor", "SolarInsure"}
 
 
-def _write_dashboard_revenue_tab(svc, weekly_events: list) -> None:
+def _write_dashboard_revenue_tab(svc, weekly_events: list, index: dict = None) -> None:
     """
     Write payment revenue rows to the Revenue tab of the dashboard sheet.
     weekly_events entries: [week_of, pay_date, customer, finance_type, pay_type,
                             pay_amt, comm_date, comm_amt, stage, sc_display,
                             project_id, zoho_link]  (12 fields)
+    index: _index_cashflow_events(weekly_events), if the caller already built it.
     Revenue tab columns: A=Week, B=Category, C=Amount, D=Project, E=Notes
     """
     if not DASHBOARD_SHEET_ID:
@@ -6847,28 +8126,9 @@ def _write_dashboard_revenue_tab(svc, weekly_events: list) -> None:
         range="Revenue!A2:E",
     ).execute()
 
-    rows = []
-    for evt in weekly_events:
-        if len(evt) < 6:
-            continue
-        pay_date_str = evt[1]
-        customer = evt[2]
-        pay_type = evt[4]
-        pay_amt  = evt[5]
-
-        if pay_type in _REVENUE_SKIP:
-            continue
-        if not pay_amt or pay_amt == "":
-            continue
-
-        try:
-            pd = datetime.date.fromisoformat(pay_date_str)
-            week_serial = _sheets_serial(pd - datetime.timedelta(days=pd.weekday()))
-        except Exception:
-            week_serial = evt[0]  # fallback to string if parse fails
-
-        category = pay_type if pay_type in _REVENUE_KNOWN_CATEGORIES else "Other"
-        rows.append([week_serial, category, pay_amt, customer, pay_type])
+    if index is None:
+        index = _index_cashflow_events(weekly_events)
+    rows = index["revenue"]
 
     all_rev_rows = rows + manual_rev_rows
     if all_rev_rows:
@@ -6881,16 +8141,345 @@ def _write_dashboard_revenue_tab(svc, weekly_events: list) -> None:
     logger.info(f"_write_dashboard_revenue_tab: wrote {len(rows)} revenue rows + {len(manual_rev_rows)} manual")
 
 
-def _run_cashflow_batch(projects: list[dict], tab_name: str) -> dict:
+# ------------------------
+# Persistent sync state
+# ------------------------
+# Small JSON documents (plus the cashflow cache's SQLite file) that carry work
+# from one run to the next. Lives outside the repo; losing it only costs one
+# full recompute — except the cash flow run store under runs/, which is why
+# Pipeline tab pruning needs SYNC_STATE_PERSISTENT.
+SYNC_STATE_DIR = os.getenv("SYNC_STATE_DIR", "/tmp/aurora-zoho-sync")
+_SYNC_STATE_LOCK = threading.Lock()
+
+
+def _state_path(name: str) -> str:
+    return os.path.join(SYNC_STATE_DIR, f"{name}.json")
+
+
+def _load_state(name: str, default=None):
+    """Read a state document; returns default if it's missing or unreadable."""
+    try:
+        with open(_state_path(name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logger.warning(f"_load_state: could not read {name} ({e}) — starting fresh")
+        return default
+
+
+def _save_state(name: str, data) -> None:
+    """Write a state document atomically (temp file + rename)."""
+    path = _state_path(name)
+    with _SYNC_STATE_LOCK:
+        try:
+            os.makedirs(SYNC_STATE_DIR, exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"_save_state: could not write {name} ({e})")
+
+
+def _fingerprint(value) -> str:
+    """Stable content hash of a JSON-serialisable value."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# ------------------------
+# Incremental cashflow recompute
+# ------------------------
+# Each /cashflow/run stores, per Zoho Install, the fingerprint of everything
+# _compute_cashflow_row reads (Zoho fields, Aurora pricing, Overrides row) and
+# the Pipeline row + events it produced. The next run reuses both when the
+# fingerprint matches; Aurora is only re-queried when the Zoho fields change
+# or the cached pricing is older than CASHFLOW_AURORA_MAX_AGE_HOURS. Design
+# or price edits made in Aurora alone don't touch the Zoho fields, so that
+# TTL is how long they can go unseen — keep it to about a day. A run with
+# "incremental": false re-fetches every project.
+CASHFLOW_INCREMENTAL = os.getenv("CASHFLOW_INCREMENTAL", "true").lower() != "false"
+CASHFLOW_AURORA_MAX_AGE_HOURS = float(os.getenv("CASHFLOW_AURORA_MAX_AGE_HOURS", "24"))
+_CASHFLOW_CACHE_STATE = "cashflow_projects"
+_CASHFLOW_CACHE_VERSION = 1  # bump when _compute_cashflow_row's output changes shape or logic
+
+
+def _cashflow_depends_on_today(p: dict) -> bool:
+    """True if _compute_cashflow_row's output for p changes with today's date."""
+    projected_sc = not p.get("substantial_completion") and p.get("stage") in CASHFLOW_STAGE_DAYS_TO_SC
+    cash_without_created = p.get("finance_type") == "CASH" and not p.get("created_date")
+    return projected_sc or cash_without_created
+
+
+# The cache lives in a SQLite file next to the JSON state docs rather than in
+# one: a run looks up and writes back one chunk of projects at a time, so its
+# memory stays bounded by BATCH_CHUNK_SIZE, and every finished chunk is kept
+# even if the run stops part-way. Only the small planning columns (zoho_fp,
+# aurora_fetched, has_aurora) are read for the whole project list up front.
+
+def _open_cashflow_cache():
+    """Open (creating if needed) the incremental cache; None if it can't be used."""
+    path = os.path.join(SYNC_STATE_DIR, f"{_CASHFLOW_CACHE_STATE}.sqlite")
+    try:
+        os.makedirs(SYNC_STATE_DIR, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS projects (key TEXT PRIMARY KEY, version INTEGER, run_id TEXT,"
+            " zoho_fp TEXT, aurora_fetched TEXT, has_aurora INTEGER, entry TEXT)"
+        )
+        conn.commit()
+        return conn
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"_open_cashflow_cache: cache unavailable ({e}) — computing every project")
+        return None
+
+
+def _cashflow_cache_plan(conn) -> dict:
+    """{key: (zoho_fp, aurora_fetched, has_aurora)} for every current-version entry."""
+    rows = conn.execute(
+        "SELECT key, zoho_fp, aurora_fetched, has_aurora FROM projects WHERE version = ?",
+        (_CASHFLOW_CACHE_VERSION,),
+    )
+    return {key: (zoho_fp, aurora_fetched or "", bool(has_aurora)) for key, zoho_fp, aurora_fetched, has_aurora in rows}
+
+
+def _cashflow_cache_get(conn, keys: list) -> dict:
+    """Full cached entries for one chunk's keys."""
+    entries = {}
+    for start in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+        part = keys[start:start + 500]
+        rows = conn.execute(
+            f"SELECT key, entry FROM projects WHERE version = ? AND key IN ({','.join('?' * len(part))})",
+            (_CASHFLOW_CACHE_VERSION, *part),
+        )
+        for key, entry in rows:
+            entries[key] = json.loads(entry)
+    return entries
+
+
+def _cashflow_cache_put(conn, run_id: str, entries: list) -> None:
+    """Write one chunk's (key, entry) pairs and commit."""
+    conn.executemany(
+        "INSERT OR REPLACE INTO projects (key, version, run_id, zoho_fp, aurora_fetched, has_aurora, entry)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(key, _CASHFLOW_CACHE_VERSION, run_id, entry["zoho_fp"], entry["aurora_fetched"],
+          entry["aurora"] is not None, json.dumps(entry, separators=(",", ":"), default=str))
+         for key, entry in entries],
+    )
+    conn.commit()
+
+
+def _cashflow_cache_prune(conn, run_id: str) -> None:
+    """After a complete run, drop entries for projects that run didn't include."""
+    conn.execute("DELETE FROM projects WHERE run_id != ? OR version != ?", (run_id, _CASHFLOW_CACHE_VERSION))
+    conn.commit()
+
+
+# Pipeline tab header row — one entry per column of _compute_cashflow_row's pipeline_row
+CASHFLOW_PIPELINE_HEADERS = [
+    "Customer", "Project ID", "Finance Type", "Stage",
+    "SC / Projected SC", "kW", "Rev $/W", "Total Revenue",
+    "Payment 1 Date", "Payment 1 Amt",
+    "Payment 2 Date", "Payment 2 Amt",
+    "Payment 3 Date", "Payment 3 Amt",
+    "Materials (est)", "Subcontractor Cost", "Subcontractor Notes",
+    "Referral Payout", "Total Commission",
+    "Comm Payout 1 Date", "Comm Payout 1 Amt",
+    "Comm Payout 2 Date", "Comm Payout 2 Amt",
+    "Comm Payout 3 Date", "Comm Payout 3 Amt",
+    "Zoho Link", "Aurora Link",
+    "CT Green Date", "CT Green Amt",
+    "Cash Materials Date", "Cash Materials Amt",
+    "SolarInsure Amt",
+    "Created Date",
+    "LR Holdback Date", "LR Holdback Amt",
+]
+
+
+def _iter_cashflow_batch_chunks(projects: list[dict], overrides: dict, today: datetime.date,
+                                incremental: bool = None, chunk_size: int = None,
+                                summary: dict = None, save_cache: bool = True):
     """
-    Fetch Aurora data one project at a time and stream rows directly to the
-    Pipeline tab, keeping memory usage flat regardless of project count.
-    Weekly payment events are accumulated as minimal 12-field tuples only.
+    Fetch/reuse Aurora data and compute Pipeline rows + weekly payment events
+    a chunk of projects at a time, with no Sheets access. Yields
+    {"rows" (compute inputs: project + "data" + "payment_overrides"),
+     "pipeline_rows", "events_by_row"} per chunk, in project order.
+
+    incremental (default CASHFLOW_INCREMENTAL) reuses the previous run's Aurora
+    pricing and computed rows for projects whose inputs haven't changed; only
+    changed or date-dependent projects are fetched / recomputed. Each chunk's
+    entries are written to the cache as the chunk is yielded, and entries for
+    projects no longer in the list are dropped once the last chunk has been
+    consumed — unless save_cache=False (read-only callers: they use the cache
+    but leave it as /cashflow/run wrote it). `summary` (if given) is filled
+    with "overrides_applied", "stats" and "incremental".
     """
-    import gc
-    svc = _build_sheets_service()
+    zoho_base = "https://crm.zoho.com/crm/heliosolar/tab/CustomModule6/"
+    aurora_base = "https://v2.aurorasolar.com/projects/"
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    if summary is None:
+        summary = {}
+
+    if incremental is None:
+        incremental = CASHFLOW_INCREMENTAL
+    conn = _open_cashflow_cache() if incremental else None
+    run_id = uuid.uuid4().hex
+    now = datetime.datetime.now(datetime.timezone.utc)
+    aurora_cutoff = (now - datetime.timedelta(hours=CASHFLOW_AURORA_MAX_AGE_HOURS)).isoformat()
+    stats = {"reused": 0, "recomputed": 0, "aurora_fetched": 0, "aurora_reused": 0}
+    memo = _aurora_memo()
+    summary.update({"overrides_applied": 0, "stats": stats, "incremental": incremental, "aurora_memo": memo})
+
+    try:
+        plan = _cashflow_cache_plan(conn) if conn else {}
+    except sqlite3.Error as e:
+        logger.warning(f"cashflow_batch: could not read the cache ({e}) — computing every project")
+        conn.close()
+        conn, plan = None, {}
+    planned = []  # (project, cache key, zoho fingerprint, reuse cached Aurora?)
+    for p in projects:
+        key = p.get("zoho_record_id") or p.get("project_id", "")
+        cached_fp, cached_fetched, has_aurora = plan.get(key, (None, "", False))
+        zoho_fp = _fingerprint(p)
+        reuse_aurora = cached_fp == zoho_fp and has_aurora and cached_fetched >= aurora_cutoff
+        planned.append((p, key, zoho_fp, reuse_aurora))
+    del plan
+    progress = _start_fetch_progress("cashflow_batch", sum(1 for *_, reuse in planned if not reuse))
+
+    try:
+        for start in range(0, len(planned), chunk_size):
+            chunk = planned[start:start + chunk_size]
+            cached = _cashflow_cache_get(conn, [key for _, key, _, _ in chunk]) if conn else {}
+            # Another run may have replaced an entry since planning; re-check before fetching
+            chunk = [(p, key, zoho_fp, reuse and (cached.get(key) or {}).get("aurora") is not None)
+                     for p, key, zoho_fp, reuse in chunk]
+            to_fetch = [p["aurora_project_id"] for p, _, _, reuse in chunk if not reuse]
+            fetched = iter(_fetch_commission_data_batch(to_fetch, "cashflow_batch", progress=progress, memo=memo)
+                           if to_fetch else [])
+            rows, pipeline_rows, events_by_row = [], [], []
+            stale = []  # indexes into rows that need _compute_cashflow_rows
+            chunk_entries = []
+
+            for p, key, zoho_fp, reuse_aurora in chunk:
+                entry = cached.get(key) or {}
+                if reuse_aurora:
+                    aurora_data = entry["aurora"]
+                    aurora_fetched = entry["aurora_fetched"]
+                    stats["aurora_reused"] += 1
+                else:
+                    aurora_data = next(fetched)
+                    aurora_fetched = now.isoformat()
+                    stats["aurora_fetched"] += 1
+                    if "error" in aurora_data:
+                        logger.info(f"cashflow_batch: no Aurora sold design for {p['customer']} ({aurora_data['error']}) — using Zoho data")
+                        aurora_data = {}
+                        aurora_fetched = ""  # retry next run
+
+                proj_id = p.get("project_id", "")
+                pov = overrides.get(proj_id, {})
+                if pov:
+                    summary["overrides_applied"] += 1
+
+                row = {**p, "data": aurora_data, "payment_overrides": pov}
+                input_fp = _fingerprint({"zoho": zoho_fp, "aurora": aurora_data, "overrides": pov})
+                reusable = (
+                    entry.get("input_fp") == input_fp
+                    and (not _cashflow_depends_on_today(p) or entry.get("computed_on") == today.isoformat())
+                )
+                if reusable:
+                    pipeline_rows.append(entry["pipeline_row"])
+                    events_by_row.append(entry["events"])
+                    stats["reused"] += 1
+                else:
+                    pipeline_rows.append(None)
+                    events_by_row.append(None)
+                    stale.append(len(rows))
+                rows.append(row)
+                chunk_entries.append((key, {
+                    "zoho_fp": zoho_fp, "input_fp": input_fp,
+                    "aurora": aurora_data if aurora_fetched else None, "aurora_fetched": aurora_fetched,
+                }))
+
+            if stale:
+                fresh_rows, fresh_events = _compute_cashflow_rows(
+                    [rows[i] for i in stale], today, zoho_base, aurora_base,
+                )
+                for i, pipeline_row, pay_events in zip(stale, fresh_rows, fresh_events):
+                    pipeline_rows[i] = pipeline_row
+                    events_by_row[i] = pay_events
+            stats["recomputed"] += len(stale)
+            for (_, entry), pipeline_row, pay_events in zip(chunk_entries, pipeline_rows, events_by_row):
+                entry.update({"pipeline_row": pipeline_row, "events": pay_events, "computed_on": today.isoformat()})
+            if conn and save_cache:
+                try:
+                    _cashflow_cache_put(conn, run_id, chunk_entries)
+                except sqlite3.Error as e:
+                    logger.warning(f"cashflow_batch: could not write the cache ({e})")
+            del cached, chunk_entries
+
+            yield {"rows": rows, "pipeline_rows": pipeline_rows, "events_by_row": events_by_row}
+
+        if conn and save_cache:
+            try:
+                _cashflow_cache_prune(conn, run_id)
+            except sqlite3.Error as e:
+                logger.warning(f"cashflow_batch: could not prune the cache ({e})")
+    finally:
+        _finish_fetch_progress(progress)
+        if conn:
+            conn.close()
+
+    logger.info(
+        f"cashflow_batch: {stats['recomputed']} recomputed, {stats['reused']} reused, "
+        f"{stats['aurora_fetched']} Aurora fetches, {stats['aurora_reused']} Aurora reused"
+    )
+
+
+def _compute_cashflow_batch_rows(projects: list[dict], overrides: dict, today: datetime.date,
+                                 incremental: bool = None, save_cache: bool = True) -> dict:
+    """
+    Run _iter_cashflow_batch_chunks to completion and collect everything, for
+    callers that need the whole result at once (preview, scenarios).
+    save_cache is passed through.
+
+    Returns {"rows", "pipeline_rows", "events_by_row", "weekly_events"
+    (12-field, with week_of prepended, in project order), "overrides_applied",
+    "stats", "incremental"}.
+    """
+    summary = {}
+    rows, pipeline_rows, events_by_row = [], [], []
+    for chunk in _iter_cashflow_batch_chunks(projects, overrides, today, incremental=incremental,
+                                             summary=summary, save_cache=save_cache):
+        rows.extend(chunk["rows"])
+        pipeline_rows.extend(chunk["pipeline_rows"])
+        events_by_row.extend(chunk["events_by_row"])
+    summary["aurora_memo"] = _aurora_memo_stats(summary["aurora_memo"])
+
+    weekly_events = [[_week_of_date(evt[0])] + evt for pay_events in events_by_row for evt in pay_events]
+    return {
+        "rows": rows,
+        "pipeline_rows": pipeline_rows,
+        "events_by_row": events_by_row,
+        "weekly_events": weekly_events,
+        **summary,
+    }
+
+
+def _run_cashflow_batch(projects: list[dict], tab_name: str, aggregation: str = None,
+                        audit: bool = False, incremental: bool = None) -> dict:
+    """
+    Compute every project's Pipeline row and weekly payment events (see
+    _iter_cashflow_batch_chunks) and write the Pipeline tab, Weekly Payments
+    and dashboard tabs. Pipeline rows are appended to the tab chunk by chunk
+    as they are computed; only the weekly events (and, in values mode, the
+    rows the totals are summed from) are kept for the later tabs.
+    aggregation / audit select how the Cash Flow weekly rows are filled (see
+    _refresh_cashflow_totals); incremental is passed through.
+    """
+    svc = _build_sheets_service(fresh=True)
     if not svc:
         return {"status": "failed", "reason": "could not build Sheets service"}
+    quota_before = _sheets_quota_usage()
 
     _ensure_overrides_tab(svc)
     overrides = _read_payment_overrides(svc)
@@ -6911,74 +8500,65 @@ def _run_cashflow_batch(projects: list[dict], tab_name: str) -> dict:
     ).execute()
     sheet_id = resp["replies"][0]["addSheet"]["properties"]["sheetId"]
 
-    pipeline_headers = [
-        "Customer", "Project ID", "Finance Type", "Stage",
-        "SC / Projected SC", "kW", "Rev $/W", "Total Revenue",
-        "Payment 1 Date", "Payment 1 Amt",
-        "Payment 2 Date", "Payment 2 Amt",
-        "Payment 3 Date", "Payment 3 Amt",
-        "Materials (est)", "Subcontractor Cost", "Subcontractor Notes",
-        "Referral Payout", "Total Commission",
-        "Comm Payout 1 Date", "Comm Payout 1 Amt",
-        "Comm Payout 2 Date", "Comm Payout 2 Amt",
-        "Comm Payout 3 Date", "Comm Payout 3 Amt",
-        "Zoho Link", "Aurora Link",
-        "CT Green Date", "CT Green Amt",
-        "Cash Materials Date", "Cash Materials Amt",
-        "SolarInsure Amt",
-        "Created Date",
-        "LR Holdback Date", "LR Holdback Amt",
-    ]
     sheets.values().update(
         spreadsheetId=CASHFLOW_SHEET_ID,
         range=f"'{tab_name}'!A1",
         valueInputOption="USER_ENTERED",
-        body={"values": [pipeline_headers]},
+        body={"values": [CASHFLOW_PIPELINE_HEADERS]},
     ).execute()
 
-    zoho_base = "https://crm.zoho.com/crm/heliosolar/tab/CustomModule6/"
-    aurora_base = "https://v2.aurorasolar.com/projects/"
+    aggregation = (aggregation or CASHFLOW_AGGREGATION_MODE).lower()
+    # values mode sums the rows in Python afterwards; the run store gets them chunk by chunk
+    keep_rows = aggregation == "values"
     today = datetime.date.today()
-
-    def week_of(date_str):
-        try:
-            d = datetime.date.fromisoformat(date_str)
-            return (d - datetime.timedelta(days=d.weekday())).isoformat()
-        except (ValueError, TypeError):
-            return ""
-
-    total = 0
-    overrides_applied = 0
+    summary = {}
+    pipeline_rows = [] if keep_rows else None
     weekly_events = []
-    pipeline_rows = []
-
-    for p in projects:
-        logger.info(f"cashflow_batch: fetching {p['aurora_project_id']} ({p['customer']})")
-        aurora_data = _get_commission_data_for_project(p["aurora_project_id"])
-        if "error" in aurora_data:
-            logger.info(f"cashflow_batch: no Aurora sold design for {p['customer']} ({aurora_data['error']}) — using Zoho data")
-            aurora_data = {}
-
-        proj_id = p.get("project_id", "")
-        pov = overrides.get(proj_id, {})
-        if pov:
-            overrides_applied += 1
-
-        row = {**p, "data": aurora_data, "payment_overrides": pov}
-        pipeline_row, pay_events = _compute_cashflow_row(row, today, zoho_base, aurora_base)
-        pipeline_rows.append(pipeline_row)
-        for evt in pay_events:
-            weekly_events.append([week_of(evt[0])] + evt)
-        total += 1
-
-    # Write all pipeline rows in one request to avoid Sheets write-rate limits
-    if pipeline_rows:
-        sheets.values().update(
-            spreadsheetId=CASHFLOW_SHEET_ID,
-            range=f"'{tab_name}'!A2",
-            valueInputOption="USER_ENTERED",
-            body={"values": pipeline_rows},
-        ).execute()
+    total = 0
+    snapshot = None
+    run_writer = None
+    if CASHFLOW_RUN_STORE:
+        try:
+            run_writer = _CashflowRunWriter()
+        except OSError as e:
+            logger.warning(f"cashflow_batch: could not start run snapshot: {e}")
+            snapshot = {"error": str(e)}
+    # One write per chunk keeps Sheets calls low while bounding what's held in memory
+    _job_phase("computing pipeline rows", processed=0, total=len(projects))
+    try:
+        for chunk in _iter_cashflow_batch_chunks(projects, overrides, today, incremental=incremental,
+                                                 summary=summary):
+            chunk_rows = chunk["pipeline_rows"]
+            if chunk_rows:
+                sheets.values().update(
+                    spreadsheetId=CASHFLOW_SHEET_ID,
+                    range=f"'{tab_name}'!A{total + 2}",
+                    valueInputOption="USER_ENTERED",
+                    body={"values": chunk_rows},
+                ).execute()
+            total += len(chunk_rows)
+            _job_phase("computing pipeline rows", processed=total)
+            if keep_rows:
+                pipeline_rows.extend(chunk_rows)
+            if run_writer:
+                try:
+                    run_writer.add("pipeline", chunk_rows)
+                except OSError as e:
+                    logger.warning(f"cashflow_batch: could not write run snapshot: {e}")
+                    run_writer.discard()
+                    run_writer, snapshot = None, {"error": str(e)}
+            for pay_events in chunk["events_by_row"]:
+                for evt in pay_events:
+                    weekly_events.append([_week_of_date(evt[0])] + evt)
+            del chunk, chunk_rows
+    except BaseException:
+        if run_writer:
+            run_writer.discard()
+        raise
+    stats = summary["stats"]
+    incremental = summary["incremental"]
+    overrides_applied = summary["overrides_applied"]
+    aurora_memo = _aurora_memo_stats(summary.pop("aurora_memo"))
 
     # Apply Pipeline tab formatting
     dollar_fmt = {"numberFormat": {"type": "CURRENCY", "pattern": '"$"#,##0.00'}}
@@ -7011,46 +8591,93 @@ def _run_cashflow_batch(projects: list[dict], tab_name: str) -> dict:
     sheets.batchUpdate(spreadsheetId=CASHFLOW_SHEET_ID, body={"requests": format_requests}).execute()
 
     # Write Weekly Payments tab
+    _job_phase("writing weekly payments and dashboard tabs")
     weekly_events.sort(key=lambda r: r[1] if r[1] else "9999")
     _write_weekly_payments_from_events(svc, weekly_events)
 
     # Write Revenue + Expenses tabs to dashboard sheet
-    _write_dashboard_revenue_tab(svc, weekly_events)
+    event_index = _index_cashflow_events(weekly_events)
+    _write_dashboard_revenue_tab(svc, weekly_events, event_index)
     _write_dashboard_expenses(svc)
-    _write_dashboard_project_expenses(svc, weekly_events)
+    _write_dashboard_project_expenses(svc, weekly_events, event_index)
 
-    _write_summary_tab(svc, tab_name)
+    _write_summary_tab(svc, tab_name, project_count=total if aggregation == "values" else None)
     _write_readme_tab(svc)
 
-    formula_result = _update_cashflow_formulas(svc, tab_name)
+    _job_phase("refreshing cash flow totals")
+    formula_result = _refresh_cashflow_totals(svc, tab_name, pipeline_rows if aggregation == "values" else None,
+                                              mode=aggregation, audit=audit, last_row=total + 1)
+
+    if run_writer:
+        _job_phase("storing run snapshot")
+        try:
+            run_writer.add("events", weekly_events)
+            snapshot = {"run_id": run_writer.finish(tab_name)}
+            if CASHFLOW_PIPELINE_TABS_KEEP > 0:
+                pruned = _prune_pipeline_tabs(svc, CASHFLOW_PIPELINE_TABS_KEEP)
+                snapshot["pruned_tabs"] = pruned.get("deleted", [])
+                if pruned.get("error"):
+                    snapshot["prune_error"] = pruned["error"]
+        except Exception as e:
+            logger.warning(f"cashflow_batch: could not store run snapshot: {e}")
+            run_writer.discard()
+            snapshot = {"error": str(e)}
+
     return {
         "status": "ok",
         "tab": tab_name,
         "total": total,
         "overrides_applied": overrides_applied,
+        "incremental": {"enabled": incremental, **stats},
+        "aurora_memo": aurora_memo,
+        "event_index": {
+            "weeks": len(event_index["by_week"]),
+            "projects": len(event_index["by_project"]),
+            "revenue_rows": len(event_index["revenue"]),
+            "expense_rows": len(event_index["expenses"]),
+        },
         "formulas": formula_result,
+        "snapshot": snapshot,
+        "sheets_quota": _sheets_quota_usage_since(quota_before),
     }
 
 
 CASHFLOW_MAIN_TAB = "Cash Flow"
 
 
-def _col_letter(idx):
-    if idx < 26:
-        return chr(65 + idx)
-    return chr(65 + idx // 26 - 1) + chr(65 + idx % 26)
+# How the Cash Flow tab's weekly category rows are filled:
+#   "formulas" — SUMPRODUCT formulas over the Pipeline tab (recalculated by Sheets)
+#   "values"   — totals computed here and written as plain numbers
+CASHFLOW_AGGREGATION_MODE = os.getenv("CASHFLOW_AGGREGATION_MODE", "formulas")
+# State doc recording which mode the Cash Flow tab was last filled with, so
+# later refreshes of the same pipeline tab keep it
+_CASHFLOW_AGGREGATION_STATE = "cashflow_aggregation"
+
+# Weekly category rows on the Cash Flow tab and the Pipeline columns that feed
+# them. Each term is (date col, amount col, finance-type test); an entry sums
+# the amount for every pipeline row whose date falls in the week. Mirrors the
+# SUMPRODUCT formulas written by _update_cashflow_formulas, over the same rows.
+_CASHFLOW_WEEKLY_TERMS = {
+    "draws": [(8, 9, None), (10, 11, lambda ft: ft[:4] == "CASH")],
+    "finals": [
+        (10, 11, lambda ft: ft == "LR"), (12, 13, lambda ft: ft[:4] == "CASH"),
+        (10, 11, lambda ft: ft == "SE"), (12, 13, lambda ft: ft == "SE"),
+    ],
+    "comm1": [(19, 20, None)],
+    "comm2": [(21, 22, None), (23, 24, None)],
+    "ct_green": [(27, 28, None)],
+    "cash_mat": [(29, 30, None)],
+    "sub_ref": [(8, 15, None), (12, 15, lambda ft: ft[:4] == "CASH"), (8, 17, None)],
+}
+CASHFLOW_WARRANTY_ROW = 53  # $0.10/W non-LR warranty row; column I is hard-coded
 
 
-def _update_cashflow_formulas(svc, pipeline_tab_name: str) -> dict:
+def _cashflow_tab_layout(svc) -> dict:
     """
-    Rewrite the SUMPRODUCT formulas in the 'Cash Flow' tab to pull from
-    the given pipeline_tab_name instead of the old Jobs tab.
-
-    Rows updated (found by label in column A):
-      • LR 80% Draws / Cash 60% Pre-Install  → Payment 1 (all) + Cash Payment 2 (60%)
-      • LR 20% Finals / Cash 20% Finals       → LR Payment 2 + Cash Payment 3
-      • Commissions (Payout 1)                → Comm Payout 1
-      • Commissions (Payout 2)                → Comm Payout 2 + Comm Payout 3
+    Locate the weekly category rows (by label in column A) and the week
+    columns (row 2, from column D) on the Cash Flow tab. Returns
+    {"rows": {key: sheet_row}, "start_col", "num_weeks", "ct_green_existing"}
+    or {"error": ...} if a required row is missing.
     """
     sheets = svc.spreadsheets()
 
@@ -7112,6 +8739,50 @@ def _update_cashflow_formulas(svc, pipeline_tab_name: str) -> dict:
             except (ValueError, TypeError):
                 pass
 
+    return {
+        "rows": {
+            "draws": row_draws, "finals": row_finals, "comm1": row_comm1, "comm2": row_comm2,
+            "ct_green": row_ct_green, "cash_mat": row_cash_mat, "sub_ref": row_sub_ref,
+        },
+        "start_col": start_col,
+        "num_weeks": num_weeks,
+        "ct_green_existing": ct_green_existing,
+    }
+
+
+def _update_cashflow_formulas(svc, pipeline_tab_name: str, last_row: int = None) -> dict:
+    """
+    Rewrite the SUMPRODUCT formulas in the 'Cash Flow' tab to pull from
+    the given pipeline_tab_name instead of the old Jobs tab.
+
+    Rows updated (found by label in column A):
+      • LR 80% Draws / Cash 60% Pre-Install  → Payment 1 (all) + Cash Payment 2 (60%)
+      • LR 20% Finals / Cash 20% Finals       → LR Payment 2 + Cash Payment 3
+      • Commissions (Payout 1)                → Comm Payout 1
+      • Commissions (Payout 2)                → Comm Payout 2 + Comm Payout 3
+
+    The ranges run to last_row of the pipeline tab (its grid row count when
+    not given), so every project row is summed.
+    """
+    sheets = svc.spreadsheets()
+    layout = _cashflow_tab_layout(svc)
+    if "error" in layout:
+        return layout
+    row_draws    = layout["rows"]["draws"]
+    row_finals   = layout["rows"]["finals"]
+    row_comm1    = layout["rows"]["comm1"]
+    row_comm2    = layout["rows"]["comm2"]
+    row_ct_green = layout["rows"]["ct_green"]
+    row_cash_mat = layout["rows"]["cash_mat"]
+    row_sub_ref  = layout["rows"]["sub_ref"]
+    start_col    = layout["start_col"]
+    num_weeks    = layout["num_weeks"]
+    ct_green_existing = layout["ct_green_existing"]
+
+    if last_row is None:
+        last_row = _tab_row_count(svc, CASHFLOW_SHEET_ID, pipeline_tab_name)
+    n = max(last_row, 2)
+
     p = f"'{pipeline_tab_name}'"
     updates = []
 
@@ -7120,29 +8791,29 @@ def _update_cashflow_formulas(svc, pipeline_tab_name: str) -> dict:
 
         # Payment 1 (LR 80% draw / SE 33% / loan) + Cash Payment 2 (60% progress)
         f_draws = (
-            f"=SUMPRODUCT(ISNUMBER({p}!$I$2:$I$200)*({p}!$I$2:$I$200>={c}$2)*({p}!$I$2:$I$200<{c}$2+7)*ISNUMBER({p}!$J$2:$J$200)*({p}!$J$2:$J$200))"
-            f"+SUMPRODUCT(ISNUMBER({p}!$K$2:$K$200)*({p}!$K$2:$K$200>={c}$2)*({p}!$K$2:$K$200<{c}$2+7)*(LEFT({p}!$C$2:$C$200,4)=\"CASH\")*ISNUMBER({p}!$L$2:$L$200)*({p}!$L$2:$L$200))"
+            f"=SUMPRODUCT(ISNUMBER({p}!$I$2:$I${n})*({p}!$I$2:$I${n}>={c}$2)*({p}!$I$2:$I${n}<{c}$2+7)*ISNUMBER({p}!$J$2:$J${n})*({p}!$J$2:$J${n}))"
+            f"+SUMPRODUCT(ISNUMBER({p}!$K$2:$K${n})*({p}!$K$2:$K${n}>={c}$2)*({p}!$K$2:$K${n}<{c}$2+7)*(LEFT({p}!$C$2:$C${n},4)=\"CASH\")*ISNUMBER({p}!$L$2:$L${n})*({p}!$L$2:$L${n}))"
         )
         # LR 20% final + Cash 20% final + SE Payment 2 (33%) + SE Payment 3 (34%)
         f_finals = (
-            f"=SUMPRODUCT(ISNUMBER({p}!$K$2:$K$200)*({p}!$K$2:$K$200>={c}$2)*({p}!$K$2:$K$200<{c}$2+7)*({p}!$C$2:$C$200=\"LR\")*ISNUMBER({p}!$L$2:$L$200)*({p}!$L$2:$L$200))"
-            f"+SUMPRODUCT(ISNUMBER({p}!$M$2:$M$200)*({p}!$M$2:$M$200>={c}$2)*({p}!$M$2:$M$200<{c}$2+7)*(LEFT({p}!$C$2:$C$200,4)=\"CASH\")*ISNUMBER({p}!$N$2:$N$200)*({p}!$N$2:$N$200))"
-            f"+SUMPRODUCT(ISNUMBER({p}!$K$2:$K$200)*({p}!$K$2:$K$200>={c}$2)*({p}!$K$2:$K$200<{c}$2+7)*({p}!$C$2:$C$200=\"SE\")*ISNUMBER({p}!$L$2:$L$200)*({p}!$L$2:$L$200))"
-            f"+SUMPRODUCT(ISNUMBER({p}!$M$2:$M$200)*({p}!$M$2:$M$200>={c}$2)*({p}!$M$2:$M$200<{c}$2+7)*({p}!$C$2:$C$200=\"SE\")*ISNUMBER({p}!$N$2:$N$200)*({p}!$N$2:$N$200))"
+            f"=SUMPRODUCT(ISNUMBER({p}!$K$2:$K${n})*({p}!$K$2:$K${n}>={c}$2)*({p}!$K$2:$K${n}<{c}$2+7)*({p}!$C$2:$C${n}=\"LR\")*ISNUMBER({p}!$L$2:$L${n})*({p}!$L$2:$L${n}))"
+            f"+SUMPRODUCT(ISNUMBER({p}!$M$2:$M${n})*({p}!$M$2:$M${n}>={c}$2)*({p}!$M$2:$M${n}<{c}$2+7)*(LEFT({p}!$C$2:$C${n},4)=\"CASH\")*ISNUMBER({p}!$N$2:$N${n})*({p}!$N$2:$N${n}))"
+            f"+SUMPRODUCT(ISNUMBER({p}!$K$2:$K${n})*({p}!$K$2:$K${n}>={c}$2)*({p}!$K$2:$K${n}<{c}$2+7)*({p}!$C$2:$C${n}=\"SE\")*ISNUMBER({p}!$L$2:$L${n})*({p}!$L$2:$L${n}))"
+            f"+SUMPRODUCT(ISNUMBER({p}!$M$2:$M${n})*({p}!$M$2:$M${n}>={c}$2)*({p}!$M$2:$M${n}<{c}$2+7)*({p}!$C$2:$C${n}=\"SE\")*ISNUMBER({p}!$N$2:$N${n})*({p}!$N$2:$N${n}))"
         )
         # Comm Payout 1
         f_comm1 = (
-            f"=SUMPRODUCT(ISNUMBER({p}!$T$2:$T$200)*({p}!$T$2:$T$200>={c}$2)*({p}!$T$2:$T$200<{c}$2+7)*ISNUMBER({p}!$U$2:$U$200)*({p}!$U$2:$U$200))"
+            f"=SUMPRODUCT(ISNUMBER({p}!$T$2:$T${n})*({p}!$T$2:$T${n}>={c}$2)*({p}!$T$2:$T${n}<{c}$2+7)*ISNUMBER({p}!$U$2:$U${n})*({p}!$U$2:$U${n}))"
         )
         # Comm Payout 2 + Comm Payout 3
         f_comm2 = (
-            f"=SUMPRODUCT(ISNUMBER({p}!$V$2:$V$200)*({p}!$V$2:$V$200>={c}$2)*({p}!$V$2:$V$200<{c}$2+7)*ISNUMBER({p}!$W$2:$W$200)*({p}!$W$2:$W$200))"
-            f"+SUMPRODUCT(ISNUMBER({p}!$X$2:$X$200)*({p}!$X$2:$X$200>={c}$2)*({p}!$X$2:$X$200<{c}$2+7)*ISNUMBER({p}!$Y$2:$Y$200)*({p}!$Y$2:$Y$200))"
+            f"=SUMPRODUCT(ISNUMBER({p}!$V$2:$V${n})*({p}!$V$2:$V${n}>={c}$2)*({p}!$V$2:$V${n}<{c}$2+7)*ISNUMBER({p}!$W$2:$W${n})*({p}!$W$2:$W${n}))"
+            f"+SUMPRODUCT(ISNUMBER({p}!$X$2:$X${n})*({p}!$X$2:$X${n}>={c}$2)*({p}!$X$2:$X${n}<{c}$2+7)*ISNUMBER({p}!$Y$2:$Y${n})*({p}!$Y$2:$Y${n}))"
         )
 
         # CT Green Estates: $0.25/W at final payment for pre-install jobs (Pipeline tab col AB/AC)
         f_ct_green = (
-            f"=SUMPRODUCT(ISNUMBER({p}!$AB$2:$AB$200)*({p}!$AB$2:$AB$200>={c}$2)*({p}!$AB$2:$AB$200<{c}$2+7)*ISNUMBER({p}!$AC$2:$AC$200)*({p}!$AC$2:$AC$200))"
+            f"=SUMPRODUCT(ISNUMBER({p}!$AB$2:$AB${n})*({p}!$AB$2:$AB${n}>={c}$2)*({p}!$AB$2:$AB${n}<{c}$2+7)*ISNUMBER({p}!$AC$2:$AC${n})*({p}!$AC$2:$AC${n}))"
         )
 
         for row, formula in [(row_draws, f_draws), (row_finals, f_finals),
@@ -7151,7 +8822,7 @@ def _update_cashflow_formulas(svc, pipeline_tab_name: str) -> dict:
 
         # Cash materials: $1.26/W at 60% progress date (Pipeline tab col AD/AE)
         f_cash_mat = (
-            f"=SUMPRODUCT(ISNUMBER({p}!$AD$2:$AD$200)*({p}!$AD$2:$AD$200>={c}$2)*({p}!$AD$2:$AD$200<{c}$2+7)*ISNUMBER({p}!$AE$2:$AE$200)*({p}!$AE$2:$AE$200))"
+            f"=SUMPRODUCT(ISNUMBER({p}!$AD$2:$AD${n})*({p}!$AD$2:$AD${n}>={c}$2)*({p}!$AD$2:$AD${n}<{c}$2+7)*ISNUMBER({p}!$AE$2:$AE${n})*({p}!$AE$2:$AE${n}))"
         )
 
         # Only write CT Green formula if cell is currently empty
@@ -7165,9 +8836,9 @@ def _update_cashflow_formulas(svc, pipeline_tab_name: str) -> dict:
         # Subcontractor + Referral: Pipeline cols P (subcontractor) + R (referral)
         if row_sub_ref:
             f_sub_ref = (
-                f"=SUMPRODUCT(ISNUMBER({p}!$I$2:$I$200)*({p}!$I$2:$I$200>={c}$2)*({p}!$I$2:$I$200<{c}$2+7)*ISNUMBER({p}!$P$2:$P$200)*({p}!$P$2:$P$200))"
-                f"+SUMPRODUCT(ISNUMBER({p}!$M$2:$M$200)*({p}!$M$2:$M$200>={c}$2)*({p}!$M$2:$M$200<{c}$2+7)*(LEFT({p}!$C$2:$C$200,4)=\"CASH\")*ISNUMBER({p}!$P$2:$P$200)*({p}!$P$2:$P$200))"
-                f"+SUMPRODUCT(ISNUMBER({p}!$I$2:$I$200)*({p}!$I$2:$I$200>={c}$2)*({p}!$I$2:$I$200<{c}$2+7)*ISNUMBER({p}!$R$2:$R$200)*({p}!$R$2:$R$200))"
+                f"=SUMPRODUCT(ISNUMBER({p}!$I$2:$I${n})*({p}!$I$2:$I${n}>={c}$2)*({p}!$I$2:$I${n}<{c}$2+7)*ISNUMBER({p}!$P$2:$P${n})*({p}!$P$2:$P${n}))"
+                f"+SUMPRODUCT(ISNUMBER({p}!$M$2:$M${n})*({p}!$M$2:$M${n}>={c}$2)*({p}!$M$2:$M${n}<{c}$2+7)*(LEFT({p}!$C$2:$C${n},4)=\"CASH\")*ISNUMBER({p}!$P$2:$P${n})*({p}!$P$2:$P${n}))"
+                f"+SUMPRODUCT(ISNUMBER({p}!$I$2:$I${n})*({p}!$I$2:$I${n}>={c}$2)*({p}!$I$2:$I${n}<{c}$2+7)*ISNUMBER({p}!$R$2:$R${n})*({p}!$R$2:$R${n}))"
             )
             updates.append({"range": f"'{CASHFLOW_MAIN_TAB}'!{c}{row_sub_ref}", "values": [[f_sub_ref]]})
 
@@ -7175,8 +8846,8 @@ def _update_cashflow_formulas(svc, pipeline_tab_name: str) -> dict:
         # Skip column I — cell I53 contains a hard-coded value
         if c != "I":
             f_warranty = (
-                f"=SUMPRODUCT(ISNUMBER({p}!$M$2:$M$200)*({p}!$M$2:$M$200>={c}$2)*({p}!$M$2:$M$200<{c}$2+7)"
-                f"*(LEFT({p}!$C$2:$C$200,2)<>\"LR\")*ISNUMBER({p}!$F$2:$F$200)*({p}!$F$2:$F$200)*100)"
+                f"=SUMPRODUCT(ISNUMBER({p}!$M$2:$M${n})*({p}!$M$2:$M${n}>={c}$2)*({p}!$M$2:$M${n}<{c}$2+7)"
+                f"*(LEFT({p}!$C$2:$C${n},2)<>\"LR\")*ISNUMBER({p}!$F$2:$F${n})*({p}!$F$2:$F${n})*100)"
             )
             updates.append({"range": f"'{CASHFLOW_MAIN_TAB}'!{c}53", "values": [[f_warranty]]})
 
@@ -7189,6 +8860,200 @@ def _update_cashflow_formulas(svc, pipeline_tab_name: str) -> dict:
     return {"status": "ok", "pipeline_tab": pipeline_tab_name, "cells_updated": len(updates)}
 
 
+def _sheet_number(value):
+    """
+    Interpret a pipeline cell the way ISNUMBER() sees it once written with
+    USER_ENTERED: numbers stay numbers, ISO date strings become date serials,
+    anything else (blank, text, "~2026-..." projections) is not a number.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and len(value) == 10:
+        try:
+            return float(_sheets_serial(datetime.date.fromisoformat(value)))
+        except ValueError:
+            return None
+    return None
+
+
+def _aggregate_cashflow_weeks(pipeline_rows: list, week_serials: list) -> dict:
+    """
+    Sum pipeline rows into the Cash Flow tab's weekly category buckets.
+    week_serials are the week-start date serials from Cash Flow row 2 (None
+    for a non-date header). Returns {"totals": {key: [per-week]},
+    "counts": {key: [per-week entries]}}; keys are those of
+    _CASHFLOW_WEEKLY_TERMS plus "warranty".
+    """
+    n = len(week_serials)
+    starts = [(i, s) for i, s in enumerate(week_serials) if s is not None]
+    keys = list(_CASHFLOW_WEEKLY_TERMS) + ["warranty"]
+    totals = {k: [0.0] * n for k in keys}
+    counts = {k: [0] * n for k in keys}
+
+    def bucket(date_serial):
+        for i, start in starts:
+            if start <= date_serial < start + 7:
+                yield i
+
+    terms = [(k, t) for k, ts in _CASHFLOW_WEEKLY_TERMS.items() for t in ts]
+    # Warranty: $0.10/W on non-LR final payments = kW (col F) × 100 at Payment 3 date
+    terms.append(("warranty", (12, 5, lambda ft: ft[:2] != "LR")))
+
+    for row in pipeline_rows:
+        ft = str(row[2]).upper() if len(row) > 2 else ""
+        for key, (date_col, amt_col, test) in terms:
+            if test is not None and not test(ft):
+                continue
+            date_serial = _sheet_number(row[date_col]) if len(row) > date_col else None
+            amount = _sheet_number(row[amt_col]) if len(row) > amt_col else None
+            if date_serial is None or amount is None:
+                continue
+            if key == "warranty":
+                amount *= 100
+            for i in bucket(date_serial):
+                totals[key][i] += amount
+                counts[key][i] += 1
+    return {"totals": totals, "counts": counts}
+
+
+def _write_cashflow_weekly_values(svc, pipeline_tab_name: str, pipeline_rows: list = None,
+                                  audit: bool = False) -> dict:
+    """
+    Values-mode counterpart of _update_cashflow_formulas: compute each weekly
+    category total in Python and write plain numbers into the same Cash Flow
+    cells, so the sheet has nothing to recalculate.
+
+    pipeline_rows are the rows _compute_cashflow_row produced; when omitted
+    (apply-overrides / extend-weeks) they are read back from the Pipeline tab
+    unformatted. With audit=True, the column after the last week gets a note
+    on each category row recording the source tab, entry count and time —
+    only in cells that are empty or hold an earlier note; anything else in
+    that column is left alone and reported under "audit_skipped".
+    """
+    sheets = svc.spreadsheets()
+    layout = _cashflow_tab_layout(svc)
+    if "error" in layout:
+        return layout
+    start_col = layout["start_col"]
+    num_weeks = layout["num_weeks"]
+
+    if pipeline_rows is None:
+        pipeline_rows = [
+            row for _, row in _iter_tab_rows(
+                svc, CASHFLOW_SHEET_ID, pipeline_tab_name, "AI", first_row=2,
+                value_render="UNFORMATTED_VALUE",
+            )
+        ]
+        # UNFORMATTED dates arrive as serials already; _sheet_number passes them through.
+
+    row2 = sheets.values().get(
+        spreadsheetId=CASHFLOW_SHEET_ID,
+        range=f"'{CASHFLOW_MAIN_TAB}'!2:2",
+        valueRenderOption="UNFORMATTED_VALUE",
+    ).execute().get("values", [[]])[0]
+    week_serials = []
+    for w in range(num_weeks):
+        v = row2[start_col + w] if len(row2) > start_col + w else ""
+        week_serials.append(float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None)
+
+    agg = _aggregate_cashflow_weeks(pipeline_rows, week_serials)
+    totals, counts = agg["totals"], agg["counts"]
+    target_rows = dict(layout["rows"])
+    target_rows["warranty"] = CASHFLOW_WARRANTY_ROW
+
+    audit_col = _col_letter(start_col + num_weeks)
+    audit_existing, audit_skipped = [], []
+    if audit:
+        audit_existing = sheets.values().get(
+            spreadsheetId=CASHFLOW_SHEET_ID,
+            range=f"'{CASHFLOW_MAIN_TAB}'!{audit_col}1:{audit_col}",
+            valueRenderOption="FORMULA",
+        ).execute().get("values", [])
+
+    updates = []
+    for key, sheet_row in target_rows.items():
+        if not sheet_row:
+            continue
+        for w in range(num_weeks):
+            col_idx = start_col + w
+            c = _col_letter(col_idx)
+            if key == "ct_green" and col_idx in layout["ct_green_existing"]:
+                continue
+            if key == "warranty" and c == "I":
+                continue
+            updates.append({
+                "range": f"'{CASHFLOW_MAIN_TAB}'!{c}{sheet_row}",
+                "values": [[round(totals[key][w], 2)]],
+            })
+        if audit:
+            row_values = audit_existing[sheet_row - 1] if len(audit_existing) >= sheet_row else []
+            current = str(row_values[0]) if row_values else ""
+            if current and not current.startswith("values: "):
+                audit_skipped.append(f"{audit_col}{sheet_row}")
+                continue
+            stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+            updates.append({
+                "range": f"'{CASHFLOW_MAIN_TAB}'!{audit_col}{sheet_row}",
+                "values": [[f"values: {sum(counts[key])} entries from '{pipeline_tab_name}' @ {stamp}"]],
+            })
+
+    if updates:
+        sheets.values().batchUpdate(
+            spreadsheetId=CASHFLOW_SHEET_ID,
+            body={"valueInputOption": "USER_ENTERED", "data": updates},
+        ).execute()
+
+    if audit_skipped:
+        logger.warning(f"_write_cashflow_weekly_values: audit note skipped, cells in use: {', '.join(audit_skipped)}")
+    logger.info(f"_write_cashflow_weekly_values: wrote {len(updates)} cells from '{pipeline_tab_name}'")
+    result = {"status": "ok", "mode": "values", "pipeline_tab": pipeline_tab_name, "cells_updated": len(updates)}
+    if audit_skipped:
+        result["audit_skipped"] = audit_skipped
+    return result
+
+
+def _cashflow_tab_aggregation(svc, pipeline_tab_name: str) -> str:
+    """
+    Aggregation mode the Cash Flow tab was last filled with for this
+    pipeline tab: the mode _refresh_cashflow_totals recorded, or — if the
+    record is gone (state dir wiped) — read off the first draws cell: a
+    formula means formulas mode, a plain number values mode.
+    """
+    recorded = _load_state(_CASHFLOW_AGGREGATION_STATE) or {}
+    if recorded.get("pipeline_tab") == pipeline_tab_name and recorded.get("mode"):
+        return recorded["mode"]
+    layout = _cashflow_tab_layout(svc)
+    if "error" not in layout:
+        cell = f"'{CASHFLOW_MAIN_TAB}'!{_col_letter(layout['start_col'])}{layout['rows']['draws']}"
+        values = svc.spreadsheets().values().get(
+            spreadsheetId=CASHFLOW_SHEET_ID, range=cell, valueRenderOption="FORMULA",
+        ).execute().get("values", [])
+        if values and values[0] and values[0][0] != "":
+            return "formulas" if str(values[0][0]).startswith("=") else "values"
+    return CASHFLOW_AGGREGATION_MODE.lower()
+
+
+def _refresh_cashflow_totals(svc, pipeline_tab_name: str, pipeline_rows: list = None,
+                             mode: str = None, audit: bool = False, last_row: int = None) -> dict:
+    """
+    Fill the Cash Flow weekly category rows using the requested aggregation
+    mode. With no mode (apply-overrides, extend-weeks, reorganize) the mode
+    the tab was built with is kept. last_row (formulas mode) is the pipeline
+    tab's last data row.
+    """
+    mode = (mode or _cashflow_tab_aggregation(svc, pipeline_tab_name)).lower()
+    if mode == "values":
+        result = _write_cashflow_weekly_values(svc, pipeline_tab_name, pipeline_rows, audit=audit)
+    else:
+        mode = "formulas"
+        result = _update_cashflow_formulas(svc, pipeline_tab_name, last_row=last_row)
+    if result.get("status") == "ok":
+        _save_state(_CASHFLOW_AGGREGATION_STATE, {"pipeline_tab": pipeline_tab_name, "mode": mode})
+    return result
+
+
 @app.get("/cashflow/debug-row")
 async def debug_cashflow_row(row: int = 53):
     """Read a specific row from the Cash Flow tab — shows formula and display value."""
@@ -7208,7 +9073,7 @@ async def debug_cashflow_row(row: int = 53):
 
 
 @app.post("/cashflow/run")
-async def cashflow_run(request: Request):
+async def cashflow_run(request: Request, background_tasks: BackgroundTasks):
     """
     Pull all installed Zoho projects since cutoff_date, fetch Aurora data,
     calculate payment dates/amounts by finance type, and write a Pipeline tab
@@ -7220,24 +9085,51 @@ async def cashflow_run(request: Request):
     CF/SG/SE/Smart E (loans): single payment = contract price on SC date.
     Cash: single payment = contract price on SC/PTO date.
 
-    Body (optional): {"cutoff_date": "2025-06-01"}
+    Runs as a background job and returns {"status": "started", "job_id"} —
+    poll GET /jobs/{job_id} for progress and the result. If a cashflow_run
+    job is already queued or running, returns {"status": "already_running",
+    "job_id"} for it instead of starting another.
+
+    Body (optional): {"cutoff_date": "2025-06-01", "aggregation": "formulas" | "values",
+                      "audit": false,
+                      "incremental": true,   # false = recompute every project
+                      "wait": false}         # true = run inline and return the result
     """
     try:
         body = await request.json()
     except Exception:
         body = {}
-    cutoff = (body.get("cutoff_date") or "2025-06-01") if isinstance(body, dict) else "2025-06-01"
+    if not isinstance(body, dict):
+        body = {}
+    params = {
+        "cutoff": body.get("cutoff_date") or "2025-06-01",
+        "aggregation": body.get("aggregation"),
+        "audit": bool(body.get("audit")),
+        "incremental": body.get("incremental"),
+    }
+    job, active = _claim_job("cashflow_run", params)
+    if active:
+        return _job_already_running(active)
+    if body.get("wait"):
+        return _run_job_inline(job, _run_cashflow, **params)
+    background_tasks.add_task(_run_job, job["id"], _run_cashflow, **params)
+    return {"status": "started", "job_id": job["id"], "poll": f"/jobs/{job['id']}"}
+
+
+def _run_cashflow(cutoff: str = "2025-06-01", aggregation: str = None, audit: bool = False,
+                  incremental: bool = None) -> dict:
+    """Body of /cashflow/run: fetch projects since cutoff and run _run_cashflow_batch."""
     now_label = datetime.datetime.now(datetime.timezone.utc).strftime("%-m-%-d-%Y")
     tab_name = f"Pipeline {now_label}"
-    svc = _build_sheets_service()
+    _job_phase("fetching Zoho projects")
+    svc = _build_sheets_service(fresh=True)
     payment_overrides = _read_payment_overrides(svc) if svc else {}
-    override_ids = set(payment_overrides.keys())
-    ct_green_paid_ids = {pid for pid, v in payment_overrides.items() if v.get("ct_green_paid")}
-    projects = _fetch_all_cashflow_projects(cutoff_date=cutoff, override_proj_ids=override_ids, ct_green_paid_ids=ct_green_paid_ids)
+    projects, _ = _load_cashflow_projects(cutoff, payment_overrides, max_age_minutes=0)
     if not projects:
         return {"status": "no installed projects found", "cutoff_date": cutoff}
     try:
-        result = _run_cashflow_batch(projects, tab_name)
+        result = _run_cashflow_batch(projects, tab_name, aggregation=aggregation, audit=audit,
+                                     incremental=incremental)
         result["project_count"] = len(projects)
         result["cutoff_date"] = cutoff
         gc.collect()
@@ -7252,10 +9144,676 @@ async def cashflow_run(request: Request):
         }
 
 
-def _find_current_pipeline_tab(svc) -> str | None:
-    """Return the most recently created Pipeline tab name, or None."""
+# ------------------------
+# Cash flow preview (read-only)
+# ------------------------
+# GET /cashflow/preview runs the same fetch + compute as /cashflow/run but
+# writes nothing to Sheets: the Zoho project list is reused for
+# CASHFLOW_PREVIEW_MAX_AGE_MINUTES and Aurora pricing / computed rows come
+# from the incremental cache, so a warm preview returns in seconds.
+CASHFLOW_PREVIEW_MAX_AGE_MINUTES = float(os.getenv("CASHFLOW_PREVIEW_MAX_AGE_MINUTES", "60"))
+_CASHFLOW_ZOHO_STATE = "cashflow_zoho_projects"
+_CASHFLOW_EVENT_FIELDS = [
+    "week_of", "pay_date", "customer", "finance_type", "pay_type", "pay_amt",
+    "comm_date", "comm_amt", "stage", "sc_display", "project_id", "zoho_link",
+]
+
+
+def _load_cashflow_projects(cutoff: str, payment_overrides: dict, max_age_minutes: float = None) -> tuple:
+    """
+    Return (projects, fetched_at) for _fetch_all_cashflow_projects(cutoff, ...),
+    reusing the last fetch when it used the same cutoff and override/CT-Green-paid
+    sets and is younger than max_age_minutes (0 = always refetch). Fresh
+    fetches are saved for the next caller.
+    """
+    if max_age_minutes is None:
+        max_age_minutes = CASHFLOW_PREVIEW_MAX_AGE_MINUTES
+    override_ids = set(payment_overrides.keys())
+    ct_green_paid_ids = {pid for pid, v in payment_overrides.items() if v.get("ct_green_paid")}
+    key = _fingerprint({"cutoff": cutoff, "overrides": sorted(override_ids), "ct_green_paid": sorted(ct_green_paid_ids)})
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    cached = _load_state(_CASHFLOW_ZOHO_STATE, {}) if max_age_minutes > 0 else {}
+    min_fetched = (now - datetime.timedelta(minutes=max_age_minutes)).isoformat()
+    if cached.get("key") == key and cached.get("fetched_at", "") >= min_fetched:
+        return cached["projects"], cached["fetched_at"]
+
+    projects = _fetch_all_cashflow_projects(
+        cutoff_date=cutoff, override_proj_ids=override_ids, ct_green_paid_ids=ct_green_paid_ids,
+    )
+    if projects:
+        _save_state(_CASHFLOW_ZOHO_STATE, {"key": key, "fetched_at": now.isoformat(), "projects": projects})
+    return projects, now.isoformat()
+
+
+@app.get("/cashflow/preview")
+def cashflow_preview(cutoff_date: str = "2025-06-01", format: str = "json",
+                     sections: str = "pipeline,weekly,events", refresh: bool = False,
+                     project_id: str = None):
+    """
+    Read-only cash flow: same projects and numbers /cashflow/run would write,
+    returned as JSON (or NDJSON with format=ndjson) without touching any tab.
+
+    sections: comma list of pipeline (Pipeline rows keyed by header),
+              weekly (revenue/expense totals by week and category),
+              events (weekly payment events grouped by project ID).
+    refresh=true refetches the Zoho project list instead of reusing one
+    younger than CASHFLOW_PREVIEW_MAX_AGE_MINUTES. project_id narrows
+    pipeline/events to one project (weekly totals stay portfolio-wide).
+    """
+    wanted = {s.strip() for s in sections.split(",") if s.strip()}
+    svc = _build_sheets_service(fresh=True)
+    payment_overrides = _read_payment_overrides(svc) if svc else {}
+    projects, fetched_at = _load_cashflow_projects(
+        cutoff_date, payment_overrides, max_age_minutes=0 if refresh else None,
+    )
+    if not projects:
+        return {"status": "no installed projects found", "cutoff_date": cutoff_date}
+
+    today = datetime.date.today()
+    # Uses the incremental cache but never rewrites it: a preview for another
+    # cutoff_date would otherwise drop the entries /cashflow/run relies on
+    computed = _compute_cashflow_batch_rows(projects, payment_overrides, today, save_cache=False)
+    weekly_events = sorted(computed["weekly_events"], key=lambda r: r[1] if r[1] else "9999")
+
+    meta = {
+        "status": "ok",
+        "cutoff_date": cutoff_date,
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "zoho_fetched_at": fetched_at,
+        "project_count": len(projects),
+        "incremental": computed["stats"],
+    }
+
+    def pipeline():
+        for row in computed["pipeline_rows"]:
+            if project_id is None or row[1] == project_id:
+                yield dict(zip(CASHFLOW_PIPELINE_HEADERS, row))
+
+    def events():
+        for evt in weekly_events:
+            if project_id is None or evt[10] == project_id:
+                yield dict(zip(_CASHFLOW_EVENT_FIELDS, evt))
+
+    def weekly():
+        by_week = _index_cashflow_events(weekly_events)["by_week"]
+        for week, totals in by_week.items():
+            if isinstance(week, int):
+                week = (datetime.date(1899, 12, 30) + datetime.timedelta(days=week)).isoformat()
+            yield {"week": week, "totals": {k: round(v, 2) for k, v in totals.items()}}
+
+    if format == "ndjson":
+        from fastapi.responses import StreamingResponse
+
+        def lines():
+            yield json.dumps({"type": "meta", **meta}) + "\n"
+            if "pipeline" in wanted:
+                for row in pipeline():
+                    yield json.dumps({"type": "pipeline_row", **row}) + "\n"
+            if "weekly" in wanted:
+                for week in sorted(weekly(), key=lambda w: w["week"]):
+                    yield json.dumps({"type": "week", **week}) + "\n"
+            if "events" in wanted:
+                for evt in events():
+                    yield json.dumps({"type": "event", **evt}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    result = dict(meta)
+    if "pipeline" in wanted:
+        result["pipeline"] = list(pipeline())
+    if "weekly" in wanted:
+        result["weekly_totals"] = sorted(weekly(), key=lambda w: w["week"])
+    if "events" in wanted:
+        grouped = {}
+        for evt in events():
+            grouped.setdefault(evt["project_id"], []).append(evt)
+        result["events"] = grouped
+    return result
+
+
+# ------------------------
+# Cash flow what-if scenarios
+# ------------------------
+# POST /cashflow/scenarios evaluates many override sets against one shared
+# fetch: the Zoho list / Aurora pricing are loaded once (same caches as the
+# preview), the base schedule is computed once, and each scenario recomputes
+# only the rows it actually changes. Fifty scenarios cost about one run.
+CASHFLOW_SCENARIOS_MAX = int(os.getenv("CASHFLOW_SCENARIOS_MAX", "100"))
+
+
+def _scenario_matches(row: dict, rule: dict) -> bool:
+    """True if a scenario rule's finance_type / project_ids filters select row."""
+    finance_type = row.get("finance_type", "")
+    if finance_type == "PPA":
+        finance_type = "LR"
+    wanted_ft = rule.get("finance_type")
+    if wanted_ft:
+        wanted = {wanted_ft} if isinstance(wanted_ft, str) else set(wanted_ft)
+        if finance_type not in {"LR" if ft == "PPA" else ft for ft in wanted}:
+            return False
+    project_ids = rule.get("project_ids")
+    if project_ids and row.get("project_id", "") not in set(project_ids):
+        return False
+    return True
+
+
+def _apply_scenario(rows: list[dict], scenario: dict, today: datetime.date) -> dict:
+    """
+    Return {row_index: scenario_row} for every row the scenario changes.
+
+    scenario: {"name": str,
+               "overrides": {project_id: {payment1, amount1, materials, ...}},  # merged over the Overrides tab
+               "rules": [{"type": "sc_shift_days", "days": 14, "finance_type": "LR", "project_ids": [...]},
+                         {"type": "ct_green_paid", "finance_type": ..., "project_ids": [...]}]}
+    sc_shift_days moves the SC date (projected SC dates are materialized
+    first, so the shifted row no longer shows as "~projected").
+    """
+    changed = {}
+    overrides = scenario.get("overrides") or {}
+    rules = scenario.get("rules") or []
+
+    for i, row in enumerate(rows):
+        new_row = None
+        pov = overrides.get(row.get("project_id", ""))
+        if pov:
+            new_row = {**row, "payment_overrides": {**row.get("payment_overrides", {}), **pov}}
+
+        for rule in rules:
+            if not _scenario_matches(row, rule):
+                continue
+            kind = rule.get("type")
+            if kind == "sc_shift_days":
+                cur = new_row or row
+                sc_str = cur.get("substantial_completion", "")
+                stage = cur.get("stage", "")
+                try:
+                    if sc_str:
+                        sc = datetime.date.fromisoformat(sc_str)
+                    elif stage in CASHFLOW_STAGE_DAYS_TO_SC:
+                        sc = today + datetime.timedelta(days=CASHFLOW_STAGE_DAYS_TO_SC[stage])
+                    else:
+                        continue
+                except (ValueError, TypeError):
+                    continue
+                shifted = (sc + datetime.timedelta(days=int(rule.get("days", 0)))).isoformat()
+                new_row = {**cur, "substantial_completion": shifted}
+            elif kind == "ct_green_paid":
+                cur = new_row or row
+                new_row = {**cur, "payment_overrides": {**cur.get("payment_overrides", {}), "ct_green_paid": True}}
+
+        if new_row is not None:
+            changed[i] = new_row
+    return changed
+
+
+def _normalize_scenarios(scenarios: list) -> list:
+    """
+    Validate scenarios in place before anything is computed: override
+    entries are normalized with _normalize_override_entry (so "3/2/2026"
+    becomes "2026-03-02" as it would from the Overrides tab) and rules must
+    have a known type and, for sc_shift_days, an integer day count;
+    project_ids must be a list of strings and finance_type a string or list
+    of strings. Returns a list of error strings (empty if every scenario is
+    usable).
+    """
+    errors = []
+    for n, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            errors.append(f"scenario {n + 1}: must be an object")
+            continue
+        name = scenario.get("name") or f"scenario {n + 1}"
+        overrides = scenario.get("overrides") or {}
+        if not isinstance(overrides, dict):
+            errors.append(f"{name}: overrides must be an object keyed by project ID")
+            overrides = {}
+        for proj_id, entry in overrides.items():
+            normalized, entry_errors = _normalize_override_entry(entry)
+            errors.extend(f"{name}: {proj_id}: {e}" for e in entry_errors)
+            overrides[proj_id] = normalized
+        rules = scenario.get("rules") or []
+        if not isinstance(rules, list):
+            errors.append(f"{name}: rules must be a list")
+            rules = []
+        for rule in rules:
+            kind = rule.get("type") if isinstance(rule, dict) else None
+            if kind not in ("sc_shift_days", "ct_green_paid"):
+                errors.append(f"{name}: unknown rule {rule!r}")
+            elif kind == "sc_shift_days" and (isinstance(rule.get("days"), bool)
+                                              or not isinstance(rule.get("days"), int)):
+                errors.append(f"{name}: sc_shift_days needs an integer 'days'")
+            if not isinstance(rule, dict):
+                continue
+            project_ids = rule.get("project_ids")
+            if project_ids is not None and (not isinstance(project_ids, list)
+                                            or not all(isinstance(p, str) for p in project_ids)):
+                errors.append(f"{name}: {kind}: project_ids must be a list of project ID strings")
+            finance_type = rule.get("finance_type")
+            if finance_type is not None and not isinstance(finance_type, str) and (
+                    not isinstance(finance_type, list) or not all(isinstance(f, str) for f in finance_type)):
+                errors.append(f"{name}: {kind}: finance_type must be a string or a list of strings")
+    return errors
+
+
+def _weekly_cash_positions(weekly_events: list) -> dict:
+    """
+    Net weekly cash from weekly_events: {week_iso: [revenue, expenses]} using
+    the same revenue/expense bucketing as the dashboard tabs.
+    """
+    index = _index_cashflow_events(weekly_events)
+    weeks = {}
+
+    def week_key(serial):
+        if isinstance(serial, int):
+            return (datetime.date(1899, 12, 30) + datetime.timedelta(days=serial)).isoformat()
+        return serial or ""
+
+    for serial, _, amount, _, _ in index["revenue"]:
+        if isinstance(amount, (int, float)):
+            weeks.setdefault(week_key(serial), [0, 0])[0] += amount
+    for serial, _, _, amount in index["expenses"]:
+        if isinstance(amount, (int, float)):
+            weeks.setdefault(week_key(serial), [0, 0])[1] += amount
+    return weeks
+
+
+@app.post("/cashflow/scenarios")
+async def cashflow_scenarios(request: Request):
+    """
+    Run what-if override sets side by side without writing to Sheets.
+
+    Body: {"cutoff_date": "2025-06-01", "refresh": false,
+           "scenarios": [{"name": "LR SC +14d",
+                          "rules": [{"type": "sc_shift_days", "days": 14, "finance_type": "LR"}]},
+                         {"name": "CT Green paid", "rules": [{"type": "ct_green_paid"}]},
+                         {"name": "Smith slips", "overrides": {"P-1234": {"payment1": "2026-03-02"}}}]}
+
+    Every scenario starts from the Overrides tab. Returns the week list and,
+    per scenario (plus "base"), aligned revenue / expenses / net / cumulative
+    arrays and the number of projects it changed. A missing, empty or
+    oversized scenarios list, or any invalid scenario, is a 400.
+    """
+    try:
+        body = await request.json()
+    except Exception:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    scenarios = body.get("scenarios") or []
+    if not isinstance(scenarios, list) or not scenarios:
+        raise HTTPException(status_code=400, detail="body must include a non-empty 'scenarios' list")
+    if len(scenarios) > CASHFLOW_SCENARIOS_MAX:
+        raise HTTPException(status_code=400,
+                            detail=f"too many scenarios ({len(scenarios)} > {CASHFLOW_SCENARIOS_MAX})")
+    errors = _normalize_scenarios(scenarios)
+    if errors:
+        raise HTTPException(status_code=400, detail={"invalid_scenarios": errors})
+    # The Zoho / Aurora fetches and the compute are blocking — keep them off the event loop
+    return await run_in_threadpool(_run_cashflow_scenarios, scenarios,
+                                   body.get("cutoff_date") or "2025-06-01", bool(body.get("refresh")))
+
+
+def _run_cashflow_scenarios(scenarios: list, cutoff: str, refresh: bool) -> dict:
+    """Body of /cashflow/scenarios, for scenarios already checked by _normalize_scenarios."""
+    svc = _build_sheets_service(fresh=True)
+    payment_overrides = _read_payment_overrides(svc) if svc else {}
+    projects, fetched_at = _load_cashflow_projects(
+        cutoff, payment_overrides, max_age_minutes=0 if refresh else None,
+    )
+    if not projects:
+        return {"status": "no installed projects found", "cutoff_date": cutoff}
+
+    today = datetime.date.today()
+    zoho_base = "https://crm.zoho.com/crm/heliosolar/tab/CustomModule6/"
+    aurora_base = "https://v2.aurorasolar.com/projects/"
+    # Read-only, like /cashflow/preview: leave the incremental cache as the last run saved it
+    base = _compute_cashflow_batch_rows(projects, payment_overrides, today, save_cache=False)
+    rows, base_events = base["rows"], base["events_by_row"]
+
+    results = [{"name": "base", "changed_projects": 0,
+                "positions": _weekly_cash_positions(base["weekly_events"])}]
+    for n, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            scenario = {}
+        name = scenario.get("name") or f"scenario {n + 1}"
+        try:
+            changed = _apply_scenario(rows, scenario, today)
+            events_by_row = list(base_events)
+            if changed:
+                idx = list(changed)
+                _, fresh_events = _compute_cashflow_rows([changed[i] for i in idx], today, zoho_base, aurora_base)
+                for i, pay_events in zip(idx, fresh_events):
+                    events_by_row[i] = pay_events
+            weekly_events = [[_week_of_date(evt[0])] + evt for pay_events in events_by_row for evt in pay_events]
+            results.append({"name": name, "changed_projects": len(changed),
+                            "positions": _weekly_cash_positions(weekly_events)})
+        except Exception as e:
+            logger.error(f"cashflow_scenarios: {name} failed: {e}")
+            results.append({"name": name, "error": str(e)})
+
+    weeks = sorted({w for r in results for w in r.get("positions", {})})
+    out = []
+    for r in results:
+        if "error" in r:
+            out.append(r)
+            continue
+        positions = r.pop("positions")
+        revenue = [round(positions.get(w, (0, 0))[0], 2) for w in weeks]
+        expenses = [round(positions.get(w, (0, 0))[1], 2) for w in weeks]
+        net, cumulative, running = [], [], 0
+        for rev, exp in zip(revenue, expenses):
+            net.append(round(rev - exp, 2))
+            running += rev - exp
+            cumulative.append(round(running, 2))
+        out.append({**r, "revenue": revenue, "expenses": expenses, "net": net, "cumulative": cumulative,
+                    "totals": {"revenue": round(sum(revenue), 2), "expenses": round(sum(expenses), 2),
+                               "net": round(sum(revenue) - sum(expenses), 2)}})
+
+    return {
+        "status": "ok",
+        "cutoff_date": cutoff,
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "zoho_fetched_at": fetched_at,
+        "project_count": len(projects),
+        "weeks": weeks,
+        "scenarios": out,
+    }
+
+
+# ------------------------
+# Cash flow run store
+# ------------------------
+# Every /cashflow/run also saves its Pipeline rows and weekly events under
+# SYNC_STATE_DIR/runs/<run_id>/ as one .npy file per column (numbers as
+# float64 with NaN for blanks, everything else as fixed-width text) plus a
+# meta.json schema. Columns load memory-mapped, so /cashflow/runs/diff can
+# compare any two runs without touching Sheets — and old Pipeline tabs can
+# be pruned (POST /cashflow/runs/prune-tabs) once their run is stored here.
+# Pruning deletes the only other copy of a run, so it is refused unless
+# SYNC_STATE_PERSISTENT says SYNC_STATE_DIR survives a restart / redeploy
+# (the /tmp default doesn't).
+CASHFLOW_RUN_STORE = os.getenv("CASHFLOW_RUN_STORE", "true").lower() in ("1", "true", "yes")
+SYNC_STATE_PERSISTENT = os.getenv("SYNC_STATE_PERSISTENT", "false").lower() in ("1", "true", "yes")
+CASHFLOW_RUN_KEEP = int(os.getenv("CASHFLOW_RUN_KEEP", "104"))
+# Pipeline tabs to keep after each run (oldest pruned first); 0 = never prune automatically.
+CASHFLOW_PIPELINE_TABS_KEEP = int(os.getenv("CASHFLOW_PIPELINE_TABS_KEEP", "0"))
+
+
+def _run_store_dir() -> str:
+    return os.path.join(SYNC_STATE_DIR, "runs")
+
+
+def _column_array(values: list):
+    """One column as a numpy array: float64 (NaN = blank) if every value is a number or blank, else text."""
+    import numpy as np
+    if all(v is None or v == "" or type(v) in (int, float) for v in values):
+        return np.array([np.nan if v is None or v == "" else float(v) for v in values], dtype=np.float64)
+    return np.array(["" if v is None else str(v) for v in values], dtype=str)
+
+
+class _CashflowRunWriter:
+    """
+    Stores one run's Pipeline rows and weekly events column by column as they
+    are produced: add() appends each chunk to one scratch file per column, and
+    finish() turns each column into its .npy file in turn, so at most one
+    column of the run is held in memory. discard() drops a half-written run.
+    """
+
+    def __init__(self):
+        import shutil
+        self.run_id = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        root = _run_store_dir()
+        # cashflow_run is single-flight, so any scratch dir left here is from a run that died
+        for name in os.listdir(root) if os.path.isdir(root) else []:
+            if name.startswith(".") and name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        self.tmp_dir = os.path.join(root, f".{self.run_id}.tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.rows = {"pipeline": 0, "events": 0}
+
+    def add(self, table: str, rows: list) -> None:
+        """Append rows to table ("pipeline" or "events")."""
+        headers = CASHFLOW_PIPELINE_HEADERS if table == "pipeline" else _CASHFLOW_EVENT_FIELDS
+        for i in range(len(headers)):
+            with open(os.path.join(self.tmp_dir, f"{table}_{i:02d}.jsonl"), "a") as f:
+                for r in rows:
+                    f.write(json.dumps(r[i] if len(r) > i else "", default=str) + "\n")
+        self.rows[table] += len(rows)
+
+    def finish(self, tab_name: str, meta: dict = None) -> str:
+        """Write the .npy columns and meta.json, publish the run and return its run_id."""
+        import numpy as np
+        import shutil
+        schema = {}
+        for table, headers in (("pipeline", CASHFLOW_PIPELINE_HEADERS), ("events", _CASHFLOW_EVENT_FIELDS)):
+            columns = []
+            for i, name in enumerate(headers):
+                scratch = os.path.join(self.tmp_dir, f"{table}_{i:02d}.jsonl")
+                try:
+                    with open(scratch) as f:
+                        values = [json.loads(line) for line in f]
+                    os.remove(scratch)
+                except FileNotFoundError:
+                    values = []
+                arr = _column_array(values)
+                del values
+                filename = f"{table}_{i:02d}.npy"
+                np.save(os.path.join(self.tmp_dir, filename), arr)
+                columns.append({"name": name, "file": filename, "kind": "number" if arr.dtype.kind == "f" else "text"})
+                del arr
+            schema[table] = {"rows": self.rows[table], "columns": columns}
+
+        root = _run_store_dir()
+        with open(os.path.join(self.tmp_dir, "meta.json"), "w") as f:
+            json.dump({**(meta or {}), "run_id": self.run_id, "tab": tab_name,
+                       "saved_at": datetime.datetime.now(datetime.timezone.utc).isoformat(), "schema": schema}, f)
+        os.replace(self.tmp_dir, os.path.join(root, self.run_id))
+
+        for old in _list_cashflow_run_ids()[:-max(1, CASHFLOW_RUN_KEEP)]:
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+        logger.info(f"_CashflowRunWriter: stored {self.run_id} "
+                    f"({self.rows['pipeline']} rows, {self.rows['events']} events)")
+        return self.run_id
+
+    def discard(self) -> None:
+        import shutil
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def _list_cashflow_run_ids() -> list[str]:
+    """Stored run ids, oldest first."""
+    try:
+        return sorted(d for d in os.listdir(_run_store_dir())
+                      if not d.startswith(".") and os.path.exists(os.path.join(_run_store_dir(), d, "meta.json")))
+    except FileNotFoundError:
+        return []
+
+
+def _load_cashflow_run(run_id: str) -> dict:
+    """{"meta", "pipeline": {header: array}, "events": {field: array}}, arrays memory-mapped."""
+    import numpy as np
+    run_dir = os.path.join(_run_store_dir(), run_id)
+    with open(os.path.join(run_dir, "meta.json")) as f:
+        meta = json.load(f)
+    run = {"meta": meta}
+    for table in ("pipeline", "events"):
+        run[table] = {c["name"]: np.load(os.path.join(run_dir, c["file"]), mmap_mode="r")
+                      for c in meta["schema"][table]["columns"]}
+    return run
+
+
+def _resolve_run_id(ref: str, ids: list) -> str | None:
+    """Accept a run id, "latest", or "previous" (second newest)."""
+    if ref in (None, "", "latest"):
+        return ids[-1] if ids else None
+    if ref == "previous":
+        return ids[-2] if len(ids) > 1 else None
+    return ref if ref in ids else None
+
+
+def _diff_runs_by_week(a: dict, b: dict) -> list:
+    """Per-week revenue / commission totals of two runs and their change."""
+    import numpy as np
+
+    def totals(run):
+        ev = run["events"]
+        weeks, inv = np.unique(np.asarray(ev["week_of"]), return_inverse=True)
+        out = {}
+        for field in ("pay_amt", "comm_amt"):
+            col = ev[field]
+            vals = np.nan_to_num(np.asarray(col, dtype=np.float64)) if col.dtype.kind == "f" else np.zeros(len(inv))
+            out[field] = dict(zip(weeks.tolist(), np.bincount(inv, weights=vals, minlength=len(weeks)).tolist()))
+        return out
+
+    ta, tb = totals(a), totals(b)
+    rows = []
+    for week in sorted(set(ta["pay_amt"]) | set(tb["pay_amt"])):
+        ra, rb = ta["pay_amt"].get(week, 0.0), tb["pay_amt"].get(week, 0.0)
+        ca, cb = ta["comm_amt"].get(week, 0.0), tb["comm_amt"].get(week, 0.0)
+        if round(ra - rb, 2) or round(ca - cb, 2):
+            rows.append({"week": week or "(no date)",
+                         "revenue": [round(ra, 2), round(rb, 2), round(rb - ra, 2)],
+                         "commission": [round(ca, 2), round(cb, 2), round(cb - ca, 2)]})
+    return rows
+
+
+def _diff_runs_by_project(a: dict, b: dict) -> dict:
+    """Projects added / removed between two runs, and per-field changes for the rest."""
+    import numpy as np
+
+    def index(run):
+        return {pid: i for i, pid in enumerate(np.asarray(run["pipeline"]["Project ID"]).tolist())}
+
+    ia, ib = index(a), index(b)
+    fields = [h for h in CASHFLOW_PIPELINE_HEADERS if h in a["pipeline"] and h in b["pipeline"]
+              and h not in ("Zoho Link", "Aurora Link")]
+    common = [pid for pid in ib if pid in ia]
+    rows_a = np.array([ia[p] for p in common], dtype=np.int64)
+    rows_b = np.array([ib[p] for p in common], dtype=np.int64)
+
+    changed = {}
+    for field in fields:
+        col_a, col_b = a["pipeline"][field], b["pipeline"][field]
+        va, vb = np.asarray(col_a)[rows_a], np.asarray(col_b)[rows_b]
+        if va.dtype.kind == "f" and vb.dtype.kind == "f":
+            diff = ~((va == vb) | (np.isnan(va) & np.isnan(vb)))
+        else:
+            diff = va.astype(str) != vb.astype(str)
+        for k in np.nonzero(diff)[0].tolist():
+            x, y = va[k].item(), vb[k].item()
+            changed.setdefault(common[k], {})[field] = [
+                "" if isinstance(x, float) and x != x else x,
+                "" if isinstance(y, float) and y != y else y,
+            ]
+    return {
+        "added": [pid for pid in ib if pid not in ia],
+        "removed": [pid for pid in ia if pid not in ib],
+        "changed": changed,
+    }
+
+
+@app.get("/cashflow/runs")
+async def cashflow_runs():
+    """Stored cash flow runs, newest first."""
+    runs = []
+    for run_id in reversed(_list_cashflow_run_ids()):
+        try:
+            with open(os.path.join(_run_store_dir(), run_id, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        runs.append({"run_id": run_id, "tab": meta.get("tab"), "saved_at": meta.get("saved_at"),
+                     "projects": meta["schema"]["pipeline"]["rows"], "events": meta["schema"]["events"]["rows"]})
+    return {"runs": runs}
+
+
+@app.get("/cashflow/runs/diff")
+async def cashflow_runs_diff(a: str = "previous", b: str = "latest", by: str = "project"):
+    """
+    Compare two stored runs (ids from /cashflow/runs, or "latest" / "previous").
+    by=project: added / removed projects and changed Pipeline fields ([a, b]).
+    by=week: weekly revenue and commission totals ([a, b, b - a]) where they differ.
+    """
+    t0 = time.perf_counter()
+    ids = _list_cashflow_run_ids()
+    run_a, run_b = _resolve_run_id(a, ids), _resolve_run_id(b, ids)
+    if not run_a or not run_b:
+        return {"error": f"run not found (a={a}, b={b}); {len(ids)} stored runs"}
+    ra, rb = _load_cashflow_run(run_a), _load_cashflow_run(run_b)
+    result = {"a": {"run_id": run_a, "tab": ra["meta"].get("tab")},
+              "b": {"run_id": run_b, "tab": rb["meta"].get("tab")}, "by": by}
+    if by == "week":
+        result["weeks"] = _diff_runs_by_week(ra, rb)
+    else:
+        result.update(_diff_runs_by_project(ra, rb))
+    result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return result
+
+
+def _prune_pipeline_tabs(svc, keep: int, dry_run: bool = False) -> dict:
+    """
+    Delete all but the newest `keep` (>= 1) Pipeline tabs, oldest first, skipping
+    any tab with no stored run so its history isn't lost. Refused (an "error"
+    and nothing deleted) unless SYNC_STATE_PERSISTENT is set; a dry run still
+    lists what would go.
+    """
+    if not SYNC_STATE_PERSISTENT and not dry_run:
+        logger.warning(f"_prune_pipeline_tabs: refusing to delete tabs — {SYNC_STATE_DIR} is not marked persistent")
+        return {"deleted": [], "dry_run": dry_run,
+                "error": f"run store {_run_store_dir()} is not on persistent storage; "
+                         f"set SYNC_STATE_PERSISTENT=true once SYNC_STATE_DIR is on a disk that survives redeploys"}
+    keep = max(1, keep)
     sheets = svc.spreadsheets()
     meta = sheets.get(spreadsheetId=CASHFLOW_SHEET_ID).execute()
+    tabs = sorted(
+        (s["properties"] for s in meta.get("sheets", []) if s["properties"]["title"].startswith("Pipeline ")),
+        key=lambda p: p["index"],
+    )
+    stored_tabs = set()
+    for run_id in _list_cashflow_run_ids():
+        try:
+            with open(os.path.join(_run_store_dir(), run_id, "meta.json")) as f:
+                stored_tabs.add(json.load(f).get("tab"))
+        except (OSError, ValueError):
+            continue
+    candidates = tabs[:-keep]
+    prune = [p for p in candidates if p["title"] in stored_tabs]
+    skipped = [p["title"] for p in candidates if p["title"] not in stored_tabs]
+    if prune and not dry_run:
+        sheets.batchUpdate(
+            spreadsheetId=CASHFLOW_SHEET_ID,
+            body={"requests": [{"deleteSheet": {"sheetId": p["sheetId"]}} for p in prune]},
+        ).execute()
+    logger.info(f"_prune_pipeline_tabs: {'would delete' if dry_run else 'deleted'} {len(prune)} tab(s), "
+                f"kept {min(keep, len(tabs))}, {len(skipped)} without a stored run")
+    return {"deleted": [p["title"] for p in prune], "skipped_no_snapshot": skipped, "dry_run": dry_run,
+            "persistent": SYNC_STATE_PERSISTENT}
+
+
+@app.post("/cashflow/runs/prune-tabs")
+async def cashflow_prune_tabs(request: Request):
+    """
+    Delete old Pipeline tabs whose run is in the run store (only when
+    SYNC_STATE_PERSISTENT is set — see _prune_pipeline_tabs).
+    Body: {"keep": 4, "dry_run": true}  (keep defaults to CASHFLOW_PIPELINE_TABS_KEEP or 4)
+    """
+    try:
+        body = await request.json()
+    except Exception:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    svc = _build_sheets_service()
+    if not svc:
+        return {"error": "could not build sheets service"}
+    keep = int(body.get("keep") or CASHFLOW_PIPELINE_TABS_KEEP or 4)
+    return _prune_pipeline_tabs(svc, keep, dry_run=bool(body.get("dry_run", True)))
+
+
+def _find_current_pipeline_tab(svc, meta: dict = None) -> str | None:
+    """Return the most recently created Pipeline tab name, or None."""
+    if meta is None:
+        meta = svc.spreadsheets().get(spreadsheetId=CASHFLOW_SHEET_ID).execute()
     pipeline_tabs = [
         s["properties"]["title"]
         for s in meta.get("sheets", [])
@@ -7271,7 +9829,7 @@ def _find_current_pipeline_tab(svc) -> str | None:
     return max(pipeline_tabs, key=lambda t: tab_order.get(t, 0))
 
 
-def _apply_overrides_to_pipeline_tab(svc, tab_name: str, overrides: dict) -> dict:
+def _apply_overrides_to_pipeline_tab(svc, tab_name: str, overrides: dict, meta: dict = None) -> dict:
     """
     Patch payment date, payment amount, and commission date cells in an existing
     Pipeline tab for any project listed in overrides.
@@ -7285,16 +9843,12 @@ def _apply_overrides_to_pipeline_tab(svc, tab_name: str, overrides: dict) -> dic
     sheets = svc.spreadsheets()
 
     # Read full pipeline to get project IDs, finance type, contract price, and kW
-    raw = sheets.values().get(
-        spreadsheetId=CASHFLOW_SHEET_ID,
-        range=f"'{tab_name}'!A1:AI200",
-        valueRenderOption="FORMATTED_VALUE",
-    ).execute().get("values", [])
+    raw = list(_iter_tab_rows(svc, CASHFLOW_SHEET_ID, tab_name, "AI", meta=meta))
 
     if not raw:
         return {"patched": [], "cells_updated": 0}
 
-    headers = raw[0]
+    headers = raw[0][1]
     def _ci(name):
         try:
             return headers.index(name)
@@ -7321,9 +9875,9 @@ def _apply_overrides_to_pipeline_tab(svc, tab_name: str, overrides: dict) -> dic
 
     # Build {project_id: (row_number_1indexed, finance_type, contract_price, system_watts, pay1, pay2, pay3)}
     proj_info = {}
-    for i, row in enumerate(raw[1:], start=2):
-        pid = _cell(row, ci_proj)
-        if not pid or pid == "Project ID":
+    index = _index_rows_by_project_id(raw[1:], ci_proj, last_wins=True) if ci_proj is not None else {}
+    for pid, (i, row) in index.items():
+        if pid == "Project ID":
             continue
         fin   = _cell(row, ci_fin)
         price = _parse_currency(row[ci_price])  if ci_price is not None and len(row) > ci_price else None
@@ -7340,7 +9894,7 @@ def _apply_overrides_to_pipeline_tab(svc, tab_name: str, overrides: dict) -> dic
         "payment3": ("M", "N", "X"),
     }
 
-    updates = []
+    edits = []
     patched = []
     for proj_id, pov in overrides.items():
         info = proj_info.get(proj_id)
@@ -7358,31 +9912,31 @@ def _apply_overrides_to_pipeline_tab(svc, tab_name: str, overrides: dict) -> dic
                     # Pipeline cleared this slot; don't restore the stale override date.
                     continue
                 date_val = pov[key]
-                updates.append({"range": f"'{tab_name}'!{pay_col}{row_num}", "values": [[date_val]]})
-                updates.append({"range": f"'{tab_name}'!{comm_col}{row_num}", "values": [[date_val]]})
+                edits.append((row_num, pay_col, date_val))
+                edits.append((row_num, comm_col, date_val))
 
         # Payment amount overrides
         for key, (pay_col, amt_col, comm_col) in PAY_COLS.items():
             amt_key = key.replace("payment", "amount")
             if pov.get(amt_key) is not None:
-                updates.append({"range": f"'{tab_name}'!{amt_col}{row_num}", "values": [[pov[amt_key]]]})
+                edits.append((row_num, amt_col, pov[amt_key]))
 
         # Commission payout amount overrides (cols U and W)
         # Pipeline tab: T=Comm Payout 1 Date, U=Comm Payout 1 Amt, V=Comm Payout 2 Date, W=Comm Payout 2 Amt
         if pov.get("comm_payout1") is not None:
-            updates.append({"range": f"'{tab_name}'!U{row_num}", "values": [[pov["comm_payout1"]]]})
+            edits.append((row_num, "U", pov["comm_payout1"]))
         if pov.get("comm_payout2") is not None:
-            updates.append({"range": f"'{tab_name}'!W{row_num}", "values": [[pov["comm_payout2"]]]})
+            edits.append((row_num, "W", pov["comm_payout2"]))
 
         # Holdback date/amount overrides (cols AH/AI)
         if pov.get("holdback_date"):
-            updates.append({"range": f"'{tab_name}'!AH{row_num}", "values": [[pov["holdback_date"]]]})
+            edits.append((row_num, "AH", pov["holdback_date"]))
         if pov.get("holdback_amt") is not None:
-            updates.append({"range": f"'{tab_name}'!AI{row_num}", "values": [[pov["holdback_amt"]]]})
+            edits.append((row_num, "AI", pov["holdback_amt"]))
 
         # For CASH/SE: if payment2 date was overridden, move the cash materials date with it
         if pov.get("payment2") and finance_type in ("CASH", "SE") and current_pay["payment2"]:
-            updates.append({"range": f"'{tab_name}'!AD{row_num}", "values": [[pov["payment2"]]]})
+            edits.append((row_num, "AD", pov["payment2"]))
 
         # Materials override
         if pov.get("materials") is not None:
@@ -7390,23 +9944,20 @@ def _apply_overrides_to_pipeline_tab(svc, tab_name: str, overrides: dict) -> dic
             if finance_type == "LR" and pov.get("amount1") is None and contract_price:
                 # LR: recalculate the 80% draw net of materials
                 new_draw = round(contract_price * 0.8 - mat, 2)
-                updates.append({"range": f"'{tab_name}'!J{row_num}", "values": [[new_draw]]})
+                edits.append((row_num, "J", new_draw))
             elif finance_type in ("CASH", "SE"):
                 # CASH/SE: write the override directly to the cash materials amount column
-                updates.append({"range": f"'{tab_name}'!AE{row_num}", "values": [[mat]]})
+                edits.append((row_num, "AE", mat))
             # Always update the Materials (est) column O for visibility
-            updates.append({"range": f"'{tab_name}'!O{row_num}", "values": [[mat]]})
+            edits.append((row_num, "O", mat))
 
         patched.append(proj_id)
 
-    if updates:
-        sheets.values().batchUpdate(
-            spreadsheetId=CASHFLOW_SHEET_ID,
-            body={"valueInputOption": "USER_ENTERED", "data": updates},
-        ).execute()
+    if edits:
+        _patch_cells(svc, CASHFLOW_SHEET_ID, tab_name, edits)
 
     logger.info(f"_apply_overrides_to_pipeline_tab: patched {len(patched)} project(s)")
-    return {"patched": patched, "cells_updated": len(updates)}
+    return {"patched": patched, "cells_updated": len(edits)}
 
 
 @app.post("/cashflow/apply-overrides")
@@ -7421,7 +9972,8 @@ async def cashflow_apply_overrides():
         if not svc:
             return {"status": "failed", "reason": "could not build Sheets service"}
 
-        tab_name = _find_current_pipeline_tab(svc)
+        meta = svc.spreadsheets().get(spreadsheetId=CASHFLOW_SHEET_ID).execute()
+        tab_name = _find_current_pipeline_tab(svc, meta)
         if not tab_name:
             return {"status": "failed", "reason": "no Pipeline tab found — run /cashflow/run first"}
 
@@ -7429,16 +9981,12 @@ async def cashflow_apply_overrides():
         if not overrides:
             return {"status": "ok", "tab": tab_name, "message": "no overrides found in Overrides tab"}
 
-        patch_result = _apply_overrides_to_pipeline_tab(svc, tab_name, overrides)
+        patch_result = _apply_overrides_to_pipeline_tab(svc, tab_name, overrides, meta=meta)
 
         # Rebuild Weekly Payments from the now-patched Pipeline tab data
         # Read the full pipeline tab and reconstruct row dicts for _write_weekly_payments_tab
         sheets = svc.spreadsheets()
-        raw = sheets.values().get(
-            spreadsheetId=CASHFLOW_SHEET_ID,
-            range=f"'{tab_name}'!A1:AI200",
-            valueRenderOption="FORMATTED_VALUE",
-        ).execute().get("values", [])
+        raw = [row for _, row in _iter_tab_rows(svc, CASHFLOW_SHEET_ID, tab_name, "AI", meta=meta)]
 
         if len(raw) < 2:
             return {"status": "ok", "tab": tab_name, "patch": patch_result, "weekly_payments": "no data"}
@@ -7632,7 +10180,7 @@ async def cashflow_apply_overrides():
             body={"values": [weekly_headers] + event_rows},
         ).execute()
 
-        formula_result = _update_cashflow_formulas(svc, tab_name)
+        formula_result = _refresh_cashflow_totals(svc, tab_name)
 
         # Refresh Expenses tab commission/project rows so overridden amounts are reflected
         _write_dashboard_project_expenses(svc, event_rows)
@@ -7662,21 +10210,18 @@ async def dashboard_apply_overrides():
         svc = _build_sheets_service()
         sheets = svc.spreadsheets()
 
-        tab_name = _find_current_pipeline_tab(svc)
+        meta = svc.spreadsheets().get(spreadsheetId=CASHFLOW_SHEET_ID).execute()
+        tab_name = _find_current_pipeline_tab(svc, meta)
         if not tab_name:
             return {"status": "failed", "reason": "no Pipeline tab found — run cashflow/run first"}
 
         # Apply overrides to original pipeline tab
         overrides = _read_payment_overrides(svc)
         if overrides:
-            _apply_overrides_to_pipeline_tab(svc, tab_name, overrides)
+            _apply_overrides_to_pipeline_tab(svc, tab_name, overrides, meta=meta)
 
         # Read patched pipeline tab
-        raw = sheets.values().get(
-            spreadsheetId=CASHFLOW_SHEET_ID,
-            range=f"'{tab_name}'!A1:AI200",
-            valueRenderOption="FORMATTED_VALUE",
-        ).execute().get("values", [])
+        raw = [row for _, row in _iter_tab_rows(svc, CASHFLOW_SHEET_ID, tab_name, "AI", meta=meta)]
 
         if len(raw) < 2:
             return {"status": "ok", "message": "pipeline tab empty"}
@@ -7828,9 +10373,10 @@ async def dashboard_apply_overrides():
                 ])
 
         weekly_events.sort(key=lambda r: r[1] if r[1] else "9999")
-        _write_dashboard_revenue_tab(svc, weekly_events)
+        event_index = _index_cashflow_events(weekly_events)
+        _write_dashboard_revenue_tab(svc, weekly_events, event_index)
         _write_weekly_payments_from_events(svc, weekly_events)
-        _write_dashboard_project_expenses(svc, weekly_events)
+        _write_dashboard_project_expenses(svc, weekly_events, event_index)
 
         return {"status": "ok", "overrides_applied": len(overrides), "revenue_rows": len(weekly_events)}
 
@@ -8054,7 +10600,7 @@ async def cashflow_extend_weeks(request: Request):
             (s["properties"]["title"] for s in sheet_meta.get("sheets", [])
              if s["properties"]["title"].startswith("Pipeline ")), None
         )
-        formula_result = _update_cashflow_formulas(svc, tab_name) if tab_name else {"skipped": "no Pipeline tab"}
+        formula_result = _refresh_cashflow_totals(svc, tab_name) if tab_name else {"skipped": "no Pipeline tab"}
 
         return {
             "status": "ok",
@@ -8306,7 +10852,7 @@ async def cashflow_reorganize_expenses():
             t = s["properties"]["title"]
             if t.startswith("Pipeline "):
                 tab_name = t
-        formula_result = _update_cashflow_formulas(svc, tab_name) if tab_name else {"skipped": "no Pipeline tab found"}
+        formula_result = _refresh_cashflow_totals(svc, tab_name) if tab_name else {"skipped": "no Pipeline tab found"}
 
         return {
             "status": "ok",
@@ -9103,17 +11649,12 @@ async def dashboard_sync_submissions():
 
         # Read all submission rows
         # Columns: A=Timestamp, B=Email, C=Cash Flow Date, D=Category, E=Vendor, F=Amount, G=Notes, H=Status
-        raw = sheets.values().get(
-            spreadsheetId=DASHBOARD_SHEET_ID,
-            range="Submissions!A2:H200",
-            valueRenderOption="FORMATTED_VALUE",
-        ).execute().get("values", [])
+        raw = _iter_tab_rows(svc, DASHBOARD_SHEET_ID, "Submissions", "H", first_row=2)
 
         expense_rows = []
         status_updates = []
 
-        for i, row in enumerate(raw):
-            sheet_row = i + 2  # 1-indexed, row 1 is header
+        for sheet_row, row in raw:
             status = row[7].strip() if len(row) > 7 else ""
             if status != "Approved":
                 continue
@@ -9164,13 +11705,12 @@ async def dashboard_sync_submissions():
             ).execute()
 
         # Mark processed rows as Synced
-        for sheet_row, new_status in status_updates:
-            sheets.values().update(
-                spreadsheetId=DASHBOARD_SHEET_ID,
-                range=f"Submissions!H{sheet_row}",
-                valueInputOption="RAW",
-                body={"values": [[new_status]]},
-            ).execute()
+        if status_updates:
+            _patch_cells(
+                svc, DASHBOARD_SHEET_ID, "Submissions",
+                [(sheet_row, "H", new_status) for sheet_row, new_status in status_updates],
+                value_input="RAW",
+            )
 
         return {"status": "ok", "synced": len(expense_rows)}
 